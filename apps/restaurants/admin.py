@@ -9,6 +9,7 @@ from .models import (
     Category,
     Orders,
     OrderItem,
+    OrderEvent,
     Review,
 )
 
@@ -65,6 +66,12 @@ class OrderItemAdmin(admin.ModelAdmin):
     search_fields = ('menu_item__name',)
     ordering = ('menu_item',)
 
+@admin.register(OrderEvent)
+class OrderEventAdmin(admin.ModelAdmin):
+    list_display = ('order', 'from_status', 'to_status', 'actor', 'created_at')
+    list_filter = ('to_status', 'created_at')
+    ordering = ('-created_at',)
+
 @admin.register(Review)
 class ReviewAdmin(admin.ModelAdmin):
     list_display = ('user', 'order', 'rate', 'created_at')
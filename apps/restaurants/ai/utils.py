@@ -1,36 +1,28 @@
 import csv
+import json
+import logging
 import os
-from functools import lru_cache
+import shutil
+import threading
+import time
+from collections.abc import Mapping
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
 
 
-@lru_cache(maxsize=1)
 def get_analyzer_base_dir() -> Path:
     """
-    Locate the sibling "Restaurant analyzer" directory.
-    You can override via env ANALYZER_DIR.
+    Directory holding the analyzer outputs (``outputs/cleaned_data/*.csv``).
+    Defaults to the in-project directory written by
+    ``manage.py compute_restaurant_ratings``; set ANALYZER_DIR to read an
+    external analyzer's outputs instead.
     """
-    env_path = os.environ.get("ANALYZER_DIR")
-    if env_path:
-        p = Path(env_path).expanduser().resolve()
-        if p.exists():
-            return p
-
-    # Compute from this file location: apps/restaurants/ai/utils.py -> project root
-    project_root = Path(__file__).resolve().parents[3]  # .../Resturent backend
-    # Sibling folder assumed to be alongside "Resturent backend"
-    sibling = project_root.parent / "Restaurant analyzer"
-    if sibling.exists():
-        return sibling
-
-    # Fallback: try a generic "analyzer" folder name nearby
-    alt = project_root.parent / "analyzer"
-    if alt.exists():
-        return alt
-
-    # Last resort: return the project_root to avoid crashes; callers should handle missing files
-    return project_root
+    return Path(settings.ANALYZER_DIR).expanduser().resolve()
 
 
 def _safe_float(x: str, default: float = 0.0) -> float:
@@ -50,50 +42,313 @@ def get_restaurants_cleaned_path() -> Path:
     return base / "outputs" / "cleaned_data" / "restaurants_cleaned.csv"
 
 
-@lru_cache(maxsize=1)
-def load_restaurant_ratings() -> List[Tuple[int, float]]:
+class RestaurantRatings:
     """
-    Load (restaurant_id, avg_rating) pairs from analyzer output, sorted by rating DESC.
-    Returns an empty list if the file is missing.
+    restaurant_ratings.csv as arrays: ``ids`` sorted ascending, ``ratings``
+    (float32) aligned with them and ``order``, the positions by rating desc
+    (ties keep the file order). Loaded from ``.npy`` files with mmap, so
+    lookups and top-n reads touch only the pages they need.
     """
-    ratings_path = get_restaurant_ratings_path()
-    if not ratings_path.exists():
-        return []
+    files = ("ids", "ratings", "order")
+
+    def __init__(self, ids: np.ndarray, ratings: np.ndarray, order: np.ndarray):
+        self.ids = ids
+        self.ratings = ratings
+        self.order = order
+
+    @classmethod
+    def empty(cls) -> "RestaurantRatings":
+        return cls(np.empty(0, np.int64), np.empty(0, np.float32), np.empty(0, np.int64))
+
+    @classmethod
+    def from_csv(cls, path: Path) -> "RestaurantRatings":
+        rids: List[int] = []
+        ratings: List[float] = []
+        with path.open("r", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                rid = int(row.get("restaurant_id", "0") or 0)
+                if rid > 0:
+                    rids.append(rid)
+                    ratings.append(_safe_float(row.get("avg_rating", "0"), 0.0))
+
+        file_ids = np.array(rids, dtype=np.int64)
+        file_ratings = np.array(ratings, dtype=np.float32)
+        by_id = np.argsort(file_ids, kind="stable")
+        position = np.empty_like(by_id)
+        position[by_id] = np.arange(len(by_id))
+        by_rating = np.argsort(-file_ratings, kind="stable")
+        return cls(file_ids[by_id], file_ratings[by_id], position[by_rating])
+
+    @classmethod
+    def open(cls, directory: Path) -> "RestaurantRatings":
+        return cls(*(np.load(directory / f"{name}.npy", mmap_mode="r") for name in cls.files))
+
+    def save(self, directory: Path) -> None:
+        for name in self.files:
+            np.save(directory / f"{name}.npy", getattr(self, name))
+
+    def top_ids(self, n: int) -> List[int]:
+        return self.ids[self.order[:n]].tolist()
+
+    def get(self, rid: int, default: float = 0.0) -> float:
+        position = int(np.searchsorted(self.ids, rid))
+        if position < len(self.ids) and self.ids[position] == rid:
+            return float(self.ratings[position])
+        return default
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __iter__(self) -> Iterator[Tuple[int, float]]:
+        """
+        (restaurant_id, avg_rating) pairs, best rated first.
+        """
+        return zip(self.ids[self.order].tolist(), self.ratings[self.order].tolist())
+
+
+class RestaurantTable(Mapping):
+    """
+    restaurants_cleaned.csv as a read-only mapping id -> row dict backed by
+    arrays: ``ids`` sorted ascending, ``data``, all field values as one
+    UTF-8 blob (row by row, column by column), and ``offsets``, where value
+    ``(row, column)`` spans ``data[offsets[k]:offsets[k + 1]]`` with
+    ``k = row * len(columns) + column``. Rows are decoded on access.
+    """
+    files = ("ids", "offsets", "data")
+
+    def __init__(self, ids: np.ndarray, offsets: np.ndarray, data: np.ndarray, columns: List[str]):
+        self.ids = ids
+        self.offsets = offsets
+        self.data = data
+        self.columns = columns
+
+    @classmethod
+    def empty(cls) -> "RestaurantTable":
+        return cls(np.empty(0, np.int64), np.zeros(1, np.int64), np.empty(0, np.uint8), [])
+
+    @classmethod
+    def from_csv(cls, path: Path) -> "RestaurantTable":
+        by_id: Dict[int, List[str]] = {}
+        with path.open("r", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            columns = list(reader.fieldnames or [])
+            for row in reader:
+                try:
+                    rid = int(row.get("id", "0") or 0)
+                except Exception:
+                    continue
+                if rid > 0:
+                    by_id[rid] = [row.get(column) or "" for column in columns]
+
+        ids = sorted(by_id)
+        values = [value.encode("utf-8") for rid in ids for value in by_id[rid]]
+        offsets = np.zeros(len(values) + 1, dtype=np.int64)
+        np.cumsum([len(value) for value in values], out=offsets[1:])
+        data = np.frombuffer(b"".join(values), dtype=np.uint8)
+        return cls(np.array(ids, dtype=np.int64), offsets, data, columns)
+
+    @classmethod
+    def open(cls, directory: Path) -> "RestaurantTable":
+        arrays = (np.load(directory / f"{name}.npy", mmap_mode="r") for name in cls.files)
+        columns = json.loads((directory / "columns.json").read_text())
+        return cls(*arrays, columns)
+
+    def save(self, directory: Path) -> None:
+        for name in self.files:
+            np.save(directory / f"{name}.npy", getattr(self, name))
+        (directory / "columns.json").write_text(json.dumps(self.columns))
+
+    def __getitem__(self, rid: int) -> dict:
+        position = int(np.searchsorted(self.ids, rid))
+        if position == len(self.ids) or self.ids[position] != rid:
+            raise KeyError(rid)
+        width = len(self.columns)
+        bounds = self.offsets[position * width:(position + 1) * width + 1].tolist()
+        raw = self.data[bounds[0]:bounds[-1]].tobytes()
+        start = bounds[0]
+        return {
+            column: raw[lo - start:hi - start].decode("utf-8")
+            for column, lo, hi in zip(self.columns, bounds, bounds[1:])
+        }
 
-    out: List[Tuple[int, float]] = []
-    with ratings_path.open("r", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            rid = int(row.get("restaurant_id", "0") or 0)
-            rating = _safe_float(row.get("avg_rating", "0"), 0.0)
-            if rid > 0:
-                out.append((rid, rating))
+    def __len__(self) -> int:
+        return len(self.ids)
 
-    out.sort(key=lambda x: x[1], reverse=True)
-    return out
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.ids.tolist())
 
 
-@lru_cache(maxsize=1)
-def load_restaurants_cleaned_by_id() -> Dict[int, dict]:
+class AnalyzerFileCache:
+    """
+    Array-backed copy of one analyzer output file, kept per process and
+    reloaded when the file's (mtime, size) changes.
+
+    The file is stat()ed at most every ANALYZER_CHECK_INTERVAL seconds.
+    When it changed, a background thread loads the new version while
+    callers keep getting the old one; the swap is a single assignment. Only
+    the very first load (nothing to serve yet) blocks.
+
+    The arrays live in ANALYZER_CACHE_DIR as ``.npy`` files, in a directory
+    named after the source's signature. The first worker to see a new file
+    parses the CSV and writes them; every worker memory-maps them, so the
+    data is shared through the page cache instead of copied per process.
+    When ANALYZER_CACHE_DIR is not writable each process keeps the parsed
+    copy in memory instead.
+    """
+
+    def __init__(self, name: str, get_path: Callable[[], Path], table_class: type):
+        self.name = name
+        self.get_path = get_path
+        self.table_class = table_class
+        self._lock = threading.Lock()
+        self._state: Tuple[Optional[tuple], object] = (None, table_class.empty())
+        self._checked_at = 0.0
+        self._reloading = False
+        self._reloader: Optional[threading.Thread] = None
+
+    def _signature(self, path: Path) -> Optional[tuple]:
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        return (str(path), stat.st_mtime_ns, stat.st_size)
+
+    def _binary_dir(self, signature: tuple) -> Path:
+        _, mtime_ns, size = signature
+        return Path(settings.ANALYZER_CACHE_DIR) / f"{self.name}-{mtime_ns}-{size}"
+
+    def _load(self, path: Path, signature: tuple):
+        started = time.monotonic()
+        directory = self._binary_dir(signature)
+        try:
+            value = self.table_class.open(directory)
+            source = "binary"
+        except OSError:
+            value = self.table_class.from_csv(path)
+            source = "csv"
+            if self._write_binary(directory, value):
+                try:
+                    value = self.table_class.open(directory)
+                except OSError:
+                    pass  # Removed meanwhile, serve the parsed copy
+        logger.info("Loaded analyzer %s from %s (%d rows) in %.1fms",
+                    self.name, source, len(value), (time.monotonic() - started) * 1000)
+        return value
+
+    def _write_binary(self, directory: Path, value) -> bool:
+        """
+        Save ``value`` as ``directory``. Returns False if the cache directory
+        is not writable, in which case the caller keeps its in-memory copy.
+        """
+        # Write to a private directory, then rename it into place in one step
+        tmp = directory.with_name(f".{directory.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            tmp.mkdir(parents=True)
+            value.save(tmp)
+            try:
+                tmp.rename(directory)
+            except OSError:
+                if not directory.is_dir():
+                    raise
+                # Another worker got there first, its copy is identical
+                shutil.rmtree(tmp, ignore_errors=True)
+        except OSError:
+            shutil.rmtree(tmp, ignore_errors=True)
+            logger.warning("Could not write analyzer cache %s", directory, exc_info=True)
+            return False
+
+        # Keep the generation just replaced: a worker that found it a moment
+        # ago may still be opening it. Processes still mapping older ones
+        # keep their pages until they reload.
+        try:
+            stale = sorted(
+                (other for other in directory.parent.glob(f"{self.name}-*") if other != directory),
+                key=lambda other: other.stat().st_mtime_ns,
+            )
+        except OSError:
+            stale = []  # Another worker is cleaning up
+        for other in stale[:-1]:
+            shutil.rmtree(other, ignore_errors=True)
+        return True
+
+    def _reload(self, path: Path, signature: Optional[tuple]) -> None:
+        try:
+            value = self.table_class.empty() if signature is None else self._load(path, signature)
+            self._state = (signature, value)
+        except Exception:
+            logger.exception("Reloading analyzer %s from %s failed, keeping the old copy", self.name, path)
+        finally:
+            self._reloading = False
+
+    def get(self):
+        signature, value = self._state
+        now = time.monotonic()
+        if now - self._checked_at < settings.ANALYZER_CHECK_INTERVAL:
+            return value
+        self._checked_at = now
+
+        path = self.get_path()
+        current = self._signature(path)
+        if current == signature:
+            return value
+
+        if signature is None:
+            # Nothing to serve yet: load in the request, concurrent callers wait
+            with self._lock:
+                if self._state[0] != current:
+                    self._state = (current, self._load(path, current))
+            return self._state[1]
+
+        with self._lock:
+            if self._reloading:
+                return value
+            self._reloading = True
+        logger.info("Analyzer %s changed, reloading in the background", self.name)
+        self._reloader = threading.Thread(target=self._reload, args=(path, current), daemon=True)
+        self._reloader.start()
+        return value
+
+    def get_versioned(self) -> Tuple[str, object]:
+        """
+        Like ``get()``, together with a version string of the returned copy
+        that changes whenever the source file does (``"none"`` without one).
+        """
+        self.get()
+        signature, value = self._state
+        if signature is None:
+            return "none", value
+        _, mtime_ns, size = signature
+        return f"{mtime_ns}-{size}", value
+
+    def clear(self) -> None:
+        self._state = (None, self.table_class.empty())
+        self._checked_at = 0.0
+
+
+restaurant_ratings_cache = AnalyzerFileCache(
+    "restaurant_ratings", get_restaurant_ratings_path, RestaurantRatings,
+)
+restaurants_cleaned_cache = AnalyzerFileCache(
+    "restaurants_cleaned", get_restaurants_cleaned_path, RestaurantTable,
+)
+
+
+def load_restaurant_ratings() -> RestaurantRatings:
+    """
+    Load restaurant ratings from analyzer output. Iterating gives
+    (restaurant_id, avg_rating) pairs sorted by rating DESC; ``get(rid)``
+    looks one up. Empty if the file is missing.
+    """
+    return restaurant_ratings_cache.get()
+
+
+def load_restaurants_cleaned_by_id() -> RestaurantTable:
     """
     Load restaurants_cleaned.csv as a mapping id -> row dict.
     Used as a fallback to map IDs to names if DB rows are missing.
     """
-    p = get_restaurants_cleaned_path()
-    if not p.exists():
-        return {}
-
-    by_id: Dict[int, dict] = {}
-    with p.open("r", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            try:
-                rid = int(row.get("id", "0") or 0)
-            except Exception:
-                continue
-            if rid > 0:
-                by_id[rid] = row
-    return by_id
+    return restaurants_cleaned_cache.get()
 
 
 def top_restaurant_ids(n: int = 10) -> List[int]:
@@ -101,4 +356,4 @@ def top_restaurant_ids(n: int = 10) -> List[int]:
     if not ratings:
         return []
     n = max(1, min(int(n or 10), 100))
-    return [rid for rid, _ in ratings[:n]]
+    return ratings.top_ids(n)
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ResturentsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.restaurants'
+
+    def ready(self):
+        from apps.restaurants import signals  # noqa: F401
@@ -0,0 +1,50 @@
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+
+from apps.restaurants.utils import restaurant_group, waiter_group
+from apps.userprofile.models import UserProfile
+
+STAFF_USER_TYPES = ('waiter', 'restaurant_owner', 'admin', 'super_admin')
+
+
+class OrderFeedConsumer(AsyncJsonWebsocketConsumer):
+    """
+    Push order created and status change events to staff.
+
+    Waiters receive the orders assigned to them and, if they belong to a
+    restaurant, that restaurant's orders; owners receive the orders of the
+    restaurants they own. Replaces polling ``orders/waiter/``.
+    """
+
+    async def connect(self):
+        user = self.scope.get('user')
+        if user is None or not user.is_authenticated or user.user_type not in STAFF_USER_TYPES:
+            await self.close(code=4403)
+            return
+
+        self.groups = await self.get_feed_groups(user)
+        for group in self.groups:
+            await self.channel_layer.group_add(group, self.channel_name)
+        await self.accept()
+
+    async def disconnect(self, code):
+        for group in getattr(self, 'groups', []):
+            await self.channel_layer.group_discard(group, self.channel_name)
+
+    async def receive_json(self, content, **kwargs):
+        # The feed is push only.
+        pass
+
+    async def order_event(self, event):
+        await self.send_json(event['payload'])
+
+    @database_sync_to_async
+    def get_feed_groups(self, user):
+        profile = UserProfile.objects.filter(user=user).only('id', 'restaurant_id').first()
+        if profile is None:
+            return []
+
+        restaurant_ids = set(profile.owned_restaurants.values_list('id', flat=True))
+        if profile.restaurant_id:
+            restaurant_ids.add(profile.restaurant_id)
+        return [waiter_group(profile.pk)] + [restaurant_group(rid) for rid in sorted(restaurant_ids)]
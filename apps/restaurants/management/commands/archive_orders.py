@@ -0,0 +1,38 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.restaurants.utils import archive_completed_orders
+
+
+class Command(BaseCommand):
+    help = (
+        "Move completed orders older than ORDER_ARCHIVE_AFTER_DAYS (with their "
+        "items) to the archive tables, in small batches with short transactions."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--older-than-days", type=int, default=settings.ORDER_ARCHIVE_AFTER_DAYS)
+        parser.add_argument("--batch-size", type=int, default=settings.ORDER_ARCHIVE_BATCH_SIZE)
+        parser.add_argument("--max-batches", type=int, default=None,
+                            help="Stop after this many batches (for throttled runs).")
+        parser.add_argument("--pause", type=float, default=0,
+                            help="Seconds to sleep between batches to spread the write load.")
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        total = 0
+        for moved in archive_completed_orders(
+            older_than_days=options["older_than_days"],
+            batch_size=options["batch_size"],
+            max_batches=options["max_batches"],
+        ):
+            total += moved
+            self.stdout.write(f"Archived {moved} orders")
+            if options["pause"]:
+                time.sleep(options["pause"])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {total} orders in {time.monotonic() - started:.2f}s"
+        ))
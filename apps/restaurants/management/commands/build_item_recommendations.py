@@ -0,0 +1,19 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.restaurants.utils import build_co_occurrence_recommendations
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the precomputed \"frequently ordered together\" neighbour "
+        "lists of every menu item from placed orders."
+    )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        count = build_co_occurrence_recommendations()
+        self.stdout.write(self.style.SUCCESS(
+            f"Built recommendations for {count} menu items in {time.monotonic() - started:.2f}s"
+        ))
@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.restaurants.utils import build_pending_similar_items, build_similar_items
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the precomputed \"similar ingredients\" neighbour lists of "
+        "every menu item. Ingredient changes mark their restaurant; run with "
+        "--pending periodically to rebuild those, or without it after bulk "
+        "imports or to rebuild from scratch."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--restaurant", type=int, action="append", dest="restaurant_ids",
+                            help="Only rebuild this restaurant (repeatable).")
+        parser.add_argument("--pending", action="store_true",
+                            help="Only rebuild restaurants whose ingredients changed.")
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        if options["pending"]:
+            restaurants, count = build_pending_similar_items()
+            self.stdout.write(f"Rebuilding {restaurants} restaurants with changed ingredients")
+        else:
+            count = build_similar_items(options["restaurant_ids"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Built similar items for {count} menu items in {time.monotonic() - started:.2f}s"
+        ))
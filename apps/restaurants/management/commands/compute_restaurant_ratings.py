@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.restaurants.utils import compute_restaurant_ratings
+
+
+class Command(BaseCommand):
+    help = (
+        "Fold reviews created since the last run into the restaurant ratings "
+        "used by the suggestion endpoints. Use --full to recompute from all reviews."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--full", action="store_true", help="Recompute from all reviews.")
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        count = compute_restaurant_ratings(full=options["full"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Processed {count} new reviews in {time.monotonic() - started:.2f}s"
+        ))
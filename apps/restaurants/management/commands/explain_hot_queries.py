@@ -0,0 +1,100 @@
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils.timezone import now
+
+from apps.restaurants.models import (
+    Cart,
+    CartItem,
+    OrderEvent,
+    OrderItem,
+    Orders,
+    Restaurant,
+    Review,
+)
+from apps.userprofile.models import UserProfile
+
+PAGE = 11
+
+# SQLite: "SCAN orders" is a full table scan. "SCAN orders USING INDEX x"
+# walks an index in ORDER BY order and stops at the LIMIT, which is fine.
+# PostgreSQL: "Seq Scan on orders".
+_SQLITE_SCAN_RE = re.compile(r"\bSCAN (?!CONSTANT ROW)(\w+)\b(?! USING)")
+_POSTGRES_SCAN_RE = re.compile(r"Seq Scan on (\w+)")
+
+
+def find_scans(plan, vendor):
+    """
+    Return the tables a query plan reads with a full scan.
+    """
+    pattern = _POSTGRES_SCAN_RE if vendor == "postgresql" else _SQLITE_SCAN_RE
+    return sorted(set(pattern.findall(plan)))
+
+
+def hot_queries():
+    """
+    The queries behind the order, cart and review endpoints, keyed by name,
+    with sample parameters taken from whatever data is loaded.
+    """
+    profile_id = UserProfile.objects.values_list("id", flat=True).first() or 0
+    order_id = Orders.objects.values_list("id", flat=True).first() or 0
+    cart_id = Cart.objects.values_list("id", flat=True).first() or 0
+    since = now()
+
+    return {
+        "order history": Orders.objects.filter(user_id=profile_id).order_by("-created_at", "-id")[:PAGE],
+        "waiter queue": Orders.objects.filter(waiter_id=profile_id).order_by("-created_at", "-id")[:PAGE],
+        "order history delta sync": (
+            Orders.objects.filter(user_id=profile_id, updated_at__gt=since).order_by("updated_at", "id")[:PAGE]
+        ),
+        "waiter queue delta sync": (
+            Orders.objects.filter(waiter_id=profile_id, updated_at__gt=since).order_by("updated_at", "id")[:PAGE]
+        ),
+        "status board": Orders.objects.open().filter(order_status="PREPARING").order_by("created_at"),
+        "waiter open tickets": Orders.objects.open().filter(waiter_id=profile_id),
+        "order items": OrderItem.objects.filter(order_id=order_id),
+        "order events": OrderEvent.objects.filter(order_id=order_id).order_by("created_at"),
+        "user cart": Cart.objects.filter(user_id=profile_id),
+        "cart lines": CartItem.objects.filter(cart_id=cart_id),
+        "reviews by user": Review.objects.filter(user_id=profile_id).order_by("-created_at", "-id")[:PAGE],
+        "latest reviews": Review.objects.order_by("-created_at", "-id")[:PAGE],
+        "latest restaurants": Restaurant.objects.order_by("-created_at", "-id")[:PAGE],
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Run EXPLAIN on the order, cart and review hot-path queries and fail "
+        "if any of them plans a full table scan. Run against seeded data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--verbose-plans", action="store_true",
+                            help="Print every plan, not only the failing ones.")
+
+    def handle(self, *args, **options):
+        vendor = connection.vendor
+        failures = []
+
+        with transaction.atomic():
+            if vendor == "postgresql":
+                # Small seeded tables make seq scans look cheap; ask for the
+                # plan the data would get at production size.
+                with connection.cursor() as cursor:
+                    cursor.execute("SET LOCAL enable_seqscan = off")
+
+            for name, queryset in hot_queries().items():
+                plan = queryset.explain()
+                scans = find_scans(plan, vendor)
+                if scans:
+                    failures.append(name)
+                    self.stdout.write(self.style.ERROR(f"{name}: full scan of {', '.join(scans)}"))
+                else:
+                    self.stdout.write(f"{name}: ok")
+                if scans or options["verbose_plans"]:
+                    self.stdout.write(plan)
+
+        if failures:
+            raise CommandError(f"{len(failures)} hot queries regressed to a scan: {', '.join(failures)}")
+        self.stdout.write(self.style.SUCCESS("All hot queries use an index."))
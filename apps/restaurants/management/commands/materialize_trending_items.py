@@ -0,0 +1,20 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.restaurants.utils import materialize_trending_items
+
+
+class Command(BaseCommand):
+    help = (
+        "Decay the trending counters to now and write the top menu items of "
+        "every restaurant and city for the trending endpoints. Run it "
+        "periodically, e.g. every few minutes."
+    )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        count = materialize_trending_items()
+        self.stdout.write(self.style.SUCCESS(
+            f"Materialized trending items from {count} counters in {time.monotonic() - started:.2f}s"
+        ))
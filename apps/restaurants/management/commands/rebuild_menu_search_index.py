@@ -0,0 +1,21 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.restaurants.utils import rebuild_menu_search_index
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the menu item full-text search index from scratch. "
+        "Run after bulk loads that bypass model signals (e.g. seed scripts)."
+    )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        with transaction.atomic():
+            rebuild_menu_search_index()
+        self.stdout.write(self.style.SUCCESS(
+            f"Menu search index rebuilt in {time.monotonic() - started:.2f}s"
+        ))
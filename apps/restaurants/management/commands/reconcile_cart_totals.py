@@ -0,0 +1,70 @@
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.restaurants.models import Cart, cart_total_subquery
+
+CENT = Decimal("0.01")
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare every cart's stored total_price with the sum of its lines and "
+        "repair the ones that drifted. Cart mutations keep totals current with "
+        "F() deltas; this is the safety net for writes that bypass the views."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--dry-run", action="store_true",
+                            help="Report drifted carts without updating them.")
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        dry_run = options["dry_run"]
+        checked = repaired = 0
+        last_pk = 0
+
+        while True:
+            with transaction.atomic():
+                # Lock the batch first, then sum in a new statement: a cart
+                # mutation blocked on the lock applies its F() delta on top
+                # of the repaired total, and one committed before is summed.
+                pks = list(
+                    Cart.objects
+                    .select_for_update()
+                    .filter(pk__gt=last_pk)
+                    .order_by("pk")
+                    .values_list("pk", flat=True)[:batch_size]
+                )
+                if not pks:
+                    break
+                batch = list(
+                    Cart.objects
+                    .filter(pk__in=pks)
+                    .order_by("pk")
+                    .annotate(expected_total=cart_total_subquery())
+                    .only("pk", "total_price")
+                )
+                last_pk = batch[-1].pk
+                checked += len(batch)
+
+                drifted = []
+                for cart in batch:
+                    expected = Decimal(cart.expected_total).quantize(CENT)
+                    if cart.total_price != expected:
+                        self.stdout.write(
+                            f"Cart {cart.pk}: stored {cart.total_price}, expected {expected}"
+                        )
+                        cart.total_price = expected
+                        drifted.append(cart)
+
+                repaired += len(drifted)
+                if drifted and not dry_run:
+                    Cart.objects.bulk_update(drifted, ["total_price"])
+
+        verb = "Found" if dry_run else "Repaired"
+        self.stdout.write(self.style.SUCCESS(
+            f"Checked {checked} carts. {verb} {repaired} with a drifted total."
+        ))
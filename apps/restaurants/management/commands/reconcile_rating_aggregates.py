@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand
+
+from apps.restaurants.models import MenuItem, Restaurant
+from apps.restaurants.utils import (
+    invalidate_menu_snapshots,
+    invalidate_top_suggestions,
+    menu_item_rating_subqueries,
+    reconcile_rating_aggregates,
+    restaurant_rating_subqueries,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the rating count, sum and histogram of every restaurant and "
+        "menu item from the reviews and repair the ones that drifted. Review "
+        "writes through the API keep them current with F() deltas; this is the "
+        "safety net for writes that bypass it."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--dry-run", action="store_true",
+                            help="Report drifted rows without updating them.")
+
+    def handle(self, *args, **options):
+        verb = "Found" if options["dry_run"] else "Repaired"
+
+        for model, subqueries in (
+            (Restaurant, restaurant_rating_subqueries()),
+            (MenuItem, menu_item_rating_subqueries()),
+        ):
+            label = model._meta.verbose_name_plural
+            checked, drifted = reconcile_rating_aggregates(
+                model, subqueries,
+                batch_size=options["batch_size"],
+                dry_run=options["dry_run"],
+            )
+            for row, changes in drifted:
+                details = ", ".join(
+                    f"{field} {stored} -> {expected}"
+                    for field, (stored, expected) in changes.items()
+                )
+                self.stdout.write(f"{model.__name__} {row.pk}: {details}")
+
+            if model is Restaurant and drifted and not options["dry_run"]:
+                invalidate_top_suggestions()
+            if model is MenuItem and drifted and not options["dry_run"]:
+                invalidate_menu_snapshots(
+                    MenuItem.objects
+                    .filter(pk__in=[row.pk for row, _ in drifted])
+                    .values_list("menu__restaurant_id", flat=True)
+                    .distinct()
+                )
+
+            self.stdout.write(self.style.SUCCESS(
+                f"Checked {checked} {label}. {verb} {len(drifted)} with drifted ratings."
+            ))
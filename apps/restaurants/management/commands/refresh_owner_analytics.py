@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.restaurants.models import Restaurant
+from apps.restaurants.utils import refresh_sales_columns
+
+
+class Command(BaseCommand):
+    help = (
+        "Fold new order items into the owner analytics columns of every "
+        "restaurant (or the given ones) and drop cancelled orders. Owner "
+        "endpoints serve the last run, so schedule it frequently; use --full "
+        "now and then to rebuild from scratch."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("restaurant_ids", nargs="*", type=int)
+        parser.add_argument("--full", action="store_true", help="Rebuild instead of appending.")
+
+    def handle(self, *args, **options):
+        restaurant_ids = options["restaurant_ids"] or Restaurant.objects.values_list("id", flat=True)
+        started = time.monotonic()
+        total = 0
+        for restaurant_id in restaurant_ids:
+            total += refresh_sales_columns(restaurant_id, full=options["full"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Added {total} order items in {time.monotonic() - started:.2f}s"
+        ))
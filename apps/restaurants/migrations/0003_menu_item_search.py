@@ -0,0 +1,82 @@
+from django.db import migrations
+
+
+SQLITE_CREATE = [
+    """
+    CREATE VIRTUAL TABLE menu_item_search USING fts5(
+        name, category, ingredients, description, restaurant,
+        tokenize = 'unicode61 remove_diacritics 2'
+    )
+    """,
+    # Column weights: name, category, ingredients, description, restaurant.
+    # The restaurant column holds a single "r<id>" token so that scoped
+    # searches intersect posting lists instead of filtering every match.
+    "INSERT INTO menu_item_search (menu_item_search, rank) "
+    "VALUES ('rank', 'bm25(10.0, 4.0, 2.0, 1.0, 0.0)')",
+    """
+    INSERT INTO menu_item_search
+        (rowid, name, description, category, ingredients, restaurant)
+    SELECT i.id, i.name, COALESCE(i.description, ''), COALESCE(c.name, ''),
+           COALESCE((SELECT group_concat(g.name, ' ')
+                     FROM restaurants_menuitemingredient g
+                     WHERE g.menu_item_id = i.id), ''),
+           'r' || m.restaurant_id
+    FROM restaurants_menuitem i
+    JOIN restaurants_menu m ON m.id = i.menu_id
+    LEFT JOIN category c ON c.id = i.category_id
+    """,
+]
+
+POSTGRES_CREATE = [
+    """
+    CREATE TABLE menu_item_search (
+        menu_item_id bigint PRIMARY KEY
+            REFERENCES restaurants_menuitem (id) ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED,
+        restaurant_id bigint NOT NULL,
+        document tsvector NOT NULL
+    )
+    """,
+    "CREATE INDEX menu_item_search_document_idx ON menu_item_search USING gin (document)",
+    "CREATE INDEX menu_item_search_restaurant_idx ON menu_item_search (restaurant_id)",
+    """
+    INSERT INTO menu_item_search (menu_item_id, restaurant_id, document)
+    SELECT i.id, m.restaurant_id,
+           setweight(to_tsvector('simple', COALESCE(i.name, '')), 'A') ||
+           setweight(to_tsvector('simple', COALESCE(c.name, '')), 'B') ||
+           setweight(to_tsvector('simple', COALESCE(ing.names, '')), 'C') ||
+           setweight(to_tsvector('simple', COALESCE(i.description, '')), 'D')
+    FROM restaurants_menuitem i
+    JOIN restaurants_menu m ON m.id = i.menu_id
+    LEFT JOIN category c ON c.id = i.category_id
+    LEFT JOIN (
+        SELECT menu_item_id, string_agg(name, ' ') AS names
+        FROM restaurants_menuitemingredient
+        GROUP BY menu_item_id
+    ) ing ON ing.menu_item_id = i.id
+    """,
+]
+
+
+def create_search_index(apps, schema_editor):
+    statements = {
+        "sqlite": SQLITE_CREATE,
+        "postgresql": POSTGRES_CREATE,
+    }.get(schema_editor.connection.vendor, [])
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor in ("sqlite", "postgresql"):
+        schema_editor.execute("DROP TABLE IF EXISTS menu_item_search")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("restaurants", "0002_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.0.14 on 2026-10-18 19:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("restaurants", "0003_menu_item_search"),
+        ("userprofile", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="restaurant",
+            name="owners",
+            field=models.ManyToManyField(
+                blank=True,
+                related_name="owned_restaurants",
+                to="userprofile.userprofile",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="orders",
+            index=models.Index(
+                fields=["user", "-created_at", "-id"], name="orders_user_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="orders",
+            index=models.Index(
+                fields=["waiter", "-created_at", "-id"],
+                name="orders_waiter_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="restaurant",
+            index=models.Index(
+                fields=["-created_at", "-id"], name="restaurant_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="review",
+            index=models.Index(
+                fields=["user", "-created_at", "-id"], name="reviews_user_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="review",
+            index=models.Index(
+                fields=["-created_at", "-id"], name="reviews_created_idx"
+            ),
+        ),
+    ]
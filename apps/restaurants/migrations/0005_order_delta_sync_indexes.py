@@ -0,0 +1,26 @@
+# Generated by Django 5.0.14 on 2026-10-18 19:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("restaurants", "0004_keyset_pagination_indexes"),
+        ("userprofile", "0002_alter_userprofile_restaurant"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="orders",
+            index=models.Index(
+                fields=["user", "updated_at", "id"], name="orders_user_updated_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="orders",
+            index=models.Index(
+                fields=["waiter", "updated_at", "id"], name="orders_waiter_updated_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,85 @@
+# Generated by Django 5.0.14 on 2026-10-18 19:14
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("restaurants", "0005_order_delta_sync_indexes"),
+        ("userprofile", "0002_alter_userprofile_restaurant"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OrderEvent",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "from_status",
+                    models.CharField(
+                        choices=[
+                            ("TAKING", "Order Taking"),
+                            ("PREPARING", "Preparing"),
+                            ("SERVING", "Serving"),
+                            ("COMPLETED", "Completed"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "to_status",
+                    models.CharField(
+                        choices=[
+                            ("TAKING", "Order Taking"),
+                            ("PREPARING", "Preparing"),
+                            ("SERVING", "Serving"),
+                            ("COMPLETED", "Completed"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(default=django.utils.timezone.now)),
+                (
+                    "actor",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="userprofile.userprofile",
+                    ),
+                ),
+                (
+                    "order",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="events",
+                        to="restaurants.orders",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "order_events",
+                "indexes": [
+                    models.Index(
+                        fields=["order", "created_at"], name="order_events_order_idx"
+                    ),
+                    models.Index(
+                        fields=["to_status", "created_at"],
+                        name="order_events_status_idx",
+                    ),
+                ],
+            },
+        ),
+    ]
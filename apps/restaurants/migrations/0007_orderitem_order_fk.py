@@ -0,0 +1,83 @@
+# Generated by Django 5.0.14 on 2026-10-18 19:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+BACKFILL_BATCH_SIZE = 10000
+
+
+def backfill_order_fk(apps, schema_editor):
+    """
+    Copy the order of every OrderItem from the M2M through table. The
+    migration is not atomic, so every id range is its own short UPDATE and
+    the table is never locked as a whole.
+    """
+    Orders = apps.get_model("restaurants", "Orders")
+    OrderItem = apps.get_model("restaurants", "OrderItem")
+    OrderLink = Orders.items.through
+    db_alias = schema_editor.connection.alias
+
+    bounds = OrderItem.objects.using(db_alias).aggregate(low=models.Min("id"), high=models.Max("id"))
+    if bounds["low"] is None:
+        return
+
+    order_id = Subquery(
+        OrderLink.objects.using(db_alias)
+        .filter(orderitem_id=OuterRef("pk"))
+        .order_by("orders_id")
+        .values("orders_id")[:1]
+    )
+    for start in range(bounds["low"], bounds["high"] + 1, BACKFILL_BATCH_SIZE):
+        OrderItem.objects.using(db_alias).filter(
+            id__gte=start, id__lt=start + BACKFILL_BATCH_SIZE, order__isnull=True
+        ).update(order_id=order_id)
+
+
+def restore_order_links(apps, schema_editor):
+    Orders = apps.get_model("restaurants", "Orders")
+    OrderItem = apps.get_model("restaurants", "OrderItem")
+    OrderLink = Orders.items.through
+    db_alias = schema_editor.connection.alias
+
+    links = (
+        OrderItem.objects.using(db_alias)
+        .filter(order__isnull=False)
+        .values_list("order_id", "id")
+        .iterator(chunk_size=BACKFILL_BATCH_SIZE)
+    )
+    batch = []
+    for orders_id, orderitem_id in links:
+        batch.append(OrderLink(orders_id=orders_id, orderitem_id=orderitem_id))
+        if len(batch) == BACKFILL_BATCH_SIZE:
+            OrderLink.objects.using(db_alias).bulk_create(batch)
+            batch = []
+    OrderLink.objects.using(db_alias).bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+    # Each backfill batch commits on its own.
+    atomic = False
+
+    dependencies = [
+        ("restaurants", "0006_order_event"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="orderitem",
+            name="order",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="order_items",
+                to="restaurants.orders",
+            ),
+        ),
+        migrations.RunPython(backfill_order_fk, restore_order_links),
+        migrations.RemoveField(
+            model_name="orders",
+            name="items",
+        ),
+    ]
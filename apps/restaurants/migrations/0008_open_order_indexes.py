@@ -0,0 +1,36 @@
+# Generated by Django 5.0.14 on 2026-10-18 19:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("restaurants", "0007_orderitem_order_fk"),
+        ("userprofile", "0002_alter_userprofile_restaurant"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="orders",
+            index=models.Index(
+                condition=models.Q(
+                    models.Q(("order_status", "COMPLETED"), _negated=True),
+                    ("order_cancelled", False),
+                ),
+                fields=["order_status", "created_at"],
+                name="orders_open_status_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="orders",
+            index=models.Index(
+                condition=models.Q(
+                    models.Q(("order_status", "COMPLETED"), _negated=True),
+                    ("order_cancelled", False),
+                ),
+                fields=["waiter", "order_status"],
+                name="orders_waiter_open_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,180 @@
+# Generated by Django 5.0.14 on 2026-10-18 19:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("restaurants", "0008_open_order_indexes"),
+        ("userprofile", "0002_alter_userprofile_restaurant"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="orderevent",
+            name="order",
+            field=models.ForeignKey(
+                db_constraint=False,
+                on_delete=django.db.models.deletion.DO_NOTHING,
+                related_name="events",
+                to="restaurants.orders",
+            ),
+        ),
+        migrations.CreateModel(
+            name="ArchivedOrder",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                (
+                    "order_type",
+                    models.CharField(
+                        choices=[
+                            ("DINE_IN", "Dine In"),
+                            ("TAKEAWAY", "Takeaway"),
+                            ("DELIVERY", "Delivery"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "order_status",
+                    models.CharField(
+                        choices=[
+                            ("TAKING", "Order Taking"),
+                            ("PREPARING", "Preparing"),
+                            ("SERVING", "Serving"),
+                            ("COMPLETED", "Completed"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "billing_first_name",
+                    models.CharField(blank=True, max_length=255, null=True),
+                ),
+                (
+                    "billing_last_name",
+                    models.CharField(blank=True, max_length=255, null=True),
+                ),
+                (
+                    "billing_email",
+                    models.EmailField(blank=True, max_length=254, null=True),
+                ),
+                (
+                    "billing_phone",
+                    models.CharField(blank=True, max_length=255, null=True),
+                ),
+                (
+                    "billing_address",
+                    models.CharField(blank=True, max_length=500, null=True),
+                ),
+                (
+                    "shipping_address",
+                    models.CharField(blank=True, max_length=500, null=True),
+                ),
+                ("ordered_date", models.DateTimeField(blank=True, null=True)),
+                ("total_price", models.DecimalField(decimal_places=2, max_digits=10)),
+                (
+                    "payment_status",
+                    models.CharField(
+                        choices=[
+                            ("Pending", "Pending"),
+                            ("Confirmed", "Confirmed"),
+                            ("Cancelled", "Cancelled"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("order_cancelled", models.BooleanField(default=False)),
+                ("ordered", models.BooleanField(default=False)),
+                ("created_at", models.DateTimeField()),
+                ("updated_at", models.DateTimeField()),
+                ("archived_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "table",
+                    models.ForeignKey(
+                        blank=True,
+                        db_constraint=False,
+                        null=True,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="+",
+                        to="restaurants.table",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="+",
+                        to="userprofile.userprofile",
+                    ),
+                ),
+                (
+                    "waiter",
+                    models.ForeignKey(
+                        blank=True,
+                        db_constraint=False,
+                        null=True,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="+",
+                        to="userprofile.userprofile",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "archived_orders",
+            },
+        ),
+        migrations.CreateModel(
+            name="ArchivedOrderItem",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("quantity", models.PositiveIntegerField(default=1)),
+                ("comments", models.TextField(blank=True, null=True)),
+                ("price", models.DecimalField(decimal_places=2, max_digits=10)),
+                ("created_at", models.DateTimeField()),
+                ("updated_at", models.DateTimeField()),
+                (
+                    "menu_item",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="+",
+                        to="restaurants.menuitem",
+                    ),
+                ),
+                (
+                    "order",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="order_items",
+                        to="restaurants.archivedorder",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "archived_order_items",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="archivedorder",
+            index=models.Index(
+                fields=["user", "-created_at", "-id"], name="archived_orders_user_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="archivedorder",
+            index=models.Index(
+                fields=["waiter", "-created_at", "-id"],
+                name="archived_orders_waiter_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="archivedorder",
+            index=models.Index(
+                fields=["-created_at"], name="archived_orders_created_idx"
+            ),
+        ),
+    ]
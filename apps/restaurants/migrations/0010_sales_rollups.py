@@ -0,0 +1,99 @@
+# Generated by Django 5.0.14 on 2026-10-18 19:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("restaurants", "0009_order_archive"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="HourlySalesRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("order_count", models.PositiveIntegerField(default=0)),
+                (
+                    "revenue",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+                ("items_sold", models.PositiveIntegerField(default=0)),
+                ("bucket", models.DateTimeField()),
+                (
+                    "restaurant",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="restaurants.restaurant",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "sales_rollup_hourly",
+            },
+        ),
+        migrations.CreateModel(
+            name="DailySalesRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("order_count", models.PositiveIntegerField(default=0)),
+                (
+                    "revenue",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+                ("items_sold", models.PositiveIntegerField(default=0)),
+                ("day", models.DateField()),
+                (
+                    "restaurant",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="restaurants.restaurant",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "sales_rollup_daily",
+                "indexes": [
+                    models.Index(fields=["day"], name="sales_rollup_daily_day_idx")
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="dailysalesrollup",
+            constraint=models.UniqueConstraint(
+                fields=("restaurant", "day"), name="sales_rollup_daily_uniq"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="hourlysalesrollup",
+            index=models.Index(
+                fields=["bucket"], name="sales_rollup_hourly_bucket_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="hourlysalesrollup",
+            constraint=models.UniqueConstraint(
+                fields=("restaurant", "bucket"), name="sales_rollup_hourly_uniq"
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.14 on 2026-10-18 19:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("restaurants", "0010_sales_rollups"),
+        ("userprofile", "0002_alter_userprofile_restaurant"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="orders",
+            index=models.Index(fields=["created_at", "id"], name="orders_created_idx"),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.0.14 on 2026-10-18 19:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("restaurants", "0011_orders_created_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MenuItemRecommendation",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[("together", "Frequently ordered together")],
+                        max_length=20,
+                    ),
+                ),
+                ("neighbours", models.JSONField(default=list)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "menu_item",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="recommendations",
+                        to="restaurants.menuitem",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "menu_item_recommendations",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="menuitemrecommendation",
+            constraint=models.UniqueConstraint(
+                fields=("menu_item", "kind"), name="menu_item_recommendation_unique"
+            ),
+        ),
+    ]
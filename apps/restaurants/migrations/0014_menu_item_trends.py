@@ -0,0 +1,39 @@
+# Generated by Django 5.0.14 on 2026-10-18 19:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("restaurants", "0013_rating_aggregates"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MenuItemTrend",
+            fields=[
+                (
+                    "menu_item",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="trend",
+                        serialize=False,
+                        to="restaurants.menuitem",
+                    ),
+                ),
+                ("score", models.FloatField(default=0)),
+                ("landmark", models.DateTimeField()),
+            ],
+            options={
+                "db_table": "menu_item_trends",
+            },
+        ),
+        migrations.AddField(
+            model_name="restaurant",
+            name="city",
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.0.14 on 2026-10-18 20:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("restaurants", "0014_menu_item_trends"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="menuitemrecommendation",
+            name="kind",
+            field=models.CharField(
+                choices=[
+                    ("together", "Frequently ordered together"),
+                    ("similar", "Similar ingredients"),
+                ],
+                max_length=20,
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.14 on 2026-10-18 20:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("restaurants", "0015_similar_item_recommendations"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="restaurant",
+            name="similar_items_stale",
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -1,3 +1,4 @@
+from .ratings import *
 from .restaurants import *
 from .carts import *
 from .orders import *
@@ -5,4 +6,8 @@ from .payments import *
 from .menus import *
 from .tables import *
 from .category import *
-from .reviews import *
\ No newline at end of file
+from .reviews import *
+from .archive import *
+from .rollups import *
+from .recommendations import *
+from .trending import *
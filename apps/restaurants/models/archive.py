@@ -0,0 +1,69 @@
+from django.db import models
+
+from apps.restaurants.models.orders import ORDER_STATUS, PAYMENT_STATUS, Orders
+
+
+class ArchivedOrder(models.Model):
+    """
+    Cold copy of a completed order, moved out of Orders by the
+    ``archive_orders`` command. Keeps the original id and timestamps so
+    history cursors stay valid across the move. Foreign keys carry no
+    database constraint: archived rows must never block deleting or
+    cascading live data.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey('userprofile.UserProfile', on_delete=models.DO_NOTHING,
+                             db_constraint=False, related_name='+')
+    order_type = models.CharField(max_length=20, choices=Orders.ORDER_TYPES)
+    table = models.ForeignKey('restaurants.Table', on_delete=models.DO_NOTHING,
+                              db_constraint=False, null=True, blank=True, related_name='+')
+    waiter = models.ForeignKey('userprofile.UserProfile', on_delete=models.DO_NOTHING,
+                               db_constraint=False, null=True, blank=True, related_name='+')
+    order_status = models.CharField(max_length=20, choices=ORDER_STATUS)
+    billing_first_name = models.CharField(max_length=255, blank=True, null=True)
+    billing_last_name = models.CharField(max_length=255, blank=True, null=True)
+    billing_email = models.EmailField(blank=True, null=True)
+    billing_phone = models.CharField(max_length=255, blank=True, null=True)
+    billing_address = models.CharField(max_length=500, blank=True, null=True)
+    shipping_address = models.CharField(max_length=500, blank=True, null=True)
+    ordered_date = models.DateTimeField(null=True, blank=True)
+    total_price = models.DecimalField(max_digits=10, decimal_places=2)
+    payment_status = models.CharField(max_length=20, choices=PAYMENT_STATUS)
+    order_cancelled = models.BooleanField(default=False)
+    ordered = models.BooleanField(default=False)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Archived order {self.id} ({self.order_type})"
+
+    class Meta:
+        db_table = 'archived_orders'
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-id'], name='archived_orders_user_idx'),
+            models.Index(fields=['waiter', '-created_at', '-id'], name='archived_orders_waiter_idx'),
+            models.Index(fields=['-created_at'], name='archived_orders_created_idx'),
+        ]
+
+
+class ArchivedOrderItem(models.Model):
+    """
+    Cold copy of an OrderItem, stored with its ArchivedOrder.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    order = models.ForeignKey('restaurants.ArchivedOrder', on_delete=models.CASCADE,
+                              related_name='order_items')
+    menu_item = models.ForeignKey('restaurants.MenuItem', on_delete=models.DO_NOTHING,
+                                  db_constraint=False, related_name='+')
+    quantity = models.PositiveIntegerField(default=1)
+    comments = models.TextField(blank=True, null=True)
+    price = models.DecimalField(max_digits=10, decimal_places=2)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.quantity} x item {self.menu_item_id} (archived order {self.order_id})"
+
+    class Meta:
+        db_table = 'archived_order_items'
@@ -1,7 +1,28 @@
 from django.db import models
 from apps import userprofile, restaurants
 from coresite.mixin import AbstractTimeStampModel
-from django.db.models import F, Sum, DecimalField
+from django.db.models import F, Sum, DecimalField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils.timezone import now
+
+
+def cart_total_subquery():
+    """
+    SUM(quantity * price) of the lines of the cart referenced by OuterRef('pk'),
+    0 for an empty cart.
+    """
+    totals = (
+        CartItem.objects
+        .filter(cart=OuterRef("pk"))
+        .values("cart")
+        .annotate(total=Sum(F("quantity") * F("price")))
+        .values("total")
+    )
+    return Coalesce(
+        Subquery(totals),
+        Value(0),
+        output_field=DecimalField(max_digits=10, decimal_places=2),
+    )
 
 
 class Cart(AbstractTimeStampModel):
@@ -15,21 +36,25 @@ class Cart(AbstractTimeStampModel):
     def __str__(self):
         return f"Cart for {self.user.first_name} {self.user.last_name}"
 
-    def update_total_price(self):
-        total = (
-            self.cart_items.annotate(
-                subtotal=F("quantity") * F("price")
+    def apply_total_delta(self, delta):
+        """
+        Shift the stored total by ``delta`` in a single UPDATE. The addition
+        happens in the database, so concurrent mutations of the same cart
+        never overwrite each other's totals.
+        """
+        if delta:
+            Cart.objects.filter(pk=self.pk).update(
+                total_price=F("total_price") + delta, updated_at=now()
             )
-            .aggregate(
-                total=Sum(
-                    "subtotal",
-                    output_field=DecimalField(max_digits=10, decimal_places=2)
-                )
-            )
-            .get("total")
-        )
-        self.total_price = total or 0
-        self.save()
+        self.refresh_from_db(fields=["total_price", "updated_at"])
+
+    def update_total_price(self):
+        """
+        Recompute the total from the cart lines in a single UPDATE. Only
+        needed to repair drift; mutations use apply_total_delta.
+        """
+        Cart.objects.filter(pk=self.pk).update(total_price=cart_total_subquery(), updated_at=now())
+        self.refresh_from_db(fields=["total_price", "updated_at"])
 
 
 class CartItem(AbstractTimeStampModel):
@@ -45,5 +70,9 @@ class CartItem(AbstractTimeStampModel):
     def __str__(self):
         return f"{self.quantity} x {self.menu_item.name} in {self.cart}"
 
+    @property
+    def line_total(self):
+        return self.price * self.quantity
+
     class Meta:
         unique_together = ("cart", "menu_item")
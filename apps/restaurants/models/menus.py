@@ -2,6 +2,29 @@ from django.db import models
 from apps import restaurants
 from coresite.mixin import AbstractTimeStampModel
 
+from .ratings import RatingAggregates
+
+
+class MenuQuerySet(models.QuerySet):
+    """
+    QuerySet helpers for reading menus together with their nested items.
+    """
+
+    def with_tree(self, item_ordering=('id',)):
+        """
+        Load menus, their items, item categories and ingredients in a fixed
+        number of queries (one per level) regardless of the menu size.
+        """
+        items = (
+            MenuItem.objects
+            .select_related('category')
+            .prefetch_related('ingredients')
+            .order_by(*item_ordering)
+        )
+        return self.prefetch_related(
+            models.Prefetch('menu_items', queryset=items)
+        ).order_by('id')
+
 
 class Menu(AbstractTimeStampModel):
     """
@@ -11,10 +34,13 @@ class Menu(AbstractTimeStampModel):
                                    related_name='menus', on_delete=models.CASCADE)
     name = models.CharField(max_length=255)
     description = models.TextField(blank=True, null=True)
+
+    objects = MenuQuerySet.as_manager()
+
     def __str__(self):
         return f"{self.name} - {self.restaurant.name}"
 
-class MenuItem(AbstractTimeStampModel):
+class MenuItem(AbstractTimeStampModel, RatingAggregates):
     """
     Model representing a models item.
     """
@@ -36,6 +62,11 @@ class MenuItem(AbstractTimeStampModel):
     def __str__(self):
         return f"{self.name} - {self.menu.name}"
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['menu', '-rating_average', '-id'], name='menu_item_rating_idx'),
+        ]
+
 class MenuItemIngredient(AbstractTimeStampModel):
     """
     Model representing an ingredient for a models item.
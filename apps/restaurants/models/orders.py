@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils.timezone import now
 
 from apps import restaurants
 from apps.userprofile.models import UserProfile
@@ -6,6 +7,8 @@ from coresite.mixin import AbstractTimeStampModel
 
 
 class OrderItem(AbstractTimeStampModel):
+    order = models.ForeignKey('restaurants.Orders', on_delete=models.CASCADE,
+                              null=True, blank=True, related_name='order_items')
     menu_item = models.ForeignKey('restaurants.MenuItem', on_delete=models.CASCADE, related_name='menu_item_order_items')
     quantity = models.PositiveIntegerField(default=1)
     comments = models.TextField(blank=True, null=True)
@@ -33,6 +36,20 @@ ORDER_STATUS = (
     ("COMPLETED", "Completed"),
 )
 
+# Orders still on a status board. Queries must repeat this predicate
+# verbatim (use Orders.objects.open()) for the partial indexes to apply.
+OPEN_ORDERS = ~models.Q(order_status="COMPLETED") & models.Q(order_cancelled=False)
+
+
+class OrdersQuerySet(models.QuerySet):
+
+    def open(self):
+        """
+        Orders that are neither completed nor cancelled.
+        """
+        return self.filter(OPEN_ORDERS)
+
+
 class Orders(AbstractTimeStampModel):
     ORDER_TYPES = (
         ("DINE_IN", "Dine In"),
@@ -41,7 +58,6 @@ class Orders(AbstractTimeStampModel):
     )
 
     user = models.ForeignKey(UserProfile, on_delete=models.CASCADE, related_name="orders")
-    items = models.ManyToManyField(OrderItem)
 
     # Distinguish order types
     order_type = models.CharField(max_length=20, choices=ORDER_TYPES, default="DINE_IN")
@@ -72,5 +88,51 @@ class Orders(AbstractTimeStampModel):
     order_cancelled = models.BooleanField(default=False)
     ordered = models.BooleanField(default=False)
 
+    objects = OrdersQuerySet.as_manager()
+
     def __str__(self):
         return f"Order {self.id} ({self.order_type})"
+
+    class Meta:
+        indexes = [
+            # Keyset pagination of order history and waiter queues
+            models.Index(fields=['user', '-created_at', '-id'], name='orders_user_created_idx'),
+            models.Index(fields=['waiter', '-created_at', '-id'], name='orders_waiter_created_idx'),
+            # Delta sync (?since=) of the same lists
+            models.Index(fields=['user', 'updated_at', 'id'], name='orders_user_updated_idx'),
+            models.Index(fields=['waiter', 'updated_at', 'id'], name='orders_waiter_updated_idx'),
+            # Date range exports
+            models.Index(fields=['created_at', 'id'], name='orders_created_idx'),
+            # Kitchen/status boards and a waiter's open tickets. Partial, so
+            # they stay small however many completed orders pile up.
+            models.Index(fields=['order_status', 'created_at'], condition=OPEN_ORDERS,
+                         name='orders_open_status_idx'),
+            models.Index(fields=['waiter', 'order_status'], condition=OPEN_ORDERS,
+                         name='orders_waiter_open_idx'),
+        ]
+
+
+class OrderEvent(models.Model):
+    """
+    Append-only log of order status transitions. Kept narrow (no
+    updated_at) so ETA and analytics queries can scan it instead of Orders.
+    The order reference has no database constraint so the log outlives
+    orders moved to the archive.
+    """
+    order = models.ForeignKey('restaurants.Orders', on_delete=models.DO_NOTHING,
+                              db_constraint=False, related_name='events')
+    from_status = models.CharField(max_length=20, choices=ORDER_STATUS)
+    to_status = models.CharField(max_length=20, choices=ORDER_STATUS)
+    actor = models.ForeignKey(UserProfile, on_delete=models.SET_NULL, null=True, blank=True,
+                              related_name='+')
+    created_at = models.DateTimeField(default=now)
+
+    def __str__(self):
+        return f"Order {self.order_id}: {self.from_status} -> {self.to_status}"
+
+    class Meta:
+        db_table = 'order_events'
+        indexes = [
+            models.Index(fields=['order', 'created_at'], name='order_events_order_idx'),
+            models.Index(fields=['to_status', 'created_at'], name='order_events_status_idx'),
+        ]
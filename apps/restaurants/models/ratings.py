@@ -0,0 +1,75 @@
+from django.db import models
+from django.db.models import Case, F, FloatField, Value, When
+from django.db.models.functions import Cast, Greatest
+from django.db.models.lookups import GreaterThan
+
+RATING_VALUES = (1, 2, 3, 4, 5)
+
+
+class RatingAggregates(models.Model):
+    """
+    Denormalized review statistics: number of reviews, sum of their rates,
+    a 1-5 histogram and the resulting average, kept current with F() deltas
+    (see ``rating_delta_updates``) so that listing ratings never reads the
+    reviews themselves.
+    """
+    rating_count = models.PositiveIntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0)
+    rating_1 = models.PositiveIntegerField(default=0)
+    rating_2 = models.PositiveIntegerField(default=0)
+    rating_3 = models.PositiveIntegerField(default=0)
+    rating_4 = models.PositiveIntegerField(default=0)
+    rating_5 = models.PositiveIntegerField(default=0)
+    rating_average = models.FloatField(default=0)
+
+    class Meta:
+        abstract = True
+
+    @property
+    def rating_histogram(self):
+        return {str(rate): getattr(self, f"rating_{rate}") for rate in RATING_VALUES}
+
+
+def _shifted(field, delta):
+    """
+    F(field) + delta, clamped at 0 when decrementing so that a counter that
+    drifted (e.g. a review added outside the API) cannot break the write.
+    """
+    expression = F(field) + delta
+    return Greatest(expression, Value(0)) if delta < 0 else expression
+
+
+def rating_delta_updates(removed=None, added=None):
+    """
+    ``QuerySet.update()`` kwargs that take a review rated ``removed`` out of
+    the aggregates and put one rated ``added`` in (either may be None).
+    Every expression reads the pre-update row, so the update is a single
+    atomic statement with no read beforehand.
+    """
+    if removed == added:
+        return {}
+
+    count_delta = (added is not None) - (removed is not None)
+    sum_delta = (added or 0) - (removed or 0)
+    new_count = _shifted("rating_count", count_delta)
+    new_sum = _shifted("rating_sum", sum_delta)
+
+    updates = {
+        "rating_average": Case(
+            When(
+                GreaterThan(new_count, 0),
+                then=Cast(new_sum, FloatField()) / Cast(new_count, FloatField()),
+            ),
+            default=Value(0.0),
+            output_field=FloatField(),
+        ),
+    }
+    if count_delta:
+        updates["rating_count"] = new_count
+    if sum_delta:
+        updates["rating_sum"] = new_sum
+    if removed is not None:
+        updates[f"rating_{removed}"] = _shifted(f"rating_{removed}", -1)
+    if added is not None:
+        updates[f"rating_{added}"] = _shifted(f"rating_{added}", 1)
+    return updates
@@ -0,0 +1,32 @@
+from django.db import models
+
+
+RECOMMENDATION_KINDS = (
+    ("together", "Frequently ordered together"),
+    ("similar", "Similar ingredients"),
+)
+
+
+class MenuItemRecommendation(models.Model):
+    """
+    Precomputed top-k neighbours of a menu item: items ordered together
+    with it (``build_item_recommendations``) or with similar ingredients
+    (``build_similar_items``, redone per restaurant after ingredients
+    change). ``neighbours`` is a list of ``[menu_item_id, score]`` pairs,
+    best first, all from the same restaurant, so serving suggestions is one
+    indexed lookup per item.
+    """
+    menu_item = models.ForeignKey('restaurants.MenuItem', on_delete=models.CASCADE,
+                                  related_name='recommendations')
+    kind = models.CharField(max_length=20, choices=RECOMMENDATION_KINDS)
+    neighbours = models.JSONField(default=list)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.menu_item_id} ({self.kind}): {len(self.neighbours)} neighbours"
+
+    class Meta:
+        db_table = 'menu_item_recommendations'
+        constraints = [
+            models.UniqueConstraint(fields=['menu_item', 'kind'], name='menu_item_recommendation_unique'),
+        ]
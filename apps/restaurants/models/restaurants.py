@@ -3,8 +3,10 @@ from django.db import models
 from apps import restaurants, userprofile
 from coresite.mixin import AbstractTimeStampModel
 
+from .ratings import RatingAggregates
 
-class Restaurant(AbstractTimeStampModel):
+
+class Restaurant(AbstractTimeStampModel, RatingAggregates):
     """
     Model representing a restaurant.
     """
@@ -17,12 +19,22 @@ class Restaurant(AbstractTimeStampModel):
     name = models.CharField(max_length=255, unique=True)
     description = models.TextField(blank=True, null=True)
     address = models.CharField(max_length=255, blank=True, null=True)
+    city = models.CharField(max_length=100, blank=True, null=True)
     phone_number = models.CharField(max_length=20, blank=True, null=True)
     email = models.EmailField(blank=True, null=True)
+    # Ingredients changed since the "similar ingredients" lists were built;
+    # `manage.py build_similar_items --pending` rebuilds these restaurants
+    similar_items_stale = models.BooleanField(default=False)
 
     def __str__(self):
         return self.name
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='restaurant_created_idx'),
+            models.Index(fields=['-rating_average', '-id'], name='restaurant_rating_idx'),
+        ]
+
 class RestaurantImage(AbstractTimeStampModel):
     """
     Model representing an image of a restaurant.
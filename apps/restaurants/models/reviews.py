@@ -27,3 +27,7 @@ class Review(AbstractTimeStampModel):
         db_table = 'reviews'
         verbose_name = 'Review'
         verbose_name_plural = 'Reviews'
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-id'], name='reviews_user_created_idx'),
+            models.Index(fields=['-created_at', '-id'], name='reviews_created_idx'),
+        ]
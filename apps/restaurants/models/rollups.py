@@ -0,0 +1,53 @@
+from django.db import models
+
+
+class SalesRollup(models.Model):
+    """
+    Pre-aggregated sales of one restaurant over one time bucket. Kept up to
+    date incrementally as orders are placed or cancelled and rebuilt by
+    ``rebuild_sales_rollups``.
+    """
+    restaurant = models.ForeignKey('restaurants.Restaurant', on_delete=models.CASCADE,
+                                   related_name='+')
+    order_count = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    items_sold = models.PositiveIntegerField(default=0)
+
+    @property
+    def average_ticket(self):
+        return self.revenue / self.order_count if self.order_count else 0
+
+    class Meta:
+        abstract = True
+
+
+class HourlySalesRollup(SalesRollup):
+    bucket = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.restaurant_id} @ {self.bucket:%Y-%m-%d %H}:00"
+
+    class Meta:
+        db_table = 'sales_rollup_hourly'
+        constraints = [
+            models.UniqueConstraint(fields=['restaurant', 'bucket'], name='sales_rollup_hourly_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['bucket'], name='sales_rollup_hourly_bucket_idx'),
+        ]
+
+
+class DailySalesRollup(SalesRollup):
+    day = models.DateField()
+
+    def __str__(self):
+        return f"{self.restaurant_id} @ {self.day}"
+
+    class Meta:
+        db_table = 'sales_rollup_daily'
+        constraints = [
+            models.UniqueConstraint(fields=['restaurant', 'day'], name='sales_rollup_daily_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['day'], name='sales_rollup_daily_day_idx'),
+        ]
@@ -0,0 +1,22 @@
+from django.db import models
+
+
+class MenuItemTrend(models.Model):
+    """
+    Exponentially time-decayed popularity of a menu item, kept with forward
+    decay: ``score`` is the sum of ``quantity * exp(rate * (ordered_at - landmark))``
+    over its orders, so adding an order is a single increment and the
+    popularity at time ``t`` is ``score * exp(-rate * (t - landmark))``.
+    The row moves to a newer landmark on the first order after the landmark
+    changes (see ``apps.restaurants.utils.trending``).
+    """
+    menu_item = models.OneToOneField('restaurants.MenuItem', on_delete=models.CASCADE,
+                                     primary_key=True, related_name='trend')
+    score = models.FloatField(default=0)
+    landmark = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.menu_item_id}: {self.score:.3f} @ {self.landmark:%Y-%m-%d %H:%M}"
+
+    class Meta:
+        db_table = 'menu_item_trends'
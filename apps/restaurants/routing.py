@@ -0,0 +1,7 @@
+from django.urls import path
+
+from apps.restaurants.consumers import OrderFeedConsumer
+
+websocket_urlpatterns = [
+    path('ws/orders/', OrderFeedConsumer.as_asgi()),
+]
@@ -20,4 +20,29 @@ class CartSerializer(serializers.ModelSerializer):
     class Meta:
         model = Cart
         fields = ['id', 'user', 'total_price', 'cart_items']
-        read_only_fields = ['id', 'user', 'total_price']
\ No newline at end of file
+        read_only_fields = ['id', 'user', 'total_price']
+
+class CartOperationSerializer(serializers.Serializer):
+    """
+    One add/update/remove step of a batch cart mutation.
+    """
+    OPERATIONS = ('add', 'update', 'remove')
+
+    op = serializers.ChoiceField(choices=OPERATIONS)
+    menu_item = serializers.IntegerField()
+    quantity = serializers.IntegerField(min_value=0, required=False, default=1)
+    comments = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+
+    def validate(self, attrs):
+        if attrs['op'] == 'add' and attrs['quantity'] < 1:
+            raise serializers.ValidationError({'quantity': 'Must be at least 1 when adding.'})
+        return attrs
+
+
+class CartBatchSerializer(serializers.Serializer):
+    """
+    Serializer for a list of cart operations applied in order.
+    """
+    operations = serializers.ListField(
+        child=CartOperationSerializer(), allow_empty=False, max_length=100
+    )
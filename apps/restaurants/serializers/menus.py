@@ -29,6 +29,7 @@ class RestaurantSerializer(serializers.ModelSerializer):
     image = serializers.ImageField(write_only=True, required=False)  # 👈 new
     owners = UserProfileUserNameSerializer(many=True, read_only=True)
     waiters = UserProfileUserNameSerializer(many=True, read_only=True)
+    rating_histogram = serializers.ReadOnlyField()
 
     class Meta:
         model = Restaurant
@@ -37,14 +38,18 @@ class RestaurantSerializer(serializers.ModelSerializer):
             'name',
             'description',
             'address',
+            'city',
             'phone_number',
             'email',
             'images',
             'image',
             'owners',
             'waiters',
+            'rating_count',
+            'rating_average',
+            'rating_histogram',
         ]
-        read_only_fields = ['id', 'images']
+        read_only_fields = ['id', 'images', 'rating_count', 'rating_average']
 
     def create(self, validated_data):
         image = validated_data.pop('image', None)
@@ -96,10 +101,17 @@ class MenuItemSerializer(serializers.ModelSerializer):
     Serializer for MenuItem model.
     """
     ingredients = MenuItemIngredientSerializer(many=True, read_only=True)
+    category_name = serializers.CharField(source='category.name', read_only=True, default=None)
+    rating_histogram = serializers.ReadOnlyField()
+
     class Meta:
         model = MenuItem
-        fields = ['id', 'menu', 'name', 'image', 'description', 'price', 'ingredients']
-        read_only_fields = ['id', 'menu']
+        fields = [
+            'id', 'menu', 'name', 'image', 'description', 'price',
+            'category', 'category_name', 'ingredients',
+            'rating_count', 'rating_average', 'rating_histogram',
+        ]
+        read_only_fields = ['id', 'menu', 'rating_count', 'rating_average']
 
 class MenuSerializer(serializers.ModelSerializer):
     """
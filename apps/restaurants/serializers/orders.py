@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from apps.restaurants.models import Orders, OrderItem
+from apps.restaurants.models import Orders, OrderItem, ORDER_STATUS
 
 
 class OrderItemSerializer(serializers.ModelSerializer):
@@ -11,7 +11,7 @@ class OrderItemSerializer(serializers.ModelSerializer):
         fields = "__all__"
 
 class OrderDetailSerializer(serializers.ModelSerializer):
-    items = OrderItemSerializer(many=True, read_only=True)
+    items = OrderItemSerializer(source='order_items', many=True, read_only=True)
 
     class Meta:
         model = Orders
@@ -26,4 +26,28 @@ class OrderSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Orders
-        fields = "__all__"
\ No newline at end of file
+        fields = "__all__"
+
+class OrderStatusTransitionSerializer(serializers.Serializer):
+    """
+    Serializer for moving many orders to the next status at once.
+    """
+    orders = serializers.ListField(
+        child=serializers.IntegerField(), allow_empty=False, max_length=500
+    )
+    order_status = serializers.ChoiceField(choices=ORDER_STATUS)
+
+
+class OrderExportSerializer(serializers.Serializer):
+    """
+    Query parameters of the order export.
+    """
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+    output = serializers.ChoiceField(choices=("csv", "ndjson"), default="csv")
+    gzip = serializers.BooleanField(default=False)
+
+    def validate(self, attrs):
+        if attrs.get("start") and attrs.get("end") and attrs["start"] > attrs["end"]:
+            raise serializers.ValidationError({"end": "end must not be before start."})
+        return attrs
@@ -1,6 +1,8 @@
+from django.db import transaction
 from rest_framework import serializers
 
 from apps.restaurants.models import Review
+from apps.restaurants.utils import apply_review_rating
 
 
 class ReviewSerializer(serializers.ModelSerializer):
@@ -24,4 +26,18 @@ class CreateReviewSerializer(serializers.ModelSerializer):
         request = self.context.get('request')
         if request and hasattr(request, "user"):
             validated_data['user'] = request.user.profile
-        return super().create(validated_data)
\ No newline at end of file
+        with transaction.atomic():
+            review = super().create(validated_data)
+            apply_review_rating(review.order_id, added=review.rate)
+        return review
+
+    def update(self, instance, validated_data):
+        old_order_id, old_rate = instance.order_id, instance.rate
+        with transaction.atomic():
+            review = super().update(instance, validated_data)
+            if review.order_id != old_order_id:
+                apply_review_rating(old_order_id, removed=old_rate)
+                apply_review_rating(review.order_id, added=review.rate)
+            else:
+                apply_review_rating(review.order_id, removed=old_rate, added=review.rate)
+        return review
@@ -0,0 +1,161 @@
+from functools import partial, update_wrapper
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_init, post_save, post_delete, pre_delete
+from django.dispatch import receiver
+
+from apps.restaurants.models import (
+    Menu, MenuItem, MenuItemIngredient, Category, Orders, Restaurant, RestaurantImage,
+)
+from apps.restaurants.utils import (
+    invalidate_menu_snapshots,
+    invalidate_top_suggestions,
+    index_menu_items,
+    remove_menu_items,
+    publish_order_events,
+    record_order_sales,
+    record_order_trends,
+    mark_similar_items_stale,
+    ORDER_CREATED,
+    ORDER_STATUS_CHANGED,
+)
+from apps.userprofile.models import UserProfile
+
+
+def _invalidate_on_commit(restaurant_ids):
+    restaurant_ids = [rid for rid in restaurant_ids if rid is not None]
+    if restaurant_ids:
+        transaction.on_commit(partial(invalidate_menu_snapshots, restaurant_ids))
+
+
+def _on_commit_robust(func, *args):
+    # A failure is logged rather than raised into the request that committed.
+    # Django logs the callback's __qualname__, which a bare partial lacks.
+    transaction.on_commit(update_wrapper(partial(func, *args), func), robust=True)
+
+
+@receiver([post_save, post_delete], sender=Menu)
+def invalidate_menu_snapshot_for_menu(sender, instance, **kwargs):
+    _invalidate_on_commit([instance.restaurant_id])
+
+
+@receiver([post_save, post_delete], sender=MenuItem)
+def invalidate_menu_snapshot_for_menu_item(sender, instance, **kwargs):
+    _invalidate_on_commit(
+        Menu.objects.filter(pk=instance.menu_id).values_list('restaurant_id', flat=True)[:1]
+    )
+
+
+@receiver([post_save, post_delete], sender=MenuItemIngredient)
+def invalidate_menu_snapshot_for_ingredient(sender, instance, **kwargs):
+    _invalidate_on_commit(
+        MenuItem.objects.filter(pk=instance.menu_item_id)
+        .values_list('menu__restaurant_id', flat=True)[:1]
+    )
+
+
+@receiver(post_save, sender=Category)
+@receiver(pre_delete, sender=Category)
+def invalidate_menu_snapshot_for_category(sender, instance, **kwargs):
+    # Resolved before deletion: SET_NULL detaches the items without signals.
+    _invalidate_on_commit(
+        MenuItem.objects.filter(category=instance)
+        .values_list('menu__restaurant_id', flat=True).distinct()
+    )
+
+
+@receiver([post_save, post_delete], sender=Restaurant)
+@receiver([post_save, post_delete], sender=RestaurantImage)
+@receiver([post_save, post_delete], sender=UserProfile)
+def invalidate_top_suggestions_for_restaurant(sender, instance, **kwargs):
+    # Profiles are listed as owners and waiters of the suggested restaurants
+    transaction.on_commit(invalidate_top_suggestions)
+
+
+@receiver(m2m_changed, sender=Restaurant.owners.through)
+def invalidate_top_suggestions_for_owners(sender, action, **kwargs):
+    if action.startswith('post_'):
+        transaction.on_commit(invalidate_top_suggestions)
+
+
+@receiver(post_save, sender=MenuItem)
+def index_menu_item(sender, instance, **kwargs):
+    transaction.on_commit(partial(index_menu_items, [instance.pk]))
+
+
+@receiver(post_delete, sender=MenuItem)
+def unindex_menu_item(sender, instance, **kwargs):
+    transaction.on_commit(partial(remove_menu_items, [instance.pk]))
+
+
+@receiver([post_save, post_delete], sender=MenuItemIngredient)
+def reindex_menu_item_for_ingredient(sender, instance, **kwargs):
+    transaction.on_commit(partial(index_menu_items, [instance.menu_item_id]))
+
+
+@receiver([post_save, post_delete], sender=MenuItemIngredient)
+def mark_similar_items_for_ingredient(sender, instance, **kwargs):
+    # Ingredient weights depend on the whole menu: the restaurant is rebuilt
+    # by `build_similar_items --pending`, once however many rows changed
+    mark_similar_items_stale(
+        MenuItem.objects.filter(pk=instance.menu_item_id).values('menu__restaurant_id')
+    )
+
+
+@receiver(post_delete, sender=MenuItem)
+def mark_similar_items_for_menu_item(sender, instance, **kwargs):
+    mark_similar_items_stale(Menu.objects.filter(pk=instance.menu_id).values('restaurant_id'))
+
+
+@receiver(post_save, sender=Category)
+@receiver(pre_delete, sender=Category)
+def reindex_menu_items_for_category(sender, instance, **kwargs):
+    menu_item_ids = list(
+        MenuItem.objects.filter(category=instance).values_list('id', flat=True)
+    )
+    if menu_item_ids:
+        transaction.on_commit(partial(index_menu_items, menu_item_ids))
+
+
+def _counts_for_sales(order):
+    # Placed and not cancelled; None when either field was deferred
+    values = order.__dict__
+    if 'ordered' not in values or 'order_cancelled' not in values:
+        return None
+    return values['ordered'] and not values['order_cancelled']
+
+
+@receiver(post_init, sender=Orders)
+def remember_order_status(sender, instance, **kwargs):
+    # Read from __dict__ so deferred loads do not trigger a query.
+    instance._feed_status = instance.__dict__.get('order_status')
+    instance._sales_counted = _counts_for_sales(instance)
+
+
+@receiver(post_save, sender=Orders)
+def publish_order_change(sender, instance, created, **kwargs):
+    previous = instance._feed_status
+    instance._feed_status = instance.order_status
+    if created:
+        _on_commit_robust(publish_order_events, [instance], ORDER_CREATED)
+    elif previous is not None and previous != instance.order_status:
+        _on_commit_robust(
+            publish_order_events, [instance], ORDER_STATUS_CHANGED, {instance.pk: previous}
+        )
+
+
+@receiver(post_save, sender=Orders)
+def record_placed_order_sales(sender, instance, created, **kwargs):
+    # On commit, once checkout has written the order items. Placing adds the
+    # order to the rollups, cancelling takes it out again.
+    previous = False if created else instance._sales_counted
+    counted = _counts_for_sales(instance)
+    instance._sales_counted = counted
+    if previous is not None and counted is not None and previous != counted:
+        _on_commit_robust(record_order_sales, instance.pk, not counted)
+
+
+@receiver(post_save, sender=Orders)
+def record_placed_order_trends(sender, instance, created, **kwargs):
+    if created and instance.ordered:
+        _on_commit_robust(record_order_trends, instance.pk)
@@ -0,0 +1,17 @@
+from .menus import MenuTreeAPITestCase, MenuSnapshotAPITestCase
+from .search import MenuItemSearchAPITestCase
+from .pagination import KeysetPaginationTestCase, DeltaSyncTestCase
+from .orders import OrderCheckoutAPITestCase
+from .carts import CartTotalsAPITestCase, CartBatchAPITestCase
+from .order_feed import OrderFeedConsumerTestCase
+from .order_status import OrderStatusTransitionTestCase
+from .indexes import HotQueryIndexTestCase
+from .archive import OrderArchiveTestCase
+from .rollups import SalesRollupTestCase
+from .analytics import OwnerAnalyticsTestCase
+from .recommendations import ItemRecommendationTestCase
+from .personal_recommendations import PersonalRecommendationTestCase
+from .analyzer_cache import AnalyzerFileCacheTestCase, AnalyzerTablesTestCase
+from .ratings import RestaurantRatingPipelineTestCase, RatingAggregatesAPITestCase
+from .trending import TrendingItemsTestCase
+from .similar_items import SimilarItemsTestCase
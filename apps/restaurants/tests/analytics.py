@@ -0,0 +1,188 @@
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.restaurants.models import Cart, CartItem, OrderItem, Orders
+from apps.restaurants.utils import (
+    item_ranking,
+    load_sales_columns,
+    order_heatmap,
+    refresh_sales_columns,
+    sales_summary,
+)
+from .helper.fixtures_helper import create_profile, create_menu_items
+
+
+class OwnerAnalyticsTestCase(TestCase):
+    def setUp(self):
+        data_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, data_dir, ignore_errors=True)
+        settings_override = override_settings(ANALYTICS_DATA_DIR=data_dir, ANALYTICS_RESCAN_LINES=1000)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.customer = create_profile('customer')
+        self.pizza, self.pasta = create_menu_items(2, price=Decimal('8.00'))
+        self.restaurant = self.pizza.menu.restaurant
+        self.other = create_menu_items(1)[0]
+
+        self.owner = create_profile('owner', user_type='restaurant_owner')
+        self.restaurant.owners.add(self.owner)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.owner.user)
+
+    def checkout(self, lines):
+        customer_client = APIClient()
+        customer_client.force_authenticate(user=self.customer.user)
+        cart, _ = Cart.objects.get_or_create(user=self.customer)
+        for menu_item, quantity in lines:
+            CartItem.objects.create(cart=cart, menu_item=menu_item, quantity=quantity, price=menu_item.price)
+        cart.update_total_price()
+        with self.captureOnCommitCallbacks(execute=True):
+            response = customer_client.post(reverse('checkout-order'), {'order_type': 'TAKEAWAY'}, format='json')
+        return Orders.objects.get(pk=response.data['id'])
+
+    def url(self, name, restaurant=None):
+        return reverse(name, args=[(restaurant or self.restaurant).pk])
+
+    def refresh(self, *args):
+        call_command('refresh_owner_analytics', *args, stdout=StringIO())
+
+    def test_item_ranking_and_summary(self):
+        self.checkout([(self.pizza, 1), (self.pasta, 3), (self.other, 5)])
+        self.checkout([(self.pizza, 1)])
+        self.refresh()
+
+        response = self.client.get(self.url('owner-analytics-items'))
+        self.assertEqual(response.status_code, 200)
+        ranking = [(row['menu_item'], row['quantity'], row['revenue']) for row in response.data['results']]
+        self.assertEqual(ranking, [(self.pasta.pk, 3, Decimal('24')), (self.pizza.pk, 2, Decimal('16'))])
+
+        response = self.client.get(self.url('owner-analytics-summary'))
+        self.assertEqual(response.data['order_count'], 2)
+        self.assertEqual(response.data['revenue'], Decimal('40'))
+        self.assertEqual(response.data['items_sold'], 5)
+        self.assertEqual(response.data['average_ticket'], Decimal('20.00'))
+
+    def test_refresh_appends_only_new_items(self):
+        self.checkout([(self.pizza, 1)])
+        self.assertEqual(refresh_sales_columns(self.restaurant.pk), 1)
+        self.assertEqual(refresh_sales_columns(self.restaurant.pk), 0)
+
+        self.checkout([(self.pasta, 2)])
+        # New lines, orders cancelled since the last refresh
+        with self.assertNumQueries(2):
+            self.assertEqual(refresh_sales_columns(self.restaurant.pk), 1)
+
+        columns = load_sales_columns(self.restaurant.pk)
+        self.assertEqual(len(columns['order_ts']), 2)
+        self.assertEqual(int(columns['line_quantity'].sum()), 3)
+
+        incremental = {name: list(column) for name, column in columns.items()}
+        refresh_sales_columns(self.restaurant.pk, full=True)
+        rebuilt = {name: list(column) for name, column in load_sales_columns(self.restaurant.pk).items()}
+        self.assertEqual(rebuilt, incremental)
+
+    def test_reads_never_refresh(self):
+        self.checkout([(self.pizza, 1)])
+        response = self.client.get(self.url('owner-analytics-summary'))
+        self.assertEqual(response.data['order_count'], 0)
+        self.assertFalse(os.path.exists(os.path.join(settings.ANALYTICS_DATA_DIR, str(self.restaurant.pk))))
+
+        self.refresh()
+        response = self.client.get(self.url('owner-analytics-summary'))
+        self.assertEqual(response.data['order_count'], 1)
+
+    def test_builds_switch_as_a_whole(self):
+        self.checkout([(self.pizza, 1)])
+        refresh_sales_columns(self.restaurant.pk)
+        first = load_sales_columns(self.restaurant.pk)
+        for quantity in (2, 3):
+            self.checkout([(self.pasta, quantity)])
+            refresh_sales_columns(self.restaurant.pk)
+
+        base = os.path.join(settings.ANALYTICS_DATA_DIR, str(self.restaurant.pk))
+        builds = sorted(name for name in os.listdir(base) if name.isdigit())
+        self.assertEqual(len(builds), 2)
+        with open(os.path.join(base, 'CURRENT')) as handle:
+            self.assertEqual(handle.read(), builds[-1])
+        # A reader still mapping an older build keeps a consistent copy
+        self.assertEqual((len(first['order_id']), int(first['line_quantity'].sum())), (1, 1))
+        self.assertEqual(int(load_sales_columns(self.restaurant.pk)['line_quantity'].sum()), 6)
+
+    def test_late_lines_and_cancellations(self):
+        self.checkout([(self.pizza, 1)])
+        late = self.checkout([(self.pasta, 2)])
+        self.checkout([(self.pizza, 3)])
+        # The middle order's transaction had not committed yet
+        late_lines = list(late.order_items.values())
+        late.order_items.all().delete()
+        self.assertEqual(refresh_sales_columns(self.restaurant.pk), 2)
+
+        OrderItem.objects.bulk_create([OrderItem(**values) for values in late_lines])
+        self.assertEqual(refresh_sales_columns(self.restaurant.pk), 1)
+        self.assertEqual(refresh_sales_columns(self.restaurant.pk), 0)
+        self.assertEqual(int(load_sales_columns(self.restaurant.pk)['line_quantity'].sum()), 6)
+
+        late.order_cancelled = True
+        late.save()
+        self.assertEqual(refresh_sales_columns(self.restaurant.pk), 0)
+        columns = load_sales_columns(self.restaurant.pk)
+        self.assertNotIn(late.pk, columns['order_id'].tolist())
+        incremental = (sales_summary(columns), item_ranking(columns), order_heatmap(columns))
+        self.assertEqual(incremental[0]['items_sold'], 4)
+
+        refresh_sales_columns(self.restaurant.pk, full=True)
+        columns = load_sales_columns(self.restaurant.pk)
+        self.assertEqual((sales_summary(columns), item_ranking(columns), order_heatmap(columns)), incremental)
+
+    def test_heatmap_uses_local_hour_of_week(self):
+        order = self.checkout([(self.pizza, 1)])
+        created = timezone.localtime(order.created_at)
+        self.refresh()
+
+        response = self.client.get(self.url('owner-analytics-heatmap'))
+        heatmap = response.data['heatmap']
+        self.assertEqual((len(heatmap), len(heatmap[0])), (7, 24))
+        self.assertEqual(heatmap[created.weekday()][created.hour], 1)
+        self.assertEqual(sum(map(sum, heatmap)), 1)
+
+    def test_days_filter_and_archived_orders(self):
+        old = self.checkout([(self.pizza, 4)])
+        Orders.objects.filter(pk=old.pk).update(
+            created_at=timezone.now() - timedelta(days=200), order_status='COMPLETED'
+        )
+        call_command('archive_orders', stdout=StringIO())
+        self.checkout([(self.pasta, 1)])
+
+        self.refresh('--full')
+        columns = load_sales_columns(self.restaurant.pk)
+        self.assertEqual(sum(map(sum, order_heatmap(columns))), 2)
+
+        response = self.client.get(self.url('owner-analytics-summary'), {'days': 30})
+        self.assertEqual((response.data['order_count'], response.data['revenue']), (1, Decimal('8')))
+        response = self.client.get(self.url('owner-analytics-items'), {'sort': 'quantity'})
+        self.assertEqual(response.data['results'][0]['menu_item'], self.pizza.pk)
+
+        response = self.client.get(self.url('owner-analytics-summary'), {'days': 'x'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_only_owners_can_read(self):
+        self.assertEqual(self.client.get(self.url('owner-analytics-summary', self.other.menu.restaurant)).status_code, 403)
+
+        self.client.force_authenticate(user=self.customer.user)
+        self.assertEqual(self.client.get(self.url('owner-analytics-summary')).status_code, 403)
+
+        admin = create_profile('admin', user_type='super_admin')
+        self.client.force_authenticate(user=admin.user)
+        self.assertEqual(self.client.get(self.url('owner-analytics-summary')).status_code, 200)
@@ -0,0 +1,117 @@
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+from django.test import SimpleTestCase, override_settings
+
+from apps.restaurants.ai.utils import AnalyzerFileCache, RestaurantRatings, RestaurantTable
+
+
+class AnalyzerFileCacheTestCase(SimpleTestCase):
+    def setUp(self):
+        self.directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        settings_override = override_settings(ANALYZER_CACHE_DIR=str(self.directory / 'cache'),
+                                              ANALYZER_CHECK_INTERVAL=0)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.path = self.directory / 'restaurant_ratings.csv'
+
+    def write(self, rows, mtime):
+        self.path.write_text(
+            'restaurant_id,avg_rating\n' + ''.join(f'{rid},{rating}\n' for rid, rating in rows)
+        )
+        os.utime(self.path, (mtime, mtime))
+
+    def cache(self, table_class=RestaurantRatings):
+        return AnalyzerFileCache('restaurant_ratings', lambda: self.path, table_class)
+
+    def test_missing_file_is_empty_until_it_appears(self):
+        cache = self.cache()
+        self.assertEqual(list(cache.get()), [])
+
+        self.write([(1, 4.0), (2, 4.5)], mtime=1_000)
+        self.assertEqual(list(cache.get()), [(2, 4.5), (1, 4.0)])
+
+    def test_changed_file_reloads_in_background(self):
+        self.write([(1, 4.0)], mtime=1_000)
+        cache = self.cache()
+        self.assertEqual(list(cache.get()), [(1, 4.0)])
+
+        self.write([(1, 4.0), (3, 5.0)], mtime=2_000)
+        with self.assertLogs('apps.restaurants.ai.utils', 'INFO') as logs:
+            # The old copy is served while the new one loads
+            self.assertEqual(list(cache.get()), [(1, 4.0)])
+            cache._reloader.join()
+        self.assertEqual(list(cache.get()), [(3, 5.0), (1, 4.0)])
+        self.assertIn('from csv (2 rows)', logs.output[-1])
+
+    def test_workers_share_the_binary_copy(self):
+        self.write([(1, 4.0), (2, 3.0)], mtime=1_000)
+        self.assertEqual(list(self.cache().get()), [(1, 4.0), (2, 3.0)])
+        self.assertEqual(len(list((self.directory / 'cache').glob('restaurant_ratings-*'))), 1)
+
+        with mock.patch.object(RestaurantRatings, 'from_csv') as from_csv:
+            ratings = self.cache().get()
+        from_csv.assert_not_called()
+        self.assertIsInstance(ratings.ids, np.memmap)
+        self.assertEqual(list(ratings), [(1, 4.0), (2, 3.0)])
+
+        # A new version keeps the copy it replaced, and only that one
+        self.write([(5, 1.0)], mtime=2_000)
+        self.assertEqual(list(self.cache().get()), [(5, 1.0)])
+        self.write([(6, 2.0)], mtime=3_000)
+        self.assertEqual(list(self.cache().get()), [(6, 2.0)])
+        self.assertEqual(
+            sorted(path.name for path in (self.directory / 'cache').glob('restaurant_ratings-*')),
+            ['restaurant_ratings-2000000000000-31', 'restaurant_ratings-3000000000000-31'],
+        )
+
+    def test_unwritable_cache_dir_serves_the_parsed_copy(self):
+        self.write([(1, 4.0)], mtime=1_000)
+        (self.directory / 'cache').write_text('not a directory')
+
+        with self.assertLogs('apps.restaurants.ai.utils', 'WARNING'):
+            ratings = self.cache().get()
+        self.assertEqual(list(ratings), [(1, 4.0)])
+        self.assertNotIsInstance(ratings.ids, np.memmap)
+
+    def test_stat_is_throttled(self):
+        self.write([(1, 4.0)], mtime=1_000)
+        cache = self.cache()
+        cache.get()
+        with override_settings(ANALYZER_CHECK_INTERVAL=60), mock.patch.object(Path, 'stat') as stat:
+            cache.get()
+        stat.assert_not_called()
+
+
+class AnalyzerTablesTestCase(SimpleTestCase):
+    def setUp(self):
+        self.directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+
+    def test_ratings_rank_and_lookup(self):
+        path = self.directory / 'ratings.csv'
+        path.write_text('restaurant_id,avg_rating\n9,4.5\n3,4.9\n0,5.0\n7,4.5\n5,bad\n')
+        RestaurantRatings.from_csv(path).save(self.directory)
+        ratings = RestaurantRatings.open(self.directory)
+
+        self.assertEqual(ratings.top_ids(3), [3, 9, 7])
+        self.assertEqual(len(ratings), 4)
+        self.assertAlmostEqual(ratings.get(9), 4.5)
+        self.assertEqual(ratings.get(5), 0.0)
+        self.assertEqual(ratings.get(4, default=-1), -1)
+
+    def test_table_decodes_rows_by_id(self):
+        path = self.directory / 'restaurants.csv'
+        path.write_text('id,name,city\n12,Café Ünal,Lahore\n4,Spice,\nx,Broken,Nowhere\n')
+        RestaurantTable.from_csv(path).save(self.directory)
+        table = RestaurantTable.open(self.directory)
+
+        self.assertEqual(list(table), [4, 12])
+        self.assertEqual(table[12], {'id': '12', 'name': 'Café Ünal', 'city': 'Lahore'})
+        self.assertEqual(table.get(4), {'id': '4', 'name': 'Spice', 'city': ''})
+        self.assertNotIn(5, table)
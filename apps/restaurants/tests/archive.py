@@ -0,0 +1,102 @@
+import time
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils.timezone import now
+from rest_framework.test import APIClient
+
+from apps.restaurants.models import (
+    ArchivedOrder,
+    ArchivedOrderItem,
+    OrderEvent,
+    OrderItem,
+    Orders,
+    Review,
+)
+from apps.restaurants.utils import get_order_archive_horizon
+from apps.restaurants.utils.order_archive import ARCHIVE_HORIZON_KEY
+from .helper.fixtures_helper import create_profile, create_menu_items
+
+
+class OrderArchiveTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.customer = create_profile('customer')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.customer.user)
+        menu_item = create_menu_items(1)[0]
+
+        # Ten orders, newest first: three recent ones, then seven older than
+        # the 90 day default of which the last is still being prepared
+        statuses = ['COMPLETED'] * 9 + ['PREPARING']
+        self.orders = []
+        for index, order_status in enumerate(statuses):
+            order = Orders.objects.create(user=self.customer, order_status=order_status)
+            age = timedelta(days=index if index < 3 else 100 + index)
+            Orders.objects.filter(pk=order.pk).update(created_at=now() - age)
+            OrderItem.objects.create(order=order, menu_item=menu_item, quantity=2, price=Decimal('3.00'))
+            self.orders.append(order)
+
+        self.reviewed = self.orders[8]
+        Review.objects.create(order=self.reviewed, user=self.customer, rate=5)
+        OrderEvent.objects.create(order=self.orders[3], from_status='SERVING', to_status='COMPLETED')
+
+    def archive(self, *args):
+        out = StringIO()
+        call_command('archive_orders', *args, stdout=out)
+        return out.getvalue()
+
+    def test_moves_old_completed_orders_in_batches(self):
+        output = self.archive('--batch-size', '2')
+
+        self.assertIn('Archived 5 orders in', output)
+        self.assertEqual(output.count('Archived 2 orders\n'), 2)
+        archived_ids = {order.pk for order in self.orders[3:8]}
+        self.assertEqual(set(ArchivedOrder.objects.values_list('id', flat=True)), archived_ids)
+        self.assertEqual(ArchivedOrderItem.objects.filter(order_id__in=archived_ids).count(), 5)
+        self.assertFalse(Orders.objects.filter(pk__in=archived_ids).exists())
+        self.assertFalse(OrderItem.objects.filter(order_id__in=archived_ids).exists())
+
+        # Reviewed, still open and recent orders stay live; the event log stays
+        self.assertTrue(Orders.objects.filter(pk=self.reviewed.pk).exists())
+        self.assertEqual(Orders.objects.count(), 5)
+        self.assertTrue(OrderEvent.objects.filter(order_id=self.orders[3].pk).exists())
+
+        self.assertIn('Archived 0 orders', self.archive())
+
+    def test_history_falls_through_to_archive(self):
+        self.archive()
+
+        seen, url = [], reverse('user-order-history') + '?page_size=3'
+        while url:
+            response = self.client.get(url)
+            seen.extend(order['id'] for order in response.data['results'])
+            url = response.data['next']
+
+        self.assertEqual(seen, [order.pk for order in self.orders])
+        archived = self.client.get(reverse('user-order-history'), {'page_size': 10}).data['results'][3]
+        self.assertEqual(archived['order_items'][0]['quantity'], 2)
+
+    def test_recent_pages_skip_the_archive(self):
+        self.archive()
+
+        # live page + items prefetch; the archive horizon is cached
+        with self.assertNumQueries(2):
+            self.client.get(reverse('user-order-history'), {'page_size': 2})
+
+    @override_settings(ORDER_ARCHIVE_HORIZON_TIMEOUT=60)
+    def test_stale_horizon_expires(self):
+        self.archive()
+        # A worker whose cache the archival run did not reach
+        cache.set(ARCHIVE_HORIZON_KEY, {'horizon': None}, 60)
+        self.assertIsNone(get_order_archive_horizon())
+
+        with mock.patch('time.time', return_value=time.time() + 61):
+            horizon = get_order_archive_horizon()
+        self.assertEqual(horizon, ArchivedOrder.objects.get(pk=self.orders[3].pk).created_at)
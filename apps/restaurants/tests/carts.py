@@ -0,0 +1,161 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from apps.restaurants.models import Cart, CartItem
+from .helper.fixtures_helper import create_profile, create_menu_items
+
+
+class CartTotalsAPITestCase(TestCase):
+    def setUp(self):
+        self.profile = create_profile('customer')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.profile.user)
+        self.burger, self.fries = create_menu_items(2, price=Decimal('4.25'))
+
+    def add(self, menu_item, quantity):
+        response = self.client.post(
+            reverse('create-cart-item'),
+            {'menu_item': menu_item.id, 'quantity': quantity},
+            format='json',
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response
+
+    def cart(self):
+        return Cart.objects.get(user=self.profile)
+
+    def test_adding_items_shifts_total_by_line_amount(self):
+        self.add(self.burger, 2)
+        self.add(self.burger, 1)
+        self.add(self.fries, 1)
+
+        cart = self.cart()
+        self.assertEqual(cart.total_price, Decimal('17.00'))
+        self.assertEqual(cart.cart_items.get(menu_item=self.burger).quantity, 3)
+
+    def test_update_and_delete_apply_the_difference(self):
+        self.add(self.burger, 2)
+        self.add(self.fries, 1)
+        line = CartItem.objects.get(menu_item=self.burger)
+
+        response = self.client.patch(
+            reverse('update-cart-item', args=[line.pk]), {'quantity': 5}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(Decimal(response.data['total_price']), Decimal('25.50'))
+
+        response = self.client.delete(reverse('delete-cart-item', args=[line.pk]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(Decimal(response.data['total_price']), Decimal('4.25'))
+
+    def test_cannot_touch_another_users_cart_line(self):
+        self.add(self.burger, 1)
+        line = CartItem.objects.get()
+
+        other = APIClient()
+        other.force_authenticate(user=create_profile('someone-else').user)
+        response = other.delete(reverse('delete-cart-item', args=[line.pk]))
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertTrue(CartItem.objects.filter(pk=line.pk).exists())
+
+    def test_reconcile_command_repairs_drifted_totals(self):
+        self.add(self.burger, 2)
+        Cart.objects.filter(user=self.profile).update(total_price=Decimal('1.00'))
+        empty = Cart.objects.create(user=create_profile('empty').user.profile, total_price=Decimal('3.00'))
+
+        call_command('reconcile_cart_totals', '--dry-run', stdout=StringIO())
+        self.assertEqual(self.cart().total_price, Decimal('1.00'))
+
+        out = StringIO()
+        call_command('reconcile_cart_totals', stdout=out)
+        self.assertIn('Repaired 2', out.getvalue())
+        self.assertEqual(self.cart().total_price, Decimal('8.50'))
+        empty.refresh_from_db()
+        self.assertEqual(empty.total_price, Decimal('0.00'))
+
+    def test_reconcile_keeps_deltas_committed_during_the_run(self):
+        self.add(self.burger, 2)
+        Cart.objects.filter(user=self.profile).update(total_price=Decimal('1.00'))
+        cart = self.cart()
+        added = []
+
+        def add_after_first_cart_read(execute, sql, params, many, context):
+            result = execute(sql, params, many, context)
+            # A cart add committing right after the command's first read of
+            # the batch (in production it would wait on the batch's lock)
+            if not added and sql.lstrip().upper().startswith('SELECT') and Cart._meta.db_table in sql:
+                added.append(self.fries)
+                CartItem.objects.create(cart=cart, menu_item=self.fries, quantity=1, price=Decimal('4.25'))
+                cart.apply_total_delta(Decimal('4.25'))
+            return result
+
+        with connection.execute_wrapper(add_after_first_cart_read):
+            call_command('reconcile_cart_totals', stdout=StringIO())
+        self.assertTrue(added)
+        self.assertEqual(self.cart().total_price, Decimal('12.75'))
+
+
+class CartBatchAPITestCase(TestCase):
+    def setUp(self):
+        self.profile = create_profile('customer')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.profile.user)
+        self.url = reverse('cart-batch')
+        self.menu_items = create_menu_items(10, price=Decimal('3.00'))
+
+    def batch(self, operations):
+        return self.client.post(self.url, {'operations': operations}, format='json')
+
+    def test_applies_operations_in_order_and_returns_cart(self):
+        burger, fries, soda = self.menu_items[:3]
+        cart, _ = Cart.objects.get_or_create(user=self.profile)
+        CartItem.objects.create(cart=cart, menu_item=soda, quantity=4, price=Decimal('1.00'))
+        Cart.objects.filter(pk=cart.pk).update(total_price=Decimal('4.00'))
+
+        response = self.batch([
+            {'op': 'add', 'menu_item': burger.id, 'quantity': 2},
+            {'op': 'add', 'menu_item': burger.id, 'quantity': 1, 'comments': 'no onions'},
+            {'op': 'add', 'menu_item': fries.id},
+            {'op': 'update', 'menu_item': fries.id, 'quantity': 0},
+            {'op': 'update', 'menu_item': soda.id, 'quantity': 2},
+        ])
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(Decimal(response.data['total_price']), Decimal('11.00'))
+        lines = {line['menu_item']: line for line in response.data['cart_items']}
+        self.assertEqual(set(lines), {burger.id, soda.id})
+        self.assertEqual(lines[burger.id]['quantity'], 3)
+        self.assertEqual(lines[burger.id]['comments'], 'no onions')
+        self.assertEqual(lines[soda.id]['price'], '1.00')
+
+        response = self.batch([{'op': 'remove', 'menu_item': soda.id}])
+        self.assertEqual(Decimal(response.data['total_price']), Decimal('9.00'))
+
+    def test_unknown_menu_item_rejects_whole_batch(self):
+        response = self.batch([
+            {'op': 'add', 'menu_item': self.menu_items[0].id},
+            {'op': 'add', 'menu_item': 999999},
+        ])
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(CartItem.objects.exists())
+
+    def test_query_count_does_not_grow_with_batch_size(self):
+        Cart.objects.get_or_create(user=self.profile)
+
+        def count_queries(items):
+            operations = [{'op': 'add', 'menu_item': item.id, 'quantity': 2} for item in items]
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(self.batch(operations).status_code, status.HTTP_200_OK)
+            return len(queries)
+
+        self.assertEqual(count_queries(self.menu_items[:1]), count_queries(self.menu_items[1:]))
@@ -0,0 +1,30 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+
+from apps.restaurants.models import Restaurant, Menu, MenuItem
+from apps.userprofile.models import UserProfile
+
+User = get_user_model()
+
+
+def create_profile(username, user_type='user', restaurant=None):
+    user = User.objects.create_user(
+        username=username,
+        password='testpassword',
+        email=f'{username}@example.com',
+        user_type=user_type,
+    )
+    user.is_active = True
+    user.save(update_fields=['is_active'])
+    return UserProfile.objects.create(
+        user=user, first_name=username.title(), last_name='Test', restaurant=restaurant)
+
+
+def create_menu_items(count, restaurant=None, price=Decimal('5.00')):
+    restaurant = restaurant or Restaurant.objects.create(name=f'Restaurant {Restaurant.objects.count() + 1}')
+    menu = Menu.objects.create(restaurant=restaurant, name='Menu')
+    return MenuItem.objects.bulk_create([
+        MenuItem(menu=menu, name=f'Item {i}', price=price)
+        for i in range(count)
+    ])
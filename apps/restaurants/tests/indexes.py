@@ -0,0 +1,39 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from apps.restaurants.management.commands.explain_hot_queries import find_scans
+from apps.restaurants.models import Orders
+from .helper.fixtures_helper import create_profile
+
+
+class HotQueryIndexTestCase(TestCase):
+    def setUp(self):
+        customer = create_profile('customer')
+        Orders.objects.bulk_create([
+            Orders(user=customer, order_status=order_status, order_cancelled=cancelled)
+            for order_status, cancelled in [
+                ('TAKING', False), ('PREPARING', False), ('COMPLETED', False), ('PREPARING', True),
+            ]
+        ])
+
+    def test_open_orders_exclude_completed_and_cancelled(self):
+        self.assertEqual(
+            sorted(Orders.objects.open().values_list('order_status', flat=True)),
+            ['PREPARING', 'TAKING'],
+        )
+
+    def test_hot_queries_use_indexes(self):
+        out = StringIO()
+        call_command('explain_hot_queries', stdout=out)
+        self.assertIn('All hot queries use an index.', out.getvalue())
+
+    def test_find_scans(self):
+        self.assertEqual(find_scans('2 0 0 SCAN restaurants_orders', 'sqlite'), ['restaurants_orders'])
+        self.assertEqual(find_scans('5 0 0 SCAN reviews USING INDEX reviews_created_idx', 'sqlite'), [])
+        self.assertEqual(find_scans('3 0 0 SEARCH order_items USING INDEX x (order_id=?)', 'sqlite'), [])
+        self.assertEqual(
+            find_scans('Limit\n  ->  Seq Scan on reviews  (cost=0.00..1.01 rows=1)', 'postgresql'),
+            ['reviews'],
+        )
@@ -0,0 +1,126 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.urls import reverse
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from apps.restaurants.models import (
+    Restaurant,
+    Menu,
+    MenuItem,
+    MenuItemIngredient,
+    Category,
+)
+
+# Matches the upper bound of items per restaurant produced by
+# scripts/generate_seed_data.py
+ITEMS_PER_RESTAURANT = 250
+INGREDIENTS_PER_ITEM = 5
+
+
+class MenuTreeAPITestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.restaurant = Restaurant.objects.create(name='Golden Grill #1')
+        self.categories = [
+            Category.objects.create(name=name)
+            for name in ('Starters', 'Mains', 'Desserts', 'Beverages', 'Sides')
+        ]
+        self.menus = [
+            Menu.objects.create(restaurant=self.restaurant, name='Lunch'),
+            Menu.objects.create(restaurant=self.restaurant, name='Dinner'),
+        ]
+
+        MenuItem.objects.bulk_create([
+            MenuItem(
+                menu=self.menus[i % len(self.menus)],
+                name=f'Dish {i}',
+                description=f'Dish {i} description',
+                price=Decimal('9.99'),
+                category=self.categories[i % len(self.categories)],
+            )
+            for i in range(ITEMS_PER_RESTAURANT)
+        ])
+        MenuItemIngredient.objects.bulk_create([
+            MenuItemIngredient(menu_item=item, name=f'Ingredient {j}', quantity='10g')
+            for item in MenuItem.objects.filter(menu__restaurant=self.restaurant)
+            for j in range(INGREDIENTS_PER_ITEM)
+        ])
+
+        self.url = reverse('menu-list', kwargs={'restaurant_id': self.restaurant.id})
+
+    def test_menu_tree_payload(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        menus = response.json()['results']
+        self.assertEqual([menu['name'] for menu in menus], ['Lunch', 'Dinner'])
+
+        items = [item for menu in menus for item in menu['menu_items']]
+        self.assertEqual(len(items), ITEMS_PER_RESTAURANT)
+        self.assertEqual(items[0]['category_name'], 'Starters')
+        self.assertEqual(len(items[0]['ingredients']), INGREDIENTS_PER_ITEM)
+
+    def test_menu_tree_query_count_is_constant(self):
+        # count + menus + items (joined with categories) + ingredients
+        with self.assertNumQueries(4):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class MenuSnapshotAPITestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.restaurant = Restaurant.objects.create(name='Cafe Blue')
+        self.menu = Menu.objects.create(restaurant=self.restaurant, name='All Day')
+        self.item = MenuItem.objects.create(menu=self.menu, name='Soup', price=Decimal('4.50'))
+        self.url = reverse('menu-list', kwargs={'restaurant_id': self.restaurant.id})
+
+    def test_snapshot_served_without_queries(self):
+        first = self.client.get(self.url)
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertIn('ETag', first)
+
+        with self.assertNumQueries(0):
+            second = self.client.get(self.url)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second['ETag'], first['ETag'])
+
+    def test_not_modified_for_current_etag(self):
+        etag = self.client.get(self.url)['ETag']
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_snapshot_invalidated_on_menu_changes(self):
+        etag = self.client.get(self.url)['ETag']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            MenuItemIngredient.objects.create(menu_item=self.item, name='Salt')
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+        ingredients = response.json()['results'][0]['menu_items'][0]['ingredients']
+        self.assertEqual([ingredient['name'] for ingredient in ingredients], ['Salt'])
+
+    def test_snapshot_invalidated_on_category_changes(self):
+        category = Category.objects.create(name='Soups')
+        self.item.category = category
+        with self.captureOnCommitCallbacks(execute=True):
+            self.item.save()
+        etag = self.client.get(self.url)['ETag']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            category.name = 'Hot Soups'
+            category.save()
+
+        response = self.client.get(self.url)
+        self.assertNotEqual(response['ETag'], etag)
+        item = response.json()['results'][0]['menu_items'][0]
+        self.assertEqual(item['category_name'], 'Hot Soups')
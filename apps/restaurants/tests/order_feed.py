@@ -0,0 +1,74 @@
+from channels.db import database_sync_to_async
+from channels.testing import WebsocketCommunicator
+from django.test import TestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.restaurants.models import Orders, Table
+from coresite.asgi import application
+from .helper.fixtures_helper import create_profile, create_menu_items
+
+
+class OrderFeedConsumerTestCase(TestCase):
+    def setUp(self):
+        self.restaurant = create_menu_items(1)[0].menu.restaurant
+        self.customer = create_profile('customer')
+        self.waiter = create_profile('waiter', user_type='waiter')
+        self.owner = create_profile('owner', user_type='restaurant_owner')
+        self.restaurant.owners.add(self.owner)
+        self.table = Table.objects.create(restaurant=self.restaurant, table_number=1)
+        other_restaurant = create_menu_items(1)[0].menu.restaurant
+        self.other_table = Table.objects.create(restaurant=other_restaurant, table_number=1)
+
+    async def connect(self, profile):
+        token = str(RefreshToken.for_user(profile.user).access_token) if profile else ''
+        communicator = WebsocketCommunicator(application, f'/ws/orders/?token={token}')
+        connected, _ = await communicator.connect()
+        return communicator, connected
+
+    @database_sync_to_async
+    def create_order(self, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Orders.objects.create(user=self.customer, **{'table': self.table, **kwargs})
+
+    @database_sync_to_async
+    def set_status(self, order_id, order_status):
+        with self.captureOnCommitCallbacks(execute=True):
+            order = Orders.objects.get(pk=order_id)
+            order.order_status = order_status
+            order.save()
+
+    async def test_waiter_receives_created_and_status_events(self):
+        communicator, connected = await self.connect(self.waiter)
+        self.assertTrue(connected)
+
+        order = await self.create_order(waiter=self.waiter)
+        message = await communicator.receive_json_from()
+        self.assertEqual(message['event'], 'order.created')
+        self.assertEqual(message['order']['id'], order.id)
+        self.assertEqual(message['order']['restaurants'], [self.restaurant.id])
+
+        await self.set_status(order.id, 'PREPARING')
+        message = await communicator.receive_json_from()
+        self.assertEqual(message['event'], 'order.status_changed')
+        self.assertEqual(message['previous_status'], 'TAKING')
+        self.assertEqual(message['order']['order_status'], 'PREPARING')
+
+        await communicator.disconnect()
+
+    async def test_owner_receives_own_restaurant_orders_only(self):
+        communicator, _ = await self.connect(self.owner)
+
+        await self.create_order(table=self.other_table)
+        order = await self.create_order(table=self.table)
+        message = await communicator.receive_json_from()
+        self.assertEqual(message['order']['id'], order.id)
+
+        # Saving without a status change publishes nothing
+        await self.set_status(order.id, 'TAKING')
+        self.assertTrue(await communicator.receive_nothing())
+        await communicator.disconnect()
+
+    async def test_customers_and_anonymous_connections_are_rejected(self):
+        for profile in (None, self.customer):
+            communicator, connected = await self.connect(profile)
+            self.assertFalse(connected)
@@ -0,0 +1,71 @@
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from apps.restaurants.models import Orders, OrderEvent, Table
+from apps.restaurants.utils import OrderTransitionError, transition_order
+from .helper.fixtures_helper import create_profile, create_menu_items
+
+
+class OrderStatusTransitionTestCase(TestCase):
+    def setUp(self):
+        restaurant = create_menu_items(1)[0].menu.restaurant
+        self.kitchen = create_profile('kitchen', user_type='waiter', restaurant=restaurant)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.kitchen.user)
+        self.url = reverse('order-status-transition')
+
+        customer = create_profile('customer')
+        table = Table.objects.create(restaurant=restaurant, table_number=1)
+        self.orders = Orders.objects.bulk_create([
+            Orders(user=customer, table=table, order_status='PREPARING') for _ in range(30)
+        ])
+        self.other_order = Orders.objects.create(user=customer, order_status='PREPARING')
+
+    def test_bulk_transition_runs_a_fixed_number_of_queries(self):
+        Orders.objects.filter(pk__in=[order.pk for order in self.orders[:5]]).update(order_status='SERVING')
+        taking = Orders.objects.create(user=self.orders[0].user, table=self.orders[0].table,
+                                       order_status='TAKING')
+        ids = [order.pk for order in self.orders] + [taking.pk]
+
+        # scope lookup, then locking SELECT + one UPDATE + one INSERT in a savepoint
+        with self.assertNumQueries(6):
+            response = self.client.post(self.url, {'orders': ids, 'order_status': 'SERVING'}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['updated'], sorted(order.pk for order in self.orders[5:]))
+        self.assertEqual(
+            {item['id'] for item in response.data['rejected']},
+            {order.pk for order in self.orders[:5]} | {taking.pk},
+        )
+        self.assertEqual(Orders.objects.filter(order_status='SERVING').count(), 30)
+        self.assertEqual(OrderEvent.objects.filter(from_status='PREPARING', to_status='SERVING',
+                                                   actor=self.kitchen).count(), 25)
+
+    def test_orders_of_other_restaurants_are_rejected(self):
+        response = self.client.post(
+            self.url, {'orders': [self.other_order.pk], 'order_status': 'SERVING'}, format='json'
+        )
+
+        self.assertEqual(response.data['updated'], [])
+        self.assertEqual(response.data['rejected'][0]['error'], 'Order not found.')
+        self.other_order.refresh_from_db()
+        self.assertEqual(self.other_order.order_status, 'PREPARING')
+
+    def test_customers_cannot_transition(self):
+        self.client.force_authenticate(user=self.orders[0].user.user)
+        response = self.client.post(
+            self.url, {'orders': [self.orders[0].pk], 'order_status': 'SERVING'}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_single_transition_is_validated_and_logged(self):
+        order = transition_order(self.other_order, 'SERVING')
+        self.assertEqual(order.order_status, 'SERVING')
+        self.assertGreater(order.updated_at, self.other_order.updated_at)
+
+        with self.assertRaises(OrderTransitionError):
+            transition_order(order, 'TAKING')
+        self.assertEqual(list(order.events.values_list('from_status', 'to_status')),
+                         [('PREPARING', 'SERVING')])
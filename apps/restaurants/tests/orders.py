@@ -0,0 +1,109 @@
+from decimal import Decimal
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from apps.restaurants.models import Cart, CartItem, Orders
+from .helper.fixtures_helper import create_profile, create_menu_items
+
+
+class OrderCheckoutAPITestCase(TestCase):
+    def setUp(self):
+        self.profile = create_profile('customer')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.profile.user)
+        self.url = reverse('checkout-order')
+        self.menu_items = create_menu_items(50, price=Decimal('2.50'))
+
+    def fill_cart(self, lines):
+        cart, _ = Cart.objects.get_or_create(user=self.profile)
+        CartItem.objects.bulk_create([
+            CartItem(cart=cart, menu_item=item, quantity=2, price=item.price)
+            for item in self.menu_items[:lines]
+        ])
+        Cart.objects.filter(pk=cart.pk).update(total_price=Decimal('5.00') * lines)
+        return cart
+
+    def checkout(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, {'order_type': 'TAKEAWAY'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response, len(queries)
+
+    def test_checkout_copies_cart_and_empties_it(self):
+        cart = self.fill_cart(3)
+        response, _ = self.checkout()
+
+        order = Orders.objects.get(pk=response.data['id'])
+        self.assertEqual(order.total_price, Decimal('15.00'))
+        self.assertEqual(
+            sorted(order.order_items.values_list('menu_item_id', flat=True)),
+            sorted(item.id for item in self.menu_items[:3]),
+        )
+        self.assertEqual(len(response.data['items']), 3)
+
+        cart.refresh_from_db()
+        self.assertEqual(cart.total_price, 0)
+        self.assertFalse(cart.cart_items.exists())
+
+    def test_checkout_query_count_does_not_grow_with_cart_size(self):
+        self.fill_cart(1)
+        _, single_line_queries = self.checkout()
+
+        self.fill_cart(50)
+        _, fifty_line_queries = self.checkout()
+
+        self.assertEqual(single_line_queries, fifty_line_queries)
+
+    def test_item_added_during_checkout_keeps_its_total(self):
+        cart = self.fill_cart(2)
+        late_item = self.menu_items[10]
+        added = []
+
+        def add_during_checkout(execute, sql, params, many, context):
+            result = execute(sql, params, many, context)
+            # An add that commits after checkout read the lines to copy
+            if not added and sql.lstrip().upper().startswith('INSERT') and Orders._meta.db_table in sql:
+                added.append(late_item)
+                CartItem.objects.create(cart=cart, menu_item=late_item, quantity=1, price=late_item.price)
+                cart.apply_total_delta(late_item.price)
+            return result
+
+        with connection.execute_wrapper(add_during_checkout):
+            response, _ = self.checkout()
+
+        self.assertEqual(Orders.objects.get(pk=response.data['id']).total_price, Decimal('10.00'))
+        cart.refresh_from_db()
+        self.assertEqual(cart.total_price, Decimal('2.50'))
+        self.assertEqual(list(cart.cart_items.values_list('menu_item_id', flat=True)), [late_item.id])
+
+    def test_checkout_empty_cart(self):
+        Cart.objects.create(user=self.profile)
+        response = self.client.post(self.url, {}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Orders.objects.exists())
+
+    def test_checkout_survives_failing_post_commit_work(self):
+        self.fill_cart(2)
+        calls = []
+
+        def failure(*args):
+            calls.append(args)
+            raise RuntimeError('channel layer down')
+
+        with mock.patch.multiple(
+            'apps.restaurants.signals',
+            publish_order_events=failure, record_order_sales=failure, record_order_trends=failure,
+        ), self.assertLogs(level='ERROR') as logs:
+            with self.captureOnCommitCallbacks(execute=True):
+                response, _ = self.checkout()
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(len(logs.records), 3)
+        self.assertTrue(Orders.objects.filter(pk=response.data['id']).exists())
@@ -0,0 +1,134 @@
+from datetime import datetime, timedelta, timezone
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.urls import reverse
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from apps.restaurants.models import Orders
+from apps.restaurants.utils import get_order_archive_horizon
+from apps.userprofile.models import UserProfile
+from .helper.fixtures_helper import create_profile
+
+User = get_user_model()
+
+
+class KeysetPaginationTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='customer', password='testpassword', email='customer@example.com')
+        self.profile = UserProfile.objects.create(
+            user=self.user, first_name='Test', last_name='Customer')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('user-order-history')
+
+        Orders.objects.bulk_create([Orders(user=self.profile) for _ in range(25)])
+        # Seeded data shares one timestamp, so ties must be broken by id
+        Orders.objects.update(created_at=datetime(2024, 1, 1, 12, tzinfo=timezone.utc))
+        self.order_ids = sorted(Orders.objects.values_list('id', flat=True), reverse=True)
+
+        # The archive horizon is cached process-wide; load it up front so the
+        # counts below are the steady-state ones.
+        cache.clear()
+        get_order_archive_horizon()
+
+    def test_pages_walk_forward_without_gaps(self):
+        seen, url, pages = [], self.url, 0
+        while url:
+            # one keyset range scan + the order items prefetch
+            with self.assertNumQueries(2):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn('count', response.data)
+            seen.extend(order['id'] for order in response.data['results'])
+            url, pages = response.data['next'], pages + 1
+
+        self.assertEqual(pages, 3)
+        self.assertEqual(seen, self.order_ids)
+
+    def test_previous_link_returns_prior_page(self):
+        first = self.client.get(self.url).data
+        self.assertIsNone(first['previous'])
+
+        second = self.client.get(first['next']).data
+        back = self.client.get(second['previous']).data
+        self.assertEqual(
+            [order['id'] for order in back['results']],
+            [order['id'] for order in first['results']],
+        )
+        self.assertEqual(back['next'], first['next'])
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.url, {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class DeltaSyncTestCase(TestCase):
+    def setUp(self):
+        self.waiter = create_profile('waiter', user_type='waiter')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.waiter.user)
+        self.url = reverse('waiter-order-list')
+
+        customer = create_profile('customer')
+        self.orders = [Orders.objects.create(user=customer, waiter=self.waiter) for _ in range(5)]
+        Orders.objects.create(user=customer)
+
+    def sync(self, since, **params):
+        response = self.client.get(self.url, {'since': since, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_since_returns_only_changed_orders(self):
+        initial = self.sync('')
+        self.assertEqual([order['id'] for order in initial['results']], [order.id for order in self.orders])
+        self.assertFalse(initial['has_more'])
+
+        self.assertEqual(self.sync(initial['since'])['results'], [])
+
+        changed = self.orders[1]
+        changed.order_status = 'PREPARING'
+        changed.save()
+
+        delta = self.sync(initial['since'])
+        self.assertEqual([order['id'] for order in delta['results']], [changed.id])
+        self.assertEqual(delta['results'][0]['order_status'], 'PREPARING')
+        self.assertEqual(self.sync(delta['since'])['results'], [])
+
+    def test_since_pages_through_large_deltas(self):
+        first = self.sync('', page_size=3)
+        self.assertTrue(first['has_more'])
+
+        with self.assertNumQueries(2):
+            second = self.client.get(self.url, {'since': first['since'], 'page_size': 3}).data
+        self.assertFalse(second['has_more'])
+        self.assertEqual(
+            [order['id'] for order in first['results'] + second['results']],
+            [order.id for order in self.orders],
+        )
+
+    def test_since_picks_up_rows_committed_behind_the_cursor(self):
+        initial = self.sync('')
+        newest = max(order.updated_at for order in Orders.objects.filter(waiter=self.waiter))
+
+        # Saved before the newest change, but only visible now
+        late = Orders.objects.create(user=self.orders[0].user, waiter=self.waiter)
+        Orders.objects.filter(pk=late.pk).update(updated_at=newest - timedelta(seconds=5))
+        # Older than the safety window: was there all along
+        stale = Orders.objects.create(user=self.orders[0].user, waiter=self.waiter)
+        Orders.objects.filter(pk=stale.pk).update(updated_at=newest - timedelta(minutes=5))
+
+        delta = self.sync(initial['since'])
+        self.assertEqual([order['id'] for order in delta['results']], [late.id])
+        self.assertEqual(self.sync(delta['since'])['results'], [])
+
+        # A second change to a delivered row inside the window is sent again
+        Orders.objects.filter(pk=late.pk).update(updated_at=newest - timedelta(seconds=4))
+        self.assertEqual([order['id'] for order in self.sync(delta['since'])['results']], [late.id])
+
+    def test_invalid_since_cursor(self):
+        response = self.client.get(self.url, {'since': 'garbage'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,105 @@
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.restaurants.models import OrderItem, Orders
+from apps.restaurants.utils import build_personal_recommendations, personal_recommendations
+from apps.restaurants.utils.personal_recommendations import load_personal_model
+from .helper.fixtures_helper import create_profile, create_menu_items
+
+
+class PersonalRecommendationTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.burger, cls.fries, cls.salad, cls.soup = create_menu_items(4)
+        cls.restaurant = cls.burger.menu.restaurant
+
+        # Two groups of customers with different tastes
+        for name in ('ali', 'sara', 'omar'):
+            cls.order(create_profile(name), (cls.burger, 1), (cls.fries, 2))
+        for name in ('hina', 'zara', 'bilal', 'umar'):
+            cls.order(create_profile(name), (cls.salad, 1), (cls.soup, 1))
+        cls.burger_fan = create_profile('burger_fan')
+        cls.order(cls.burger_fan, (cls.burger, 1))
+
+    def setUp(self):
+        data_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, data_dir, ignore_errors=True)
+        settings_override = override_settings(ANALYTICS_DATA_DIR=data_dir, PERSONAL_RECOMMENDATION_FACTORS=4)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    @staticmethod
+    def order(profile, *lines):
+        order = Orders.objects.create(user=profile, ordered=True)
+        OrderItem.objects.bulk_create([
+            OrderItem(order=order, menu_item=menu_item, quantity=quantity, price=menu_item.price)
+            for menu_item, quantity in lines
+        ])
+
+    def ranked(self, profile_id):
+        return [item_id for item_id, _ in personal_recommendations(profile_id, self.restaurant.pk)]
+
+    def test_scores_from_similar_users(self):
+        call_command('build_personal_recommendations', stdout=StringIO())
+
+        ranked = self.ranked(self.burger_fan.pk)
+        self.assertEqual(set(ranked[:2]), {self.burger.pk, self.fries.pk})
+        self.assertEqual(len(ranked), 4)
+
+    def test_cold_start_falls_back_to_popularity(self):
+        build_personal_recommendations()
+        # fries: 6 sold, salad and soup: 4 each, burger: 4
+        self.assertEqual(self.ranked(None)[0], self.fries.pk)
+        self.assertEqual(self.ranked(create_profile('newcomer').pk)[0], self.fries.pk)
+        self.assertEqual(personal_recommendations(None, self.restaurant.pk + 100), [])
+
+    def test_reloads_new_builds(self):
+        self.assertIsNone(load_personal_model())
+        build_personal_recommendations()
+        first = load_personal_model()
+        self.assertIs(load_personal_model(), first)
+
+        build_personal_recommendations()
+        self.assertIsNot(load_personal_model(), first)
+
+    def test_keeps_the_previous_build(self):
+        for _ in range(3):
+            build_personal_recommendations()
+        build = os.path.dirname(load_personal_model()['user_ids'].filename)
+        base = os.path.dirname(build)
+        builds = sorted(name for name in os.listdir(base) if name.isdigit())
+        self.assertEqual(len(builds), 2)
+        self.assertEqual(os.path.basename(build), builds[-1])
+
+    def test_keeps_serving_when_the_build_disappears(self):
+        build_personal_recommendations()
+        model = load_personal_model()
+        base = os.path.dirname(os.path.dirname(model['user_ids'].filename))
+        with open(os.path.join(base, 'CURRENT'), 'w') as handle:
+            handle.write('1')  # removed by a newer build in the meantime
+
+        self.assertIs(load_personal_model(), model)
+
+    def test_view_serves_user_and_anonymous_suggestions(self):
+        build_personal_recommendations()
+        url = reverse('restaurant-menu-suggestions-personal', args=[self.restaurant.pk])
+        extra = create_menu_items(1, restaurant=self.restaurant)[0]
+
+        client = APIClient()
+        client.force_authenticate(user=self.burger_fan.user)
+        response = client.get(url, {'n': 5})
+        self.assertEqual(response.status_code, 200)
+        ids = [item['id'] for item in response.data]
+        self.assertEqual(set(ids[:2]), {self.burger.pk, self.fries.pk})
+        # Never-ordered items fill up the list
+        self.assertEqual(ids[-1], extra.pk)
+
+        response = APIClient().get(url, {'n': 1})
+        self.assertEqual([item['id'] for item in response.data], [self.fries.pk])
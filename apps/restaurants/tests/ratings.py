@@ -0,0 +1,246 @@
+import csv
+import shutil
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.restaurants.ai.utils import get_restaurant_ratings_path, restaurant_ratings_cache
+from apps.restaurants.models import OrderItem, Orders, Restaurant, Review
+from apps.restaurants.utils import compute_restaurant_ratings
+from .helper.fixtures_helper import create_profile, create_menu_items
+
+
+class RestaurantRatingPipelineTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = create_profile('customer')
+        cls.kebab, cls.naan = create_menu_items(2)
+        cls.cafe = cls.kebab.menu.restaurant
+        cls.latte = create_menu_items(1)[0]
+        cls.bar = cls.latte.menu.restaurant
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        settings_override = override_settings(
+            ANALYZER_DIR=directory, ANALYZER_CACHE_DIR=str(Path(directory) / 'cache'),
+            ANALYZER_CHECK_INTERVAL=0, RATING_PRIOR_WEIGHT=2,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        restaurant_ratings_cache.clear()
+        self.addCleanup(restaurant_ratings_cache.clear)
+        cache.clear()
+
+    def review(self, rate, *menu_items):
+        order = Orders.objects.create(user=self.customer, ordered=True)
+        OrderItem.objects.bulk_create([
+            OrderItem(order=order, menu_item=menu_item, price=menu_item.price) for menu_item in menu_items
+        ])
+        return Review.objects.create(order=order, user=self.customer, rate=rate)
+
+    def output(self):
+        with get_restaurant_ratings_path().open() as f:
+            return {
+                int(row['restaurant_id']): (float(row['avg_rating']), int(row['review_count']))
+                for row in csv.DictReader(f)
+            }
+
+    def test_bayesian_average_counts_each_review_once_per_restaurant(self):
+        # Two items of the cafe in one order still make one cafe review
+        self.review(5, self.kebab, self.naan)
+        self.review(3, self.kebab, self.latte)
+        self.review(1, self.latte)
+        self.assertEqual(compute_restaurant_ratings(), 3)
+
+        # Global mean 3, prior weight 2
+        self.assertEqual(self.output(), {
+            self.cafe.pk: ((2 * 3 + 8) / 4, 2),
+            self.bar.pk: ((2 * 3 + 4) / 4, 2),
+        })
+
+    def test_incremental_runs_only_read_new_reviews(self):
+        self.review(5, self.kebab)
+        compute_restaurant_ratings()
+        with self.assertNumQueries(1):
+            self.assertEqual(compute_restaurant_ratings(), 0)
+
+        self.review(1, self.latte)
+        self.assertEqual(compute_restaurant_ratings(), 1)
+        incremental = self.output()
+
+        call_command('compute_restaurant_ratings', '--full', stdout=StringIO())
+        self.assertEqual(self.output(), incremental)
+        self.assertEqual(incremental[self.cafe.pk], (round((2 * 3 + 5) / 3, 4), 1))
+
+    def test_reviews_committed_late_are_counted_once(self):
+        self.review(5, self.kebab)
+        late = self.review(1, self.latte)
+        self.review(4, self.kebab)
+        # Its id was taken, but the transaction had not committed yet
+        Review.objects.filter(pk=late.pk).delete()
+        self.assertEqual(compute_restaurant_ratings(), 2)
+
+        Review.objects.create(pk=late.pk, order=late.order, user=self.customer, rate=1)
+        self.assertEqual(compute_restaurant_ratings(), 1)
+        self.assertEqual(compute_restaurant_ratings(), 0)
+        incremental = self.output()
+
+        compute_restaurant_ratings(full=True)
+        self.assertEqual(self.output(), incremental)
+        self.assertEqual(incremental[self.bar.pk][1], 1)
+
+    def test_top_suggestions_serve_computed_ratings(self):
+        self.review(5, self.kebab)
+        self.review(2, self.latte)
+        compute_restaurant_ratings()
+
+        response = APIClient().get(reverse('restaurant-suggestions-top'), {'include_scores': 1})
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertEqual([row['restaurant']['id'] for row in results], [self.cafe.pk, self.bar.pk])
+        self.assertEqual(results[0]['avg_rating'], round((2 * 3.5 + 5) / 3, 3))
+
+
+    def test_top_suggestions_are_rendered_once_per_version(self):
+        self.review(5, self.kebab)
+        self.review(2, self.latte)
+        compute_restaurant_ratings()
+        client = APIClient()
+        url = reverse('restaurant-suggestions-top')
+
+        first = client.get(url, {'n': 5})
+        self.assertEqual([row['id'] for row in first.json()], [self.cafe.pk, self.bar.pk])
+        with self.assertNumQueries(0):
+            self.assertEqual(client.get(url, {'n': 5}).content, first.content)
+        # Every (n, include_scores) combination has its own entry
+        self.assertEqual(len(client.get(url, {'n': 1}).json()), 1)
+        self.assertIn('results', client.get(url, {'n': 5, 'include_scores': 1}).json())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.cafe.name = 'Renamed cafe'
+            self.cafe.save()
+        self.assertEqual(client.get(url, {'n': 5}).json()[0]['name'], 'Renamed cafe')
+
+        # A new ratings file changes the ranking without any invalidation
+        for _ in range(3):
+            self.review(1, self.kebab)
+        self.review(5, self.latte)
+        compute_restaurant_ratings()
+        restaurant_ratings_cache.get()
+        restaurant_ratings_cache._reloader.join()
+        self.assertEqual([row['id'] for row in client.get(url, {'n': 5}).json()], [self.bar.pk, self.cafe.pk])
+
+class RatingAggregatesAPITestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = create_profile('rater')
+        cls.kebab, cls.naan = create_menu_items(2)
+        cls.cafe = cls.kebab.menu.restaurant
+        cls.latte = create_menu_items(1)[0]
+        cls.bar = cls.latte.menu.restaurant
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.customer.user)
+
+    def order(self, *menu_items):
+        order = Orders.objects.create(user=self.customer, ordered=True)
+        OrderItem.objects.bulk_create([
+            OrderItem(order=order, menu_item=menu_item, price=menu_item.price) for menu_item in menu_items
+        ])
+        return order
+
+    def post_review(self, order, rate):
+        response = self.client.post(
+            reverse('reviews-list'), {'order': order.pk, 'rate': rate}, format='json'
+        )
+        self.assertEqual(response.status_code, 201, response.data)
+        return response.data['id']
+
+    def aggregates(self, obj):
+        obj.refresh_from_db()
+        return obj.rating_count, obj.rating_sum, obj.rating_average, obj.rating_histogram
+
+    def test_create_edit_and_delete_move_the_aggregates(self):
+        first = self.post_review(self.order(self.kebab, self.naan, self.latte), 5)
+        self.post_review(self.order(self.kebab), 2)
+
+        histogram = {'1': 0, '2': 1, '3': 0, '4': 0, '5': 1}
+        self.assertEqual(self.aggregates(self.cafe), (2, 7, 3.5, histogram))
+        self.assertEqual(self.aggregates(self.kebab), (2, 7, 3.5, histogram))
+        self.assertEqual(self.aggregates(self.naan)[:3], (1, 5, 5.0))
+        self.assertEqual(self.aggregates(self.bar)[:3], (1, 5, 5.0))
+
+        response = self.client.patch(
+            reverse('reviews-detail', args=[first]), {'rate': 4}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            self.aggregates(self.cafe), (2, 6, 3.0, {'1': 0, '2': 1, '3': 0, '4': 1, '5': 0})
+        )
+        self.assertEqual(self.aggregates(self.latte)[:3], (1, 4, 4.0))
+
+        response = self.client.delete(reverse('reviews-detail', args=[first]))
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.aggregates(self.bar), (0, 0, 0.0, {str(rate): 0 for rate in range(1, 6)}))
+        self.assertEqual(self.aggregates(self.kebab)[:3], (1, 2, 2.0))
+
+    def test_moving_a_review_to_another_order(self):
+        review = self.post_review(self.order(self.kebab), 3)
+        response = self.client.patch(
+            reverse('reviews-detail', args=[review]), {'order': self.order(self.latte).pk}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.aggregates(self.cafe)[:3], (0, 0, 0.0))
+        self.assertEqual(self.aggregates(self.bar)[:3], (1, 3, 3.0))
+
+    def test_restaurants_sort_by_rating(self):
+        self.post_review(self.order(self.latte), 4)
+        self.post_review(self.order(self.kebab), 2)
+        self.post_review(self.order(self.naan), 5)
+        plain = Restaurant.objects.create(name='Unrated')
+
+        response = self.client.get(reverse('restaurant-list'), {'ordering': 'rating'})
+        self.assertEqual(
+            [row['id'] for row in response.data['results']], [self.bar.pk, self.cafe.pk, plain.pk]
+        )
+        self.assertEqual(response.data['results'][0]['rating_average'], 4.0)
+
+        # The keyset cursor follows the rating ordering
+        response = self.client.get(reverse('restaurant-list'), {'ordering': 'rating', 'page_size': 1})
+        response = self.client.get(response.data['next'])
+        self.assertEqual([row['id'] for row in response.data['results']], [self.cafe.pk])
+
+        response = self.client.get(reverse('menu-list', args=[self.cafe.pk]), {'ordering': 'rating'})
+        self.assertEqual(
+            [item['id'] for item in response.json()['results'][0]['menu_items']], [self.naan.pk, self.kebab.pk]
+        )
+
+    def test_reconcile_repairs_drift(self):
+        self.post_review(self.order(self.kebab, self.latte), 5)
+        # Written around the API: not counted yet
+        Review.objects.create(order=self.order(self.kebab), user=self.customer, rate=1)
+        Restaurant.objects.filter(pk=self.bar.pk).update(rating_count=7)
+
+        out = StringIO()
+        call_command('reconcile_rating_aggregates', '--dry-run', stdout=out)
+        self.assertIn(f'Restaurant {self.bar.pk}: rating_count 7 -> 1', out.getvalue())
+        self.assertEqual(self.aggregates(self.bar)[0], 7)
+
+        call_command('reconcile_rating_aggregates', stdout=StringIO())
+        histogram = {'1': 1, '2': 0, '3': 0, '4': 0, '5': 1}
+        self.assertEqual(self.aggregates(self.cafe), (2, 6, 3.0, histogram))
+        self.assertEqual(self.aggregates(self.kebab), (2, 6, 3.0, histogram))
+        self.assertEqual(self.aggregates(self.bar)[:3], (1, 5, 5.0))
+        self.assertEqual(self.aggregates(self.naan)[:3], (0, 0, 0.0))
+
+        out = StringIO()
+        call_command('reconcile_rating_aggregates', stdout=out)
+        self.assertIn('Repaired 0', out.getvalue())
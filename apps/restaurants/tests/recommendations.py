@@ -0,0 +1,78 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.restaurants.models import Cart, CartItem, MenuItemRecommendation, OrderItem, Orders
+from apps.restaurants.utils import build_co_occurrence_recommendations, complementary_items
+from .helper.fixtures_helper import create_profile, create_menu_items
+
+
+class ItemRecommendationTestCase(TestCase):
+    def setUp(self):
+        self.customer = create_profile('customer')
+        self.burger, self.fries, self.cola, self.salad = create_menu_items(4)
+        self.restaurant = self.burger.menu.restaurant
+        self.other_pizza = create_menu_items(1)[0]
+
+        self.order(self.burger, self.fries, self.cola)
+        self.order(self.burger, self.fries)
+        self.order(self.burger, self.fries, self.other_pizza)
+        self.order(self.burger, self.cola)
+        self.order(self.salad)
+
+    def order(self, *menu_items, **fields):
+        order = Orders.objects.create(user=self.customer, ordered=True, **fields)
+        OrderItem.objects.bulk_create([
+            OrderItem(order=order, menu_item=menu_item, price=menu_item.price) for menu_item in menu_items
+        ])
+        return order
+
+    def neighbours(self, menu_item):
+        return [item_id for item_id, _ in MenuItemRecommendation.objects.get(menu_item=menu_item).neighbours]
+
+    def test_build_ranks_same_restaurant_neighbours(self):
+        call_command('build_item_recommendations', stdout=StringIO())
+
+        self.assertEqual(self.neighbours(self.burger), [self.fries.pk, self.cola.pk])
+        self.assertEqual(self.neighbours(self.cola), [self.burger.pk, self.fries.pk])
+        # Pizza is from another restaurant and salad was never ordered with anything
+        self.assertFalse(MenuItemRecommendation.objects.filter(menu_item__in=[self.other_pizza, self.salad]).exists())
+
+        score = dict(MenuItemRecommendation.objects.get(menu_item=self.burger).neighbours)[self.fries.pk]
+        self.assertAlmostEqual(score, 3 / (4 * 3) ** 0.5, places=4)
+
+    @override_settings(RECOMMENDATION_MAX_ORDER_SIZE=2)
+    def test_ignores_cancelled_and_oversized_orders(self):
+        self.order(self.salad, self.cola, order_cancelled=True)
+        self.assertEqual(build_co_occurrence_recommendations(), 3)
+        # Only the two-item orders count: one each with fries and cola, and
+        # cola is the rarer item
+        self.assertEqual(self.neighbours(self.burger), [self.cola.pk, self.fries.pk])
+        self.assertEqual(self.neighbours(self.cola), [self.burger.pk])
+
+    def test_complementary_items_combine_cart_items(self):
+        build_co_occurrence_recommendations()
+        with self.assertNumQueries(1):
+            ranked = complementary_items([self.fries.pk, self.cola.pk], self.restaurant.pk)
+        self.assertEqual([item_id for item_id, _ in ranked], [self.burger.pk])
+        self.assertEqual(complementary_items([self.burger.pk], self.other_pizza.menu.restaurant_id), [])
+
+    def test_suggestions_view_uses_cart_and_fills_up(self):
+        build_co_occurrence_recommendations()
+        client = APIClient()
+        client.force_authenticate(user=self.customer.user)
+        cart = Cart.objects.create(user=self.customer)
+        CartItem.objects.create(cart=cart, menu_item=self.cola, price=self.cola.price)
+
+        url = reverse('restaurant-menu-suggestions', args=[self.restaurant.pk])
+        response = client.get(url, {'n': 3})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item['id'] for item in response.data][:2], [self.burger.pk, self.fries.pk])
+        self.assertEqual(len(response.data), 3)
+        self.assertNotIn(self.cola.pk, [item['id'] for item in response.data])
+
+        response = APIClient().get(url, {'items': f'{self.fries.pk}'})
+        self.assertEqual([item['id'] for item in response.data][:2], [self.burger.pk, self.cola.pk])
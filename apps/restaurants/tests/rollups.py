@@ -0,0 +1,112 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.restaurants.models import Cart, CartItem, DailySalesRollup, HourlySalesRollup, Orders
+from .helper.fixtures_helper import create_profile, create_menu_items
+
+
+class SalesRollupTestCase(TestCase):
+    def setUp(self):
+        self.customer = create_profile('customer')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.customer.user)
+        self.pizza, self.pasta = create_menu_items(2, price=Decimal('8.00'))
+        self.coffee = create_menu_items(1, price=Decimal('2.50'))[0]
+        self.restaurant = self.pizza.menu.restaurant
+
+    def checkout(self, lines):
+        cart, _ = Cart.objects.get_or_create(user=self.customer)
+        for menu_item, quantity in lines:
+            CartItem.objects.create(cart=cart, menu_item=menu_item, quantity=quantity, price=menu_item.price)
+        cart.update_total_price()
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('checkout-order'), {'order_type': 'TAKEAWAY'}, format='json')
+        return Orders.objects.get(pk=response.data['id'])
+
+    def snapshot(self):
+        return {
+            model.__name__: sorted(
+                model.objects.values_list('restaurant_id', 'order_count', 'revenue', 'items_sold')
+            )
+            for model in (HourlySalesRollup, DailySalesRollup)
+        }
+
+    def test_checkout_updates_rollups_incrementally(self):
+        self.checkout([(self.pizza, 2), (self.pasta, 1)])
+        self.checkout([(self.pizza, 1), (self.coffee, 2)])
+
+        daily = DailySalesRollup.objects.get(restaurant=self.restaurant, day=timezone.localdate())
+        self.assertEqual(daily.order_count, 2)
+        self.assertEqual(daily.revenue, Decimal('32.00'))
+        self.assertEqual(daily.items_sold, 4)
+        self.assertEqual(daily.average_ticket, Decimal('16.00'))
+
+        hourly = HourlySalesRollup.objects.get(restaurant=self.coffee.menu.restaurant)
+        self.assertEqual((hourly.order_count, hourly.revenue), (1, Decimal('5.00')))
+
+    def test_rebuild_matches_incremental_rollups(self):
+        self.checkout([(self.pizza, 1), (self.coffee, 2)])
+        self.checkout([(self.pasta, 4)])
+        incremental = self.snapshot()
+
+        HourlySalesRollup.objects.all().delete()
+        DailySalesRollup.objects.all().delete()
+        call_command('rebuild_sales_rollups', stdout=StringIO())
+        self.assertEqual(self.snapshot(), incremental)
+
+    def test_cancellation_takes_the_order_out(self):
+        self.checkout([(self.pizza, 1), (self.coffee, 2)])
+        order = self.checkout([(self.pizza, 2), (self.pasta, 1)])
+
+        order.order_cancelled = True
+        with self.captureOnCommitCallbacks(execute=True):
+            order.save()
+        daily = DailySalesRollup.objects.get(restaurant=self.restaurant)
+        self.assertEqual((daily.order_count, daily.revenue, daily.items_sold), (1, Decimal('8.00'), 1))
+
+        incremental = self.snapshot()
+        call_command('rebuild_sales_rollups', stdout=StringIO())
+        self.assertEqual(self.snapshot(), incremental)
+
+        # Saving it again changes nothing, restoring it counts it again
+        with self.captureOnCommitCallbacks(execute=True):
+            order.save()
+            Orders.objects.get(pk=order.pk).save()
+        self.assertEqual(self.snapshot(), incremental)
+        order.order_cancelled = False
+        with self.captureOnCommitCallbacks(execute=True):
+            order.save()
+        self.assertEqual(DailySalesRollup.objects.get(restaurant=self.restaurant).order_count, 2)
+
+    def test_cancelled_only_order_leaves_no_rollup(self):
+        order = self.checkout([(self.coffee, 1)])
+        order.order_cancelled = True
+        with self.captureOnCommitCallbacks(execute=True):
+            order.save()
+        self.assertEqual(self.snapshot(), {'HourlySalesRollup': [], 'DailySalesRollup': []})
+
+    def test_rebuild_includes_archived_orders(self):
+        old = self.checkout([(self.pizza, 3)])
+        Orders.objects.filter(pk=old.pk).update(
+            created_at=timezone.now() - timedelta(days=200), order_status='COMPLETED'
+        )
+        call_command('archive_orders', stdout=StringIO())
+        self.checkout([(self.pasta, 1)])
+
+        call_command('rebuild_sales_rollups', stdout=StringIO())
+        days = dict(
+            DailySalesRollup.objects.filter(restaurant=self.restaurant).values_list('day', 'revenue')
+        )
+        self.assertEqual(sorted(days.values()), [Decimal('8.00'), Decimal('24.00')])
+
+        # Rebuilding only recent days leaves the archived day alone
+        rebuilt = self.snapshot()
+        call_command('rebuild_sales_rollups', '--since', str(timezone.localdate()), stdout=StringIO())
+        self.assertEqual(self.snapshot(), rebuilt)
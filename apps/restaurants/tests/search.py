@@ -0,0 +1,82 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.urls import reverse
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from apps.restaurants.models import (
+    Restaurant,
+    Menu,
+    MenuItem,
+    MenuItemIngredient,
+    Category,
+)
+
+
+class MenuItemSearchAPITestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse('menu-item-search')
+
+        self.restaurant = Restaurant.objects.create(name='Urban Bistro')
+        self.other_restaurant = Restaurant.objects.create(name='Coastal Diner')
+        self.mains = Category.objects.create(name='Mains')
+        menu = Menu.objects.create(restaurant=self.restaurant, name='Dinner')
+        other_menu = Menu.objects.create(restaurant=self.other_restaurant, name='Dinner')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.curry = MenuItem.objects.create(
+                menu=menu, name='Smoky Chicken Curry', price=Decimal('12.00'),
+                description='Slow cooked with tomato.', category=self.mains,
+            )
+            self.salad = MenuItem.objects.create(
+                menu=menu, name='Garden Salad', price=Decimal('7.00'),
+                description='Served with grilled chicken on request.',
+            )
+            self.burger = MenuItem.objects.create(
+                menu=other_menu, name='Chicken Burger', price=Decimal('9.00'),
+            )
+            MenuItemIngredient.objects.create(menu_item=self.salad, name='Spinach')
+
+    def search(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [item['id'] for item in response.json()['results']]
+
+    def test_results_are_ranked(self):
+        # A name match outranks a description match
+        self.assertEqual(
+            self.search(q='chicken', restaurant=self.restaurant.id),
+            [self.curry.id, self.salad.id],
+        )
+
+    def test_all_terms_must_match_as_prefix(self):
+        self.assertEqual(self.search(q='chick curr'), [self.curry.id])
+        self.assertEqual(self.search(q='mains'), [self.curry.id])
+        self.assertEqual(self.search(q='spinach'), [self.salad.id])
+        self.assertEqual(self.search(q='  '), [])
+
+    def test_index_follows_changes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            MenuItemIngredient.objects.create(menu_item=self.burger, name='Jalapeno')
+            self.mains.name = 'Specials'
+            self.mains.save()
+            self.salad.delete()
+
+        self.assertEqual(self.search(q='jalapeno'), [self.burger.id])
+        self.assertEqual(self.search(q='specials'), [self.curry.id])
+        self.assertEqual(self.search(q='mains'), [])
+        self.assertEqual(self.search(q='spinach'), [])
+
+    def test_rebuild_command(self):
+        MenuItem.objects.bulk_create([
+            MenuItem(menu=self.curry.menu, name='Lamb Kebab', price=Decimal('11.00')),
+        ])
+        self.assertEqual(self.search(q='kebab'), [])
+
+        call_command('rebuild_menu_search_index', stdout=StringIO())
+        self.assertEqual(len(self.search(q='kebab')), 1)
+        self.assertEqual(len(self.search(q='chicken')), 3)
@@ -0,0 +1,96 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.restaurants.models import MenuItemIngredient, MenuItemRecommendation, Restaurant
+from apps.restaurants.utils import build_pending_similar_items, build_similar_items, similar_items
+from .helper.fixtures_helper import create_menu_items
+
+
+class SimilarItemsTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.biryani, cls.pulao, cls.kheer, cls.chai, cls.sindhi = create_menu_items(5)
+        cls.restaurant = cls.biryani.menu.restaurant
+        cls.elsewhere, = create_menu_items(1)
+        for item, ingredients in (
+            (cls.biryani, ['Rice', 'Chicken', 'Saffron']),
+            (cls.sindhi, ['rice ', 'chicken', 'saffron']),
+            (cls.pulao, ['Rice', 'Chicken', 'Peas']),
+            (cls.kheer, ['Rice', 'Milk', 'Sugar']),
+            (cls.chai, ['Milk', 'Sugar', 'Tea leaves']),
+            (cls.elsewhere, ['Rice', 'Chicken', 'Saffron']),
+        ):
+            MenuItemIngredient.objects.bulk_create([
+                MenuItemIngredient(menu_item=item, name=name) for name in ingredients
+            ])
+
+    def ranked(self, item):
+        return [item_id for item_id, _ in similar_items(item.pk)]
+
+    def test_neighbours_weight_rare_ingredients(self):
+        call_command('build_similar_items', stdout=StringIO())
+
+        # Same (normalized) ingredients, then shared chicken beats shared rice
+        self.assertEqual(self.ranked(self.biryani), [self.sindhi.pk, self.pulao.pk, self.kheer.pk])
+        self.assertEqual(similar_items(self.biryani.pk, limit=1), [(self.sindhi.pk, 1.0)])
+        # Nothing in common with the chai, nothing from another restaurant
+        self.assertEqual(self.ranked(self.chai), [self.kheer.pk])
+        self.assertEqual(self.ranked(self.elsewhere), [])
+
+    def stale_ids(self):
+        return set(Restaurant.objects.filter(similar_items_stale=True).values_list('pk', flat=True))
+
+    def test_ingredient_changes_rebuild_only_their_restaurant(self):
+        build_similar_items()
+        elsewhere_rows = list(MenuItemRecommendation.objects.exclude(
+            menu_item__menu__restaurant=self.restaurant).values_list('pk', flat=True))
+
+        # Marked in the request, rebuilt later
+        with self.captureOnCommitCallbacks(execute=True):
+            MenuItemIngredient.objects.create(menu_item=self.chai, name='Saffron')
+            MenuItemIngredient.objects.create(menu_item=self.chai, name='Cardamom')
+        self.assertEqual(self.stale_ids(), {self.restaurant.pk})
+        self.assertEqual(self.ranked(self.chai), [self.kheer.pk])
+
+        out = StringIO()
+        call_command('build_similar_items', '--pending', stdout=out)
+        self.assertIn('Rebuilding 1 restaurants', out.getvalue())
+        self.assertEqual(self.stale_ids(), set())
+        self.assertEqual(self.ranked(self.chai)[0], self.kheer.pk)
+        self.assertIn(self.chai.pk, self.ranked(self.biryani))
+
+        self.kheer.delete()
+        self.assertEqual(build_pending_similar_items()[0], 1)
+        self.assertNotIn(self.kheer.pk, self.ranked(self.chai))
+        self.assertEqual(
+            list(MenuItemRecommendation.objects.exclude(
+                menu_item__menu__restaurant=self.restaurant).values_list('pk', flat=True)),
+            elsewhere_rows,
+        )
+        self.assertEqual(build_pending_similar_items(), (0, 0))
+
+    def test_rebuild_replaces_existing_lists(self):
+        build_similar_items([self.restaurant.pk])
+        rows = MenuItemRecommendation.objects.filter(kind='similar').count()
+
+        # A second build of the same restaurant does not collide with the first
+        self.assertEqual(build_similar_items([self.restaurant.pk, self.restaurant.pk]), rows)
+        self.assertEqual(MenuItemRecommendation.objects.filter(kind='similar').count(), rows)
+
+    def test_endpoint(self):
+        build_similar_items([self.restaurant.pk])
+        client = APIClient()
+
+        # Neighbour list, items, ingredients
+        with self.assertNumQueries(3):
+            response = client.get(reverse('menu-item-similar', args=[self.biryani.pk]), {'n': 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['id'] for row in response.data['results']], [self.sindhi.pk, self.pulao.pk])
+        self.assertEqual(response.data['results'][0]['score'], 1.0)
+
+        response = client.get(reverse('menu-item-similar', args=[self.elsewhere.pk]))
+        self.assertEqual(response.data, {'count': 0, 'results': []})
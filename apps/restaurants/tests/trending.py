@@ -0,0 +1,123 @@
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.restaurants.models import MenuItemTrend, OrderItem, Orders, Restaurant
+from apps.restaurants.utils import materialize_trending_items, record_order_trends, trending_items
+from apps.restaurants.utils.trending import landmark_for, trending_cache
+from .helper.fixtures_helper import create_profile, create_menu_items
+
+
+@override_settings(TRENDING_HALF_LIFE_HOURS=6, TRENDING_LANDMARK_HOURS=24, TRENDING_TOP_K=3)
+class TrendingItemsTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = create_profile('hungry')
+        cls.lahore = Restaurant.objects.create(name='Lahore Grill', city='Lahore')
+        cls.karahi, cls.tikka, cls.lassi = create_menu_items(3, restaurant=cls.lahore)
+        cls.cafe = Restaurant.objects.create(name='Cafe', city=' lahore ')
+        cls.latte, = create_menu_items(1, restaurant=cls.cafe)
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        settings_override = override_settings(
+            ANALYTICS_DATA_DIR=directory, ANALYZER_CACHE_DIR=str(Path(directory) / 'cache'),
+            ANALYZER_CHECK_INTERVAL=0,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        trending_cache.clear()
+        self.addCleanup(trending_cache.clear)
+        self.now = timezone.now()
+
+    def order(self, hours_ago, *lines):
+        order = Orders.objects.create(user=self.customer, ordered=True)
+        Orders.objects.filter(pk=order.pk).update(created_at=self.now - timedelta(hours=hours_ago))
+        OrderItem.objects.bulk_create([
+            OrderItem(order=order, menu_item=menu_item, quantity=quantity, price=menu_item.price)
+            for menu_item, quantity in lines
+        ])
+        record_order_trends(order.pk)
+        return order
+
+    def trending(self, **scope):
+        return [(item_id, round(score, 3)) for item_id, score in trending_items(**scope)]
+
+    def test_counts_decay_with_the_half_life(self):
+        # Two half-lives ago: 8 -> 2
+        self.order(12, (self.karahi, 8))
+        self.order(0, (self.tikka, 3), (self.karahi, 1))
+        self.order(6, (self.lassi, 1))
+        materialize_trending_items(now=self.now)
+
+        self.assertEqual(self.trending(restaurant_id=self.lahore.pk), [
+            (self.karahi.pk, 3.0), (self.tikka.pk, 3.0), (self.lassi.pk, 0.5),
+        ])
+        self.assertEqual(self.trending(restaurant_id=self.lahore.pk, limit=1), [(self.karahi.pk, 3.0)])
+
+    def test_counters_move_to_new_landmarks(self):
+        landmark = landmark_for(self.now)
+        hours_into_period = (self.now - landmark) / timedelta(hours=1)
+        # Ordered during the previous two landmark periods, then now
+        self.order(hours_into_period + 30, (self.latte, 32))
+        self.order(hours_into_period + 6, (self.latte, 4))
+        self.assertEqual(MenuItemTrend.objects.get(pk=self.latte.pk).landmark, landmark - timedelta(hours=24))
+        self.order(0, (self.latte, 1))
+
+        trend = MenuItemTrend.objects.get(pk=self.latte.pk)
+        self.assertEqual(trend.landmark, landmark)
+        decay = 2 ** (-hours_into_period / 6)
+        # 32 and 4 units, 5 and 1 half-lives before the landmark, plus 1 now
+        self.assertAlmostEqual(trend.score, 1 + 2 + 1 / decay)
+
+        materialize_trending_items(now=self.now)
+        [(item_id, score)] = trending_items(restaurant_id=self.cafe.pk)
+        self.assertEqual(item_id, self.latte.pk)
+        self.assertAlmostEqual(score, 3 * decay + 1, places=4)
+
+    def test_checkout_updates_counters_without_reading_history(self):
+        for _ in range(5):
+            self.order(1, (self.karahi, 1), (self.tikka, 1))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            order = Orders.objects.create(user=self.customer, ordered=True)
+            OrderItem.objects.bulk_create([
+                OrderItem(order=order, menu_item=self.karahi, quantity=2, price=self.karahi.price),
+                OrderItem(order=order, menu_item=self.tikka, quantity=1, price=self.tikka.price),
+            ])
+        trend = MenuItemTrend.objects.get(pk=self.karahi.pk)
+        self.assertGreater(trend.score, 6)
+
+        # The order, its lines, one UPDATE per item (inside a savepoint)
+        order = Orders.objects.create(user=self.customer, ordered=True)
+        OrderItem.objects.create(order=order, menu_item=self.karahi, quantity=1, price=self.karahi.price)
+        with self.assertNumQueries(5):
+            record_order_trends(order.pk)
+
+    def test_endpoints_serve_restaurant_and_city_lists(self):
+        self.order(0, (self.karahi, 3), (self.lassi, 1))
+        self.order(0, (self.latte, 2))
+        call_command('materialize_trending_items', stdout=StringIO())
+
+        client = APIClient()
+        response = client.get(reverse('restaurant-menu-trending', args=[self.lahore.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['id'] for row in response.data['results']], [self.karahi.pk, self.lassi.pk])
+        self.assertEqual(response.data['results'][0]['score'], 3.0)
+
+        # City names are matched case-insensitively; items + ingredients only
+        with self.assertNumQueries(2):
+            response = client.get(reverse('city-menu-trending', args=['LAHORE']), {'n': 2})
+        self.assertEqual([row['id'] for row in response.data['results']], [self.karahi.pk, self.latte.pk])
+
+        response = client.get(reverse('city-menu-trending', args=['Karachi']))
+        self.assertEqual(response.data, {'count': 0, 'results': []})
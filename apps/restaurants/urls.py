@@ -5,6 +5,7 @@ from apps.restaurants.views import (
     MenuDetailView,
     MenuItemListView,
     MenuItemDetailView,
+    MenuItemSearchView,
     TableViewSet,
     QRScanView,
     CreateCartAPIView,
@@ -12,15 +13,23 @@ from apps.restaurants.views import (
     RetrieveCartAPIView,
     DeleteCartItemAPIView,
     UpdateCartItemAPIView,
+    CartBatchAPIView,
     ReviewViewSet,
     OrderCheckoutAPIView,
     UserOrderHistoryAPIView,
     WaiterOrderListAPIView,
+    OrderStatusTransitionAPIView,
     RestaurantViewSet,
+    OwnerItemRankingAPIView,
+    OwnerOrderHeatmapAPIView,
+    OwnerSalesSummaryAPIView,
 )
 from apps.restaurants.views.ai import (
     RestaurantTopSuggestionsView,
-    RestaurantMenuSuggestionsView
+    RestaurantMenuSuggestionsView,
+    PersonalMenuSuggestionsView,
+    TrendingMenuItemsView,
+    SimilarMenuItemsView,
 )
 
 
@@ -51,6 +60,7 @@ urlpatterns = [
          name='menu-item-list'),
     path('menus/<int:menu_id>/menu-items/<int:id>/',
          MenuItemDetailView.as_view(), name='menu-item-detail'),
+    path('menu-items/search/', MenuItemSearchView.as_view(), name='menu-item-search'),
 
     # QR code scanning endpoint
     path("tables/scan-qr/", QRScanView.as_view(), name="scan-qr"),
@@ -60,6 +70,14 @@ urlpatterns = [
          name='restaurant-suggestions-top'),
     path('ai/restaurants/<int:restaurant_id>/menus/suggestions/',
          RestaurantMenuSuggestionsView.as_view(), name='restaurant-menu-suggestions'),
+    path('ai/restaurants/<int:restaurant_id>/menus/suggestions/personal/',
+         PersonalMenuSuggestionsView.as_view(), name='restaurant-menu-suggestions-personal'),
+    path('ai/restaurants/<int:restaurant_id>/menus/trending/',
+         TrendingMenuItemsView.as_view(), name='restaurant-menu-trending'),
+    path('ai/cities/<str:city>/menus/trending/',
+         TrendingMenuItemsView.as_view(), name='city-menu-trending'),
+    path('ai/menu-items/<int:menu_item_id>/similar/',
+         SimilarMenuItemsView.as_view(), name='menu-item-similar'),
 
     # Cart and CartItem endpoints
     path('cart/create-cart/', CreateCartAPIView.as_view(), name='create-cart'),
@@ -70,8 +88,18 @@ urlpatterns = [
          name='delete-cart-item'),
     path('cart/update-cart-item/<int:pk>/', UpdateCartItemAPIView.as_view(),
          name='update-cart-item'),
+    path('cart/batch/', CartBatchAPIView.as_view(), name='cart-batch'),
 
     path('orders/checkout-order/', OrderCheckoutAPIView.as_view(), name='checkout-order'),
     path('orders/', UserOrderHistoryAPIView.as_view(), name='user-order-history'),
-    path('orders/waiter/', WaiterOrderListAPIView.as_view(), name='waiter-order-list')
+    path('orders/waiter/', WaiterOrderListAPIView.as_view(), name='waiter-order-list'),
+    path('orders/status/', OrderStatusTransitionAPIView.as_view(), name='order-status-transition'),
+
+    # Owner analytics
+    path('restaurants/<int:restaurant_id>/analytics/items/', OwnerItemRankingAPIView.as_view(),
+         name='owner-analytics-items'),
+    path('restaurants/<int:restaurant_id>/analytics/heatmap/', OwnerOrderHeatmapAPIView.as_view(),
+         name='owner-analytics-heatmap'),
+    path('restaurants/<int:restaurant_id>/analytics/summary/', OwnerSalesSummaryAPIView.as_view(),
+         name='owner-analytics-summary'),
 ]
@@ -0,0 +1,75 @@
+from .menu_snapshot import (
+    get_menu_snapshot_version,
+    get_menu_snapshot_etag,
+    get_menu_snapshot,
+    set_menu_snapshot,
+    invalidate_menu_snapshots,
+)
+from .menu_search import (
+    index_menu_items,
+    remove_menu_items,
+    rebuild_menu_search_index,
+    search_menu_items,
+)
+from .order_feed import (
+    ORDER_CREATED,
+    ORDER_STATUS_CHANGED,
+    restaurant_group,
+    waiter_group,
+    publish_order_events,
+)
+from .order_status import (
+    ORDER_STATUS_TRANSITIONS,
+    OrderTransitionError,
+    can_transition,
+    transition_orders,
+    transition_order,
+)
+from .order_archive import (
+    get_order_archive_horizon,
+    archive_completed_orders,
+)
+from .sales_rollups import (
+    record_order_sales,
+    rebuild_sales_rollups,
+)
+from .owner_analytics import (
+    load_sales_columns,
+    refresh_sales_columns,
+    sales_summary,
+    item_ranking,
+    order_heatmap,
+)
+from .order_export import stream_order_export
+from .recommendations import (
+    build_co_occurrence_recommendations,
+    complementary_items,
+)
+from .personal_recommendations import (
+    build_personal_recommendations,
+    personal_recommendations,
+)
+from .restaurant_ratings import compute_restaurant_ratings
+from .review_ratings import (
+    apply_review_rating,
+    restaurant_rating_subqueries,
+    menu_item_rating_subqueries,
+    reconcile_rating_aggregates,
+)
+from .top_suggestions import (
+    get_top_suggestions_version,
+    get_top_suggestions,
+    set_top_suggestions,
+    invalidate_top_suggestions,
+)
+from .trending import (
+    record_order_trends,
+    materialize_trending_items,
+    trending_items,
+)
+from .similar_items import (
+    build_similar_items,
+    build_pending_similar_items,
+    mark_similar_items_stale,
+    similar_items,
+)
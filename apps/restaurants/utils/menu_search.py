@@ -0,0 +1,198 @@
+"""
+Full-text search over menu items.
+
+Each menu item is indexed as one document made of its name, category,
+ingredient names and description, in decreasing order of weight. SQLite
+keeps the documents in an FTS5 virtual table and PostgreSQL in a tsvector
+column with a GIN index; both live in the ``menu_item_search`` table created
+by migration ``0003_menu_item_search``.
+"""
+import re
+
+from django.db import connection
+
+from apps.restaurants.models import MenuItem, MenuItemIngredient
+
+MENU_ITEM_SEARCH_TABLE = "menu_item_search"
+MAX_QUERY_TERMS = 8
+INDEX_BATCH_SIZE = 500
+
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+_SQLITE_REBUILD_SQL = f"""
+    INSERT INTO {MENU_ITEM_SEARCH_TABLE}
+        (rowid, name, description, category, ingredients, restaurant)
+    SELECT i.id, i.name, COALESCE(i.description, ''), COALESCE(c.name, ''),
+           COALESCE((SELECT group_concat(g.name, ' ')
+                     FROM restaurants_menuitemingredient g
+                     WHERE g.menu_item_id = i.id), ''),
+           'r' || m.restaurant_id
+    FROM restaurants_menuitem i
+    JOIN restaurants_menu m ON m.id = i.menu_id
+    LEFT JOIN category c ON c.id = i.category_id
+"""
+
+_POSTGRES_DOCUMENT_SQL = """
+    setweight(to_tsvector('simple', COALESCE(%s, '')), 'A') ||
+    setweight(to_tsvector('simple', COALESCE(%s, '')), 'B') ||
+    setweight(to_tsvector('simple', COALESCE(%s, '')), 'C') ||
+    setweight(to_tsvector('simple', COALESCE(%s, '')), 'D')
+"""
+
+_POSTGRES_REBUILD_SQL = f"""
+    INSERT INTO {MENU_ITEM_SEARCH_TABLE} (menu_item_id, restaurant_id, document)
+    SELECT i.id, m.restaurant_id,
+           {_POSTGRES_DOCUMENT_SQL % ('i.name', 'c.name', 'ing.names', 'i.description')}
+    FROM restaurants_menuitem i
+    JOIN restaurants_menu m ON m.id = i.menu_id
+    LEFT JOIN category c ON c.id = i.category_id
+    LEFT JOIN (
+        SELECT menu_item_id, string_agg(name, ' ') AS names
+        FROM restaurants_menuitemingredient
+        GROUP BY menu_item_id
+    ) ing ON ing.menu_item_id = i.id
+"""
+
+
+def is_search_index_supported():
+    return connection.vendor in ("sqlite", "postgresql")
+
+
+def _query_terms(query):
+    return _TERM_RE.findall((query or "").lower())[:MAX_QUERY_TERMS]
+
+
+def _menu_item_documents(menu_item_ids):
+    """
+    Build (id, restaurant_id, name, category, ingredients, description)
+    tuples for the given menu items in two queries.
+    """
+    items = (
+        MenuItem.objects
+        .filter(id__in=menu_item_ids)
+        .values_list("id", "menu__restaurant_id", "name", "category__name", "description")
+    )
+    ingredients = {}
+    for menu_item_id, name in (
+        MenuItemIngredient.objects
+        .filter(menu_item_id__in=menu_item_ids)
+        .values_list("menu_item_id", "name")
+    ):
+        ingredients.setdefault(menu_item_id, []).append(name)
+
+    return [
+        (item_id, restaurant_id, name, category or "",
+         " ".join(ingredients.get(item_id, [])), description or "")
+        for item_id, restaurant_id, name, category, description in items
+    ]
+
+
+def remove_menu_items(menu_item_ids):
+    menu_item_ids = list(menu_item_ids)
+    if not menu_item_ids or not is_search_index_supported():
+        return
+
+    key = "rowid" if connection.vendor == "sqlite" else "menu_item_id"
+    placeholders = ", ".join(["%s"] * len(menu_item_ids))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {MENU_ITEM_SEARCH_TABLE} WHERE {key} IN ({placeholders})",
+            menu_item_ids,
+        )
+
+
+def index_menu_items(menu_item_ids):
+    """
+    (Re)index the given menu items. Ids that no longer exist are removed
+    from the index.
+    """
+    menu_item_ids = sorted(set(menu_item_ids))
+    if not is_search_index_supported():
+        return
+
+    for start in range(0, len(menu_item_ids), INDEX_BATCH_SIZE):
+        _index_batch(menu_item_ids[start:start + INDEX_BATCH_SIZE])
+
+
+def _index_batch(menu_item_ids):
+    documents = _menu_item_documents(menu_item_ids)
+    remove_menu_items(menu_item_ids)
+    if not documents:
+        return
+
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            cursor.executemany(
+                f"INSERT INTO {MENU_ITEM_SEARCH_TABLE} "
+                "(rowid, restaurant, name, category, ingredients, description) "
+                "VALUES (%s, 'r' || %s, %s, %s, %s, %s)",
+                documents,
+            )
+        else:
+            cursor.executemany(
+                f"INSERT INTO {MENU_ITEM_SEARCH_TABLE} (menu_item_id, restaurant_id, document) "
+                f"VALUES (%s, %s, {_POSTGRES_DOCUMENT_SQL})",
+                documents,
+            )
+
+
+def rebuild_menu_search_index():
+    """
+    Rebuild the whole index with one set-based INSERT ... SELECT.
+    """
+    if not is_search_index_supported():
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {MENU_ITEM_SEARCH_TABLE}")
+        if connection.vendor == "sqlite":
+            cursor.execute(_SQLITE_REBUILD_SQL)
+        else:
+            cursor.execute(_POSTGRES_REBUILD_SQL)
+
+
+def search_menu_items(query, restaurant_id=None, limit=20):
+    """
+    Return up to ``limit`` (menu_item_id, score) pairs matching every term
+    of ``query`` (as a prefix), best match first.
+    """
+    terms = _query_terms(query)
+    if not terms:
+        return []
+
+    if not is_search_index_supported():
+        qs = MenuItem.objects.all()
+        for term in terms:
+            qs = qs.filter(name__icontains=term)
+        if restaurant_id is not None:
+            qs = qs.filter(menu__restaurant_id=restaurant_id)
+        return [(item_id, 0.0) for item_id in qs.order_by("name").values_list("id", flat=True)[:limit]]
+
+    params = []
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            match = "{name category ingredients description} : (%s)" % " ".join(
+                f'"{term}"*' for term in terms
+            )
+            if restaurant_id is not None:
+                match = f'restaurant : "r{int(restaurant_id)}" AND {match}'
+            sql = (
+                f"SELECT rowid, -rank FROM {MENU_ITEM_SEARCH_TABLE} "
+                f"WHERE {MENU_ITEM_SEARCH_TABLE} MATCH %s ORDER BY rank LIMIT %s"
+            )
+            params.append(match)
+        else:
+            sql = (
+                "SELECT menu_item_id, ts_rank_cd(document, query) AS score "
+                f"FROM {MENU_ITEM_SEARCH_TABLE}, to_tsquery('simple', %s) query "
+                "WHERE document @@ query"
+            )
+            params.append(" & ".join(f"{term}:*" for term in terms))
+            if restaurant_id is not None:
+                sql += " AND restaurant_id = %s"
+                params.append(restaurant_id)
+            sql += " ORDER BY score DESC, menu_item_id LIMIT %s"
+        params.append(limit)
+
+        cursor.execute(sql, params)
+        return [(int(item_id), float(score)) for item_id, score in cursor.fetchall()]
@@ -0,0 +1,68 @@
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+MENU_SNAPSHOT_VERSION_KEY = "menu-snapshot:version:{restaurant_id}"
+MENU_SNAPSHOT_KEY = "menu-snapshot:{restaurant_id}:{version}:{variant}"
+
+
+def get_menu_snapshot_version(restaurant_id):
+    """
+    Return the current snapshot version of a restaurant's menus.
+
+    A missing version (first read, eviction or invalidation) is replaced by a
+    fresh random token, so snapshots rendered for an older version can never
+    be served again.
+    """
+    key = MENU_SNAPSHOT_VERSION_KEY.format(restaurant_id=restaurant_id)
+    version = cache.get(key)
+    if version is None:
+        version = uuid.uuid4().hex[:16]
+        if not cache.add(key, version, timeout=None):
+            version = cache.get(key, version)
+    return version
+
+
+def get_menu_snapshot_etag(restaurant_id, version):
+    return f'"menu-{restaurant_id}-{version}"'
+
+
+def _snapshot_key(restaurant_id, version, request):
+    # Absolute media URLs and pagination links depend on host and query string.
+    variant = hashlib.md5(
+        request.build_absolute_uri().encode("utf-8")
+    ).hexdigest()
+    return MENU_SNAPSHOT_KEY.format(
+        restaurant_id=restaurant_id, version=version, variant=variant
+    )
+
+
+def get_menu_snapshot(restaurant_id, version, request):
+    """
+    Return the pre-rendered JSON bytes for this request, or None.
+    """
+    return cache.get(_snapshot_key(restaurant_id, version, request))
+
+
+def set_menu_snapshot(restaurant_id, version, request, content):
+    cache.set(
+        _snapshot_key(restaurant_id, version, request),
+        content,
+        timeout=settings.MENU_SNAPSHOT_TIMEOUT,
+    )
+
+
+def invalidate_menu_snapshots(restaurant_ids):
+    """
+    Drop the snapshot version of every given restaurant; the next read
+    renders and stores a new snapshot under a new version.
+    """
+    keys = [
+        MENU_SNAPSHOT_VERSION_KEY.format(restaurant_id=restaurant_id)
+        for restaurant_id in set(restaurant_ids)
+        if restaurant_id is not None
+    ]
+    if keys:
+        cache.delete_many(keys)
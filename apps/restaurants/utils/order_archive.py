@@ -0,0 +1,115 @@
+"""
+Hot/cold storage for orders.
+
+Completed orders past ORDER_ARCHIVE_AFTER_DAYS are copied to ArchivedOrder /
+ArchivedOrderItem and deleted from the live tables in small batches, each in
+its own short transaction. Orders that still have reviews or payments point
+at them are left in place.
+
+History endpoints merge the archive back in once a page reaches past the
+archive horizon, the created_at of the newest archived order.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Max
+from django.utils.timezone import now
+
+from apps.restaurants.models import (
+    ArchivedOrder,
+    ArchivedOrderItem,
+    OrderItem,
+    Orders,
+    PaymentDetails,
+    Review,
+)
+
+ARCHIVE_HORIZON_KEY = "orders-archive:horizon"
+
+
+def refresh_order_archive_horizon():
+    horizon = ArchivedOrder.objects.aggregate(horizon=Max("created_at"))["horizon"]
+    cache.set(ARCHIVE_HORIZON_KEY, {"horizon": horizon}, settings.ORDER_ARCHIVE_HORIZON_TIMEOUT)
+    return horizon
+
+
+def get_order_archive_horizon():
+    """
+    created_at of the newest archived order, or None if the archive is
+    empty. Cached for ORDER_ARCHIVE_HORIZON_TIMEOUT seconds and read from
+    the archive again on a miss, so workers whose cache the archival run
+    cannot reach (e.g. LocMemCache) catch up within that time.
+    """
+    cached = cache.get(ARCHIVE_HORIZON_KEY)
+    if cached is None:
+        return refresh_order_archive_horizon()
+    return cached["horizon"]
+
+
+def archivable_orders(before):
+    return (
+        Orders.objects
+        .filter(order_status="COMPLETED", created_at__lt=before)
+        .exclude(pk__in=Review.objects.values("order_id"))
+        .exclude(pk__in=PaymentDetails.objects.values("order_id"))
+    )
+
+
+def _copy_fields(model):
+    return [field.attname for field in model._meta.concrete_fields if field.attname != "archived_at"]
+
+
+def archive_order_batch(before, batch_size):
+    """
+    Move up to ``batch_size`` archivable orders with their items in one
+    transaction. Returns the number of orders moved.
+    """
+    order_fields = _copy_fields(ArchivedOrder)
+    item_fields = _copy_fields(ArchivedOrderItem)
+
+    with transaction.atomic():
+        # Rows another transaction is working on are skipped, not waited for.
+        order_ids = list(
+            archivable_orders(before)
+            .select_for_update(skip_locked=True)
+            .order_by("pk")
+            .values_list("pk", flat=True)[:batch_size]
+        )
+        if not order_ids:
+            return 0
+
+        ArchivedOrder.objects.bulk_create([
+            ArchivedOrder(**values)
+            for values in Orders.objects.filter(pk__in=order_ids).values(*order_fields)
+        ])
+        ArchivedOrderItem.objects.bulk_create([
+            ArchivedOrderItem(**values)
+            for values in OrderItem.objects.filter(order_id__in=order_ids).values(*item_fields)
+        ])
+        OrderItem.objects.filter(order_id__in=order_ids).delete()
+        Orders.objects.filter(pk__in=order_ids).delete()
+
+    return len(order_ids)
+
+
+def archive_completed_orders(older_than_days=None, batch_size=None, max_batches=None):
+    """
+    Archive completed orders older than ``older_than_days`` batch by batch.
+    Yields the size of each batch moved.
+    """
+    older_than_days = settings.ORDER_ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+    batch_size = batch_size or settings.ORDER_ARCHIVE_BATCH_SIZE
+    before = now() - timedelta(days=older_than_days)
+
+    batches = 0
+    try:
+        while max_batches is None or batches < max_batches:
+            moved = archive_order_batch(before, batch_size)
+            if not moved:
+                break
+            batches += 1
+            yield moved
+    finally:
+        refresh_order_archive_horizon()
@@ -0,0 +1,138 @@
+"""
+Streaming export of orders and their line items.
+
+Live and archived orders in a date range are read with server-side cursors
+(``QuerySet.iterator``), merged by creation time and encoded one order at a
+time, so memory use does not depend on the size of the export. Output is
+either CSV, one row per line item with the order columns repeated, or
+NDJSON, one order per line with its items nested.
+"""
+import csv
+import heapq
+import io
+import json
+import zlib
+from datetime import datetime, time, timedelta
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from apps.restaurants.models import ArchivedOrder, Orders
+
+EXPORT_CHUNK_SIZE = 2000
+# Flush encoded output to the client in pieces of about this size
+EXPORT_BUFFER_SIZE = 64 * 1024
+
+ORDER_EXPORT_FIELDS = (
+    "id", "created_at", "ordered_date", "user_id", "order_type", "order_status",
+    "table_id", "waiter_id", "total_price", "payment_status", "order_cancelled",
+    "ordered", "billing_first_name", "billing_last_name", "billing_email",
+    "billing_phone", "billing_address", "shipping_address",
+)
+ITEM_EXPORT_FIELDS = ("menu_item_id", "quantity", "price", "comments")
+CSV_HEADER = ORDER_EXPORT_FIELDS + ("archived",) + tuple(f"item_{name}" for name in ITEM_EXPORT_FIELDS)
+
+
+def _date_bounds(start, end):
+    """
+    Aware datetimes covering local days ``start`` to ``end`` inclusive.
+    """
+    bounds = {}
+    if start:
+        bounds["created_at__gte"] = timezone.make_aware(datetime.combine(start, time.min))
+    if end:
+        bounds["created_at__lt"] = timezone.make_aware(datetime.combine(end + timedelta(days=1), time.min))
+    return bounds
+
+
+def _keyed(orders, archived):
+    for order in orders:
+        yield order.created_at, order.id, archived, order
+
+
+def iter_export_orders(start=None, end=None):
+    """
+    Yield ``(order, archived)`` for every order created between the given
+    dates, oldest first, with ``order_items`` prefetched chunk by chunk.
+    """
+    bounds = _date_bounds(start, end)
+    streams = []
+    for model, archived in ((Orders, False), (ArchivedOrder, True)):
+        queryset = (
+            model.objects.filter(**bounds)
+            .order_by("created_at", "id")
+            .prefetch_related("order_items")
+            .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        )
+        streams.append(_keyed(queryset, archived))
+    for _, _, archived, order in heapq.merge(*streams, key=lambda row: row[:2]):
+        yield order, archived
+
+
+def _order_values(order):
+    return [getattr(order, name) for name in ORDER_EXPORT_FIELDS]
+
+
+def _item_values(item):
+    return [getattr(item, name) for name in ITEM_EXPORT_FIELDS]
+
+
+def _buffered(pieces):
+    buffer = []
+    size = 0
+    for piece in pieces:
+        buffer.append(piece)
+        size += len(piece)
+        if size >= EXPORT_BUFFER_SIZE:
+            yield "".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer)
+
+
+def _csv_pieces(orders):
+    line = io.StringIO()
+    writer = csv.writer(line)
+
+    def encode(row):
+        line.seek(0)
+        line.truncate()
+        writer.writerow(row)
+        return line.getvalue()
+
+    yield encode(CSV_HEADER)
+    for order, archived in orders:
+        values = _order_values(order) + [archived]
+        items = list(order.order_items.all())
+        if not items:
+            yield encode(values + [None] * len(ITEM_EXPORT_FIELDS))
+        for item in items:
+            yield encode(values + _item_values(item))
+
+
+def _ndjson_pieces(orders):
+    for order, archived in orders:
+        record = dict(zip(ORDER_EXPORT_FIELDS, _order_values(order)))
+        record["archived"] = archived
+        record["items"] = [dict(zip(ITEM_EXPORT_FIELDS, _item_values(item))) for item in order.order_items.all()]
+        yield json.dumps(record, cls=DjangoJSONEncoder, separators=(",", ":")) + "\n"
+
+
+def _gzipped(chunks):
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode("utf-8"))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def stream_order_export(output="csv", start=None, end=None, gzip=False):
+    """
+    Generator of encoded export chunks for a StreamingHttpResponse.
+    """
+    encode = _ndjson_pieces if output == "ndjson" else _csv_pieces
+    chunks = _buffered(encode(iter_export_orders(start, end)))
+    if gzip:
+        return _gzipped(chunks)
+    return (chunk.encode("utf-8") for chunk in chunks)
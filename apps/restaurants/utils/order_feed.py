@@ -0,0 +1,85 @@
+"""
+Real-time order feed.
+
+Order events are fanned out over the Channels layer to two kinds of groups:
+one per restaurant (kitchen and owner screens) and one per waiter. Payloads
+are deliberately small; clients that need the full order fetch it once.
+"""
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+
+from apps.restaurants.models import Orders
+
+ORDER_CREATED = "order.created"
+ORDER_STATUS_CHANGED = "order.status_changed"
+
+
+def restaurant_group(restaurant_id):
+    return f"orders.restaurant.{restaurant_id}"
+
+
+def waiter_group(profile_id):
+    return f"orders.waiter.{profile_id}"
+
+
+def _restaurant_ids_by_order(order_ids):
+    """
+    Map order id -> restaurant ids in one query. Orders carry no restaurant
+    of their own, so it comes from the table or from the ordered items.
+    """
+    restaurant_ids = {order_id: set() for order_id in order_ids}
+    rows = (
+        Orders.objects
+        .filter(pk__in=order_ids)
+        .values_list("id", "table__restaurant_id", "order_items__menu_item__menu__restaurant_id")
+        .distinct()
+    )
+    for order_id, table_restaurant_id, item_restaurant_id in rows:
+        restaurant_ids[order_id].update(
+            rid for rid in (table_restaurant_id, item_restaurant_id) if rid is not None
+        )
+    return restaurant_ids
+
+
+def order_feed_payload(order, event, restaurant_ids=(), previous_status=None):
+    payload = {
+        "event": event,
+        "order": {
+            "id": order.pk,
+            "order_status": order.order_status,
+            "order_type": order.order_type,
+            "table": order.table_id,
+            "waiter": order.waiter_id,
+            "restaurants": sorted(restaurant_ids),
+            "total_price": str(order.total_price),
+            "updated_at": order.updated_at.isoformat() if order.updated_at else None,
+        },
+    }
+    if previous_status is not None:
+        payload["previous_status"] = previous_status
+    return payload
+
+
+def publish_order_events(orders, event, previous_statuses=None):
+    """
+    Push ``event`` for each order to its restaurant and waiter groups.
+    Call after the transaction commits so listeners never see rolled back
+    changes.
+    """
+    channel_layer = get_channel_layer()
+    orders = list(orders)
+    if channel_layer is None or not orders:
+        return
+
+    previous_statuses = previous_statuses or {}
+    restaurant_ids = _restaurant_ids_by_order([order.pk for order in orders])
+    send = async_to_sync(channel_layer.group_send)
+    for order in orders:
+        payload = order_feed_payload(
+            order, event, restaurant_ids[order.pk], previous_statuses.get(order.pk)
+        )
+        groups = [restaurant_group(rid) for rid in restaurant_ids[order.pk]]
+        if order.waiter_id:
+            groups.append(waiter_group(order.waiter_id))
+        for group in groups:
+            send(group, {"type": "order.event", "payload": payload})
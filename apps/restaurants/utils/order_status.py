@@ -0,0 +1,102 @@
+"""
+Order status state machine.
+
+Orders move forward one step at a time: TAKING -> PREPARING -> SERVING ->
+COMPLETED. Bulk transitions lock the requested orders, issue one UPDATE per
+current status and log every move to OrderEvent in a single INSERT.
+"""
+from collections import defaultdict
+from functools import partial, update_wrapper
+
+from django.db import transaction
+from django.utils.timezone import now
+
+from apps.restaurants.models import Orders, OrderEvent
+from .order_feed import ORDER_STATUS_CHANGED, publish_order_events
+
+ORDER_STATUS_TRANSITIONS = {
+    "TAKING": ("PREPARING",),
+    "PREPARING": ("SERVING",),
+    "SERVING": ("COMPLETED",),
+    "COMPLETED": (),
+}
+
+
+class OrderTransitionError(ValueError):
+    pass
+
+
+def can_transition(from_status, to_status):
+    return to_status in ORDER_STATUS_TRANSITIONS.get(from_status, ())
+
+
+def _publish_transitions(order_ids, previous_statuses):
+    publish_order_events(
+        Orders.objects.filter(pk__in=order_ids), ORDER_STATUS_CHANGED, previous_statuses
+    )
+
+
+def transition_orders(order_ids, to_status, actor=None, queryset=None):
+    """
+    Move the given orders to ``to_status``.
+
+    Orders whose current status does not allow the move, or that are not in
+    ``queryset`` (defaults to all orders), are left untouched and reported.
+    Returns ``{"updated": [ids], "rejected": {id: reason}}``.
+    """
+    if to_status not in ORDER_STATUS_TRANSITIONS:
+        raise OrderTransitionError(f"Unknown order status: {to_status}")
+
+    order_ids = set(order_ids)
+    queryset = Orders.objects.all() if queryset is None else queryset
+    rejected = {}
+    by_status = defaultdict(list)
+
+    with transaction.atomic():
+        current = dict(
+            Orders.objects.select_for_update()
+            .filter(pk__in=queryset.filter(pk__in=order_ids).values("pk"))
+            .values_list("pk", "order_status")
+        )
+        for order_id in order_ids:
+            from_status = current.get(order_id)
+            if from_status is None:
+                rejected[order_id] = "Order not found."
+            elif not can_transition(from_status, to_status):
+                rejected[order_id] = f"Cannot move from {from_status} to {to_status}."
+            else:
+                by_status[from_status].append(order_id)
+
+        timestamp = now()
+        events = []
+        for from_status, ids in by_status.items():
+            # Bulk UPDATE skips auto_now; delta sync relies on updated_at.
+            Orders.objects.filter(pk__in=ids, order_status=from_status).update(
+                order_status=to_status, updated_at=timestamp
+            )
+            events.extend(
+                OrderEvent(order_id=order_id, from_status=from_status, to_status=to_status,
+                           actor=actor, created_at=timestamp)
+                for order_id in ids
+            )
+        OrderEvent.objects.bulk_create(events)
+
+        previous_statuses = {event.order_id: event.from_status for event in events}
+        if previous_statuses:
+            # Logged, not raised: the transitions are committed either way
+            transaction.on_commit(update_wrapper(partial(
+                _publish_transitions, list(previous_statuses), previous_statuses
+            ), _publish_transitions), robust=True)
+
+    return {"updated": sorted(previous_statuses), "rejected": rejected}
+
+
+def transition_order(order, to_status, actor=None):
+    """
+    Move a single order and return it reloaded, raising
+    OrderTransitionError if the move is not allowed.
+    """
+    result = transition_orders([order.pk], to_status, actor=actor)
+    if result["rejected"]:
+        raise OrderTransitionError(result["rejected"][order.pk])
+    return Orders.objects.get(pk=order.pk)
@@ -0,0 +1,317 @@
+"""
+Owner analytics over a compact columnar copy of each restaurant's sales.
+
+Every restaurant gets a directory of NumPy arrays under ANALYTICS_DATA_DIR:
+
+* line columns, one row per order item: ``line_id``, ``line_order`` (order
+  id), ``line_item`` (index into ``items``), ``line_ts`` (order time, epoch
+  seconds), ``line_quantity``, ``line_revenue`` (cents);
+* order columns, one row per order: ``order_id``, ``order_ts``,
+  ``order_how`` (hour of week, 0 = Monday 00:00 local time),
+  ``order_revenue`` (cents, this restaurant's share);
+* ``items``: the menu item ids the line index refers to.
+
+``refresh_sales_columns`` (run by ``manage.py refresh_owner_analytics``,
+never by a request) reads the order items above the stored watermark and
+writes the columns as a new build, ``<restaurant>/<build>/``, then points
+``CURRENT`` at it, like the personal recommendation builds. Readers memory-
+map whichever build ``CURRENT`` names, so they never see a mix of two.
+Line ids are allocated before commit, so every refresh reads the
+ANALYTICS_RESCAN_LINES ids below the watermark again and skips lines it
+already has; orders cancelled since the last refresh are taken out. A
+``full`` refresh rebuilds everything from live and archived orders and
+also catches changes these two checks cannot see.
+"""
+import fcntl
+import json
+import os
+import shutil
+import time
+from datetime import datetime, timezone as dt_timezone
+from decimal import Decimal
+
+import numpy as np
+from django.conf import settings
+from django.db.models import F, Q
+from django.db.models.functions import ExtractHour, ExtractIsoWeekDay
+
+from apps.restaurants.models import ArchivedOrderItem, MenuItem, OrderItem, Orders
+
+LINE_COLUMNS = {
+    "line_id": np.int64,
+    "line_order": np.int64,
+    "line_item": np.int32,
+    "line_ts": np.int64,
+    "line_quantity": np.int32,
+    "line_revenue": np.int64,
+}
+ORDER_COLUMNS = {
+    "order_id": np.int64,
+    "order_ts": np.int64,
+    "order_how": np.int16,
+    "order_revenue": np.int64,
+}
+COLUMNS = {"items": np.int64, **LINE_COLUMNS, **ORDER_COLUMNS}
+HOURS_PER_WEEK = 7 * 24
+# Builds kept per restaurant: the current one and the one it replaced,
+# which a reader that just read CURRENT may still be opening
+KEEP_BUILDS = 2
+# Orders saved this long before the previous refresh started are checked
+# for cancellation again, covering saves that committed late
+CANCELLATION_LOOKBACK_SECONDS = 10 * 60
+
+
+def _restaurant_dir(restaurant_id):
+    return os.path.join(settings.ANALYTICS_DATA_DIR, str(int(restaurant_id)))
+
+
+def _current_build(restaurant_id):
+    try:
+        with open(os.path.join(_restaurant_dir(restaurant_id), "CURRENT")) as handle:
+            return os.path.join(_restaurant_dir(restaurant_id), handle.read().strip())
+    except FileNotFoundError:
+        return None
+
+
+def _read_meta(build):
+    try:
+        with open(os.path.join(build, "meta.json")) as handle:
+            return json.load(handle)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _write_file(directory, name, text):
+    # Write then rename, so a reader never sees a half-written file
+    tmp_path = os.path.join(directory, f".{name}.tmp")
+    with open(tmp_path, "w") as handle:
+        handle.write(text)
+    os.replace(tmp_path, os.path.join(directory, name))
+
+
+def _empty_columns():
+    return {name: np.empty(0, dtype) for name, dtype in COLUMNS.items()}
+
+
+def load_sales_columns(restaurant_id):
+    """
+    Memory-map a restaurant's current build. Returns a dict of arrays,
+    empty arrays if nothing was built yet.
+    """
+    for _ in range(KEEP_BUILDS + 1):
+        build = _current_build(restaurant_id)
+        if build is None:
+            break
+        try:
+            return {name: np.load(os.path.join(build, f"{name}.npy"), mmap_mode="r") for name in COLUMNS}
+        except FileNotFoundError:
+            # Removed by newer builds since CURRENT was read, read it again
+            continue
+    return _empty_columns()
+
+
+def _fetch_lines(model, restaurant_id, after_id):
+    """
+    (id, order id, menu item id, quantity, revenue cents, epoch seconds,
+    hour of week) for the restaurant's placed-order items after ``after_id``.
+    """
+    rows = (
+        model.objects
+        .filter(
+            menu_item__menu__restaurant_id=restaurant_id,
+            order__ordered=True,
+            order__order_cancelled=False,
+            id__gt=after_id,
+        )
+        .annotate(
+            weekday=ExtractIsoWeekDay("order__created_at"),
+            hour=ExtractHour("order__created_at"),
+            revenue=F("quantity") * F("price"),
+        )
+        .order_by("id")
+        .values_list("id", "order_id", "menu_item_id", "quantity", "revenue",
+                     "order__created_at", "weekday", "hour")
+    )
+    return [
+        (line_id, order_id, menu_item_id, quantity, int(Decimal(revenue) * 100),
+         int(created_at.timestamp()), (weekday - 1) * 24 + hour)
+        for line_id, order_id, menu_item_id, quantity, revenue, created_at, weekday, hour in rows
+    ]
+
+
+def _withdrawn_order_ids(restaurant_id, since):
+    """
+    Ids of the restaurant's orders saved since ``since`` (epoch seconds)
+    that no longer count: cancelled or no longer placed.
+    """
+    return list(
+        Orders.objects
+        .filter(Q(order_cancelled=True) | Q(ordered=False),
+                updated_at__gte=datetime.fromtimestamp(since, tz=dt_timezone.utc),
+                order_items__menu_item__menu__restaurant_id=restaurant_id)
+        .values_list("id", flat=True)
+        .distinct()
+    )
+
+
+def _new_columns(lines, items):
+    """
+    Columns of ``lines``, whole orders only, and ``items`` extended by the
+    menu items they add.
+    """
+    line_ids, order_ids, menu_item_ids, quantities, revenues, timestamps, hours = (
+        np.array(column) for column in zip(*lines)
+    )
+    index = {item_id: position for position, item_id in enumerate(items.tolist())}
+    for item_id in menu_item_ids.tolist():
+        index.setdefault(item_id, len(index))
+    line_item = np.fromiter((index[item_id] for item_id in menu_item_ids.tolist()),
+                            dtype=np.int32, count=len(menu_item_ids))
+
+    unique_orders, first, inverse = np.unique(order_ids, return_index=True, return_inverse=True)
+    return np.fromiter(index, dtype=np.int64, count=len(index)), {
+        "line_id": line_ids,
+        "line_order": order_ids,
+        "line_item": line_item,
+        "line_ts": timestamps,
+        "line_quantity": quantities,
+        "line_revenue": revenues,
+        "order_id": unique_orders,
+        "order_ts": timestamps[first],
+        "order_how": hours[first],
+        "order_revenue": np.bincount(inverse, weights=revenues, minlength=len(unique_orders)),
+    }
+
+
+def _publish(restaurant_id, columns, meta):
+    """
+    Write a build to its own directory, then point CURRENT at it. Builds
+    older than the previous one are removed.
+    """
+    base = _restaurant_dir(restaurant_id)
+    build = f"{time.time_ns()}"
+    os.makedirs(os.path.join(base, build))
+    for name, dtype in COLUMNS.items():
+        np.save(os.path.join(base, build, f"{name}.npy"), np.asarray(columns[name]).astype(dtype))
+    _write_file(os.path.join(base, build), "meta.json", json.dumps(meta))
+    _write_file(base, "CURRENT", build)
+
+    builds = sorted((name for name in os.listdir(base) if name.isdigit()), key=int)
+    for name in builds[:-KEEP_BUILDS]:
+        shutil.rmtree(os.path.join(base, name), ignore_errors=True)
+
+
+def refresh_sales_columns(restaurant_id, full=False):
+    """
+    Fold order items newer than the stored watermark into the restaurant's
+    columns and drop orders cancelled since the last refresh (rebuild
+    everything, archive included, when ``full`` or on first build).
+    Refreshes of one restaurant take turns. Returns the number of new lines.
+    """
+    os.makedirs(_restaurant_dir(restaurant_id), exist_ok=True)
+    with open(os.path.join(_restaurant_dir(restaurant_id), ".lock"), "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        return _refresh_sales_columns(restaurant_id, full)
+
+
+def _refresh_sales_columns(restaurant_id, full):
+    build = None if full else _current_build(restaurant_id)
+    meta = _read_meta(build) if build else None
+    # Taken before reading, so the next refresh looks back past this one
+    started = time.time()
+
+    if meta is None:
+        current = _empty_columns()
+        lines = _fetch_lines(ArchivedOrderItem, restaurant_id, 0) + _fetch_lines(OrderItem, restaurant_id, 0)
+        withdrawn = []
+    else:
+        current = load_sales_columns(restaurant_id)
+        lines = _fetch_lines(
+            OrderItem, restaurant_id, max(meta["watermark"] - settings.ANALYTICS_RESCAN_LINES, 0)
+        )
+        known = set(np.asarray(current["line_id"])[
+            np.asarray(current["line_id"]) > meta["watermark"] - settings.ANALYTICS_RESCAN_LINES
+        ].tolist())
+        lines = [line for line in lines if line[0] not in known]
+        withdrawn = _withdrawn_order_ids(restaurant_id, meta["refreshed_at"] - CANCELLATION_LOOKBACK_SECONDS)
+        withdrawn = np.intersect1d(np.asarray(current["order_id"]), np.array(withdrawn, dtype=np.int64))
+
+    new_meta = {
+        "watermark": max([meta["watermark"] if meta else 0] + [line[0] for line in lines]),
+        "refreshed_at": started,
+    }
+    if meta is not None and not lines and not len(withdrawn):
+        _write_file(build, "meta.json", json.dumps(new_meta))
+        return 0
+
+    columns = {name: np.asarray(column) for name, column in current.items()}
+    if len(withdrawn):
+        kept_lines = ~np.isin(columns["line_order"], withdrawn)
+        kept_orders = ~np.isin(columns["order_id"], withdrawn)
+        for name in LINE_COLUMNS:
+            columns[name] = columns[name][kept_lines]
+        for name in ORDER_COLUMNS:
+            columns[name] = columns[name][kept_orders]
+    if lines:
+        # All lines of an order commit in one checkout transaction, so a
+        # batch never holds part of an order the columns already have.
+        columns["items"], appended = _new_columns(lines, columns["items"])
+        for name, dtype in {**LINE_COLUMNS, **ORDER_COLUMNS}.items():
+            columns[name] = np.concatenate([columns[name], appended[name].astype(dtype)])
+
+    _publish(restaurant_id, columns, new_meta)
+    return len(lines)
+
+
+def _since_mask(timestamps, days):
+    if not days:
+        return slice(None)
+    return timestamps >= time.time() - days * 86400
+
+
+def sales_summary(columns, days=None):
+    orders = _since_mask(columns["order_ts"], days)
+    lines = _since_mask(columns["line_ts"], days)
+    order_count = len(np.asarray(columns["order_ts"])[orders])
+    revenue = int(np.asarray(columns["order_revenue"])[orders].sum())
+    return {
+        "order_count": order_count,
+        "revenue": Decimal(revenue) / 100,
+        "items_sold": int(np.asarray(columns["line_quantity"])[lines].sum()),
+        "average_ticket": (Decimal(revenue) / 100 / order_count).quantize(Decimal("0.01")) if order_count else Decimal("0.00"),
+    }
+
+
+def item_ranking(columns, days=None, limit=20, by="revenue"):
+    """
+    Top ``limit`` menu items by revenue or quantity.
+    """
+    lines = _since_mask(columns["line_ts"], days)
+    line_item = np.asarray(columns["line_item"])[lines]
+    size = len(columns["items"])
+    revenue = np.bincount(line_item, weights=np.asarray(columns["line_revenue"])[lines], minlength=size)
+    quantity = np.bincount(line_item, weights=np.asarray(columns["line_quantity"])[lines], minlength=size)
+
+    key = revenue if by == "revenue" else quantity
+    top = np.argsort(-key, kind="stable")[:limit]
+    top = top[key[top] > 0]
+    item_ids = np.asarray(columns["items"])[top].tolist()
+    names = dict(MenuItem.objects.filter(id__in=item_ids).values_list("id", "name"))
+    return [
+        {
+            "menu_item": item_id,
+            "name": names.get(item_id),
+            "quantity": int(quantity[position]),
+            "revenue": Decimal(int(revenue[position])) / 100,
+        }
+        for item_id, position in zip(item_ids, top.tolist())
+    ]
+
+
+def order_heatmap(columns, days=None):
+    """
+    Orders per hour of week as 7 rows (Monday first) of 24 hourly counts.
+    """
+    orders = _since_mask(columns["order_ts"], days)
+    counts = np.bincount(np.asarray(columns["order_how"])[orders], minlength=HOURS_PER_WEEK)
+    return counts[:HOURS_PER_WEEK].reshape(7, 24).tolist()
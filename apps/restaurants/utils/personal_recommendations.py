@@ -0,0 +1,245 @@
+"""
+Personal dish recommendations from users' order history.
+
+``build_personal_recommendations`` aggregates how much of each menu item
+every user ordered (live and archived orders), factorizes that implicit
+feedback matrix with alternating least squares (Hu, Koren & Volinsky) in
+vectorized NumPy and saves user and item factors as ``.npy`` files under
+``ANALYTICS_DATA_DIR/personal/<build>/``. Items are stored grouped by
+restaurant, so a restaurant's items are one contiguous slice.
+
+At request time the arrays are memory-mapped once per process and scoring
+a user is a dot product of their factor vector with the slice of the
+restaurant's item factors. Users without history (or anonymous ones) get
+the restaurant's most ordered items instead.
+"""
+import os
+import shutil
+import time
+
+import numpy as np
+from django.conf import settings
+from django.db.models import Sum
+
+from apps.restaurants.models import ArchivedOrderItem, MenuItem, OrderItem
+
+MODEL_ARRAYS = (
+    "user_ids", "user_factors", "item_ids", "item_factors", "item_popularity",
+    "restaurant_ids", "restaurant_offsets",
+)
+# Builds kept on disk: the current one and the one it replaced, which
+# workers that read CURRENT just before the switch may still be opening
+KEEP_BUILDS = 2
+_loaded = {"build": None, "model": None}
+
+
+def _model_dir():
+    return os.path.join(settings.ANALYTICS_DATA_DIR, "personal")
+
+
+def _user_item_quantities():
+    """
+    (user_ids, menu_item_ids, quantities) summed over placed orders.
+    """
+    totals = {}
+    for model in (OrderItem, ArchivedOrderItem):
+        rows = (
+            model.objects
+            .filter(order__ordered=True, order__order_cancelled=False)
+            .values_list("order__user_id", "menu_item_id")
+            .annotate(quantity=Sum("quantity"))
+            .order_by()
+        )
+        for user_id, menu_item_id, quantity in rows.iterator(chunk_size=5000):
+            totals[user_id, menu_item_id] = totals.get((user_id, menu_item_id), 0) + quantity
+    if not totals:
+        return np.empty(0, np.int64), np.empty(0, np.int64), np.empty(0, np.float64)
+    keys = np.array(list(totals), dtype=np.int64)
+    return keys[:, 0], keys[:, 1], np.fromiter(totals.values(), dtype=np.float64, count=len(totals))
+
+
+def _row_sums(values, starts, present, n_rows):
+    """
+    Per-row sums of ``values`` (one row per interaction, sorted by row).
+    """
+    sums = np.zeros((n_rows, values.shape[1]), dtype=values.dtype)
+    sums[present] = np.add.reduceat(values, starts, axis=0)
+    return sums
+
+
+def _als_step(rows, cols, confidence, other, current, regularization, cg_steps):
+    """
+    Update every row's factors given the other side's, for interactions
+    sorted by ``rows``, with a few conjugate gradient steps warm-started
+    from ``current`` (Takacs et al.). Solves
+
+        (Y'Y + Y_u'(C_u - I)Y_u + lambda I) x_u = Y_u' C_u p_u
+
+    for all rows at once using only flat per-interaction products, so no
+    f x f system is formed per row.
+    """
+    n_rows = current.shape[0]
+    gram = other.T @ other + regularization * np.eye(other.shape[1], dtype=other.dtype)
+    factors = other[cols]
+    present, starts = np.unique(rows, return_index=True)
+
+    def apply(x):
+        projected = np.einsum("nf,nf->n", factors, x[rows])
+        return x @ gram + _row_sums(factors * ((confidence - 1) * projected)[:, None], starts, present, n_rows)
+
+    solution = current.copy()
+    residual = _row_sums(factors * confidence[:, None], starts, present, n_rows) - apply(solution)
+    direction = residual.copy()
+    residual_norm = np.einsum("uf,uf->u", residual, residual)
+    for _ in range(cg_steps):
+        if not residual_norm.any():
+            break
+        applied = apply(direction)
+        step = residual_norm / np.maximum(np.einsum("uf,uf->u", direction, applied), 1e-12)
+        solution += step[:, None] * direction
+        residual -= step[:, None] * applied
+        new_norm = np.einsum("uf,uf->u", residual, residual)
+        direction = residual + (new_norm / np.maximum(residual_norm, 1e-12))[:, None] * direction
+        residual_norm = new_norm
+    return solution
+
+
+def implicit_als(user_idx, item_idx, values, n_users, n_items,
+                 factors, iterations, regularization, alpha, cg_steps=3, seed=0):
+    """
+    Factorize an implicit feedback matrix given as coordinates. Returns
+    (user_factors, item_factors).
+    """
+    rng = np.random.default_rng(seed)
+    # float32 halves the memory traffic, which is what these steps are bound by
+    user_factors = rng.normal(scale=0.01, size=(n_users, factors)).astype(np.float32)
+    item_factors = rng.normal(scale=0.01, size=(n_items, factors)).astype(np.float32)
+    confidence = (1 + alpha * values).astype(np.float32)
+
+    by_user = np.lexsort((item_idx, user_idx))
+    by_item = np.lexsort((user_idx, item_idx))
+    for _ in range(iterations):
+        user_factors = _als_step(user_idx[by_user], item_idx[by_user], confidence[by_user],
+                                 item_factors, user_factors, regularization, cg_steps)
+        item_factors = _als_step(item_idx[by_item], user_idx[by_item], confidence[by_item],
+                                 user_factors, item_factors, regularization, cg_steps)
+    return user_factors, item_factors
+
+
+def build_personal_recommendations():
+    """
+    Train and publish a new model. Returns (users, items) in it.
+    """
+    user_ids, menu_item_ids, quantities = _user_item_quantities()
+    restaurant_by_item = dict(
+        MenuItem.objects.filter(id__in=np.unique(menu_item_ids).tolist())
+        .values_list("id", "menu__restaurant_id")
+    )
+    known = np.array([item_id in restaurant_by_item for item_id in menu_item_ids.tolist()], dtype=bool)
+    user_ids, menu_item_ids, quantities = user_ids[known], menu_item_ids[known], quantities[known]
+
+    users, user_idx = np.unique(user_ids, return_inverse=True)
+    items, item_idx = np.unique(menu_item_ids, return_inverse=True)
+    user_factors, item_factors = implicit_als(
+        user_idx, item_idx, np.log1p(quantities), len(users), len(items),
+        factors=settings.PERSONAL_RECOMMENDATION_FACTORS,
+        iterations=settings.PERSONAL_RECOMMENDATION_ITERATIONS,
+        regularization=settings.PERSONAL_RECOMMENDATION_REGULARIZATION,
+        alpha=settings.PERSONAL_RECOMMENDATION_ALPHA,
+    )
+    popularity = np.bincount(item_idx, weights=quantities, minlength=len(items))
+
+    # Group items by restaurant so each restaurant is one slice
+    item_restaurants = np.array([restaurant_by_item[item_id] for item_id in items.tolist()], dtype=np.int64)
+    order = np.lexsort((items, item_restaurants))
+    restaurant_ids, restaurant_starts = np.unique(item_restaurants[order], return_index=True)
+
+    arrays = {
+        "user_ids": users.astype(np.int64),
+        "user_factors": user_factors.astype(np.float32),
+        "item_ids": items[order].astype(np.int64),
+        "item_factors": item_factors[order].astype(np.float32),
+        "item_popularity": popularity[order].astype(np.float32),
+        "restaurant_ids": restaurant_ids.astype(np.int64),
+        "restaurant_offsets": np.append(restaurant_starts, len(items)).astype(np.int64),
+    }
+    _publish(arrays)
+    return len(users), len(items)
+
+
+def _publish(arrays):
+    """
+    Write a build to its own directory, then point CURRENT at it. Readers
+    that still map an older build keep working until they reload; only
+    builds older than the previous one are removed.
+    """
+    base = _model_dir()
+    build = f"{time.time_ns()}"
+    os.makedirs(os.path.join(base, build))
+    for name, array in arrays.items():
+        np.save(os.path.join(base, build, f"{name}.npy"), array)
+
+    with open(os.path.join(base, ".CURRENT.tmp"), "w") as handle:
+        handle.write(build)
+    os.replace(os.path.join(base, ".CURRENT.tmp"), os.path.join(base, "CURRENT"))
+
+    builds = sorted(
+        (name for name in os.listdir(base) if name.isdigit() and os.path.isdir(os.path.join(base, name))),
+        key=int,
+    )
+    for name in builds[:-KEEP_BUILDS]:
+        shutil.rmtree(os.path.join(base, name), ignore_errors=True)
+
+
+def load_personal_model():
+    """
+    Memory-mapped arrays of the current build, or None if nothing was
+    built yet. Reloaded only when a new build is published.
+    """
+    base = _model_dir()
+    for _ in range(KEEP_BUILDS + 1):
+        try:
+            with open(os.path.join(base, "CURRENT")) as handle:
+                build = os.path.join(base, handle.read().strip())
+        except FileNotFoundError:
+            return None
+
+        if _loaded["build"] == build:
+            break
+        try:
+            model = {
+                name: np.load(os.path.join(build, f"{name}.npy"), mmap_mode="r") for name in MODEL_ARRAYS
+            }
+        except FileNotFoundError:
+            # Removed by newer builds since CURRENT was read, read it again
+            continue
+        _loaded["model"], _loaded["build"] = model, build
+        break
+    return _loaded["model"]
+
+
+def personal_recommendations(user_profile_id, restaurant_id, limit=10):
+    """
+    Up to ``limit`` (menu_item_id, score) pairs of the restaurant for the
+    user, best first. Users unknown to the model get the restaurant's most
+    ordered items, scored by quantity sold.
+    """
+    model = load_personal_model()
+    if model is None:
+        return []
+
+    restaurant_ids = model["restaurant_ids"]
+    position = np.searchsorted(restaurant_ids, restaurant_id)
+    if position == len(restaurant_ids) or restaurant_ids[position] != restaurant_id:
+        return []
+    lo, hi = model["restaurant_offsets"][position], model["restaurant_offsets"][position + 1]
+
+    user_ids = model["user_ids"]
+    row = np.searchsorted(user_ids, user_profile_id) if user_profile_id is not None else len(user_ids)
+    if row < len(user_ids) and user_ids[row] == user_profile_id:
+        scores = model["item_factors"][lo:hi] @ model["user_factors"][row]
+    else:
+        scores = np.asarray(model["item_popularity"][lo:hi])
+
+    top = np.argsort(-scores, kind="stable")[:limit]
+    return list(zip(model["item_ids"][lo:hi][top].tolist(), scores[top].astype(float).tolist()))
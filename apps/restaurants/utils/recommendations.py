@@ -0,0 +1,170 @@
+"""
+"Frequently ordered together" recommendations.
+
+``build_co_occurrence_recommendations`` reads the (order, menu item) pairs
+of every placed order, live and archived, counts how often two items share
+an order with vectorized NumPy, scores each pair by cosine similarity
+(co-orders / sqrt(orders of a * orders of b)) and stores the top
+RECOMMENDATION_TOP_K neighbours of each item from the same restaurant as a
+MenuItemRecommendation row. Serving suggestions for a cart is then one
+indexed lookup of the cart items' rows.
+"""
+from collections import defaultdict
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+
+from apps.restaurants.models import ArchivedOrderItem, MenuItem, MenuItemRecommendation, OrderItem
+
+CO_OCCURRENCE = "together"
+# Orders expanded into pairs at a time, bounds memory during a build
+PAIR_BATCH_ORDERS = 50_000
+READ_CHUNK_SIZE = 5000
+WRITE_BATCH_SIZE = 1000
+
+
+def _placed_order_items():
+    """
+    (order_id, menu_item_id) arrays over live and archived placed orders.
+    Archived orders keep their ids, so the two never collide.
+    """
+    order_ids, menu_item_ids = [], []
+    for model in (OrderItem, ArchivedOrderItem):
+        rows = (
+            model.objects
+            .filter(order__ordered=True, order__order_cancelled=False)
+            .values_list("order_id", "menu_item_id")
+            .iterator(chunk_size=READ_CHUNK_SIZE)
+        )
+        for order_id, menu_item_id in rows:
+            order_ids.append(order_id)
+            menu_item_ids.append(menu_item_id)
+    return np.array(order_ids, dtype=np.int64), np.array(menu_item_ids, dtype=np.int64)
+
+
+def _pair_keys(starts, sizes, item_idx, n_items):
+    """
+    ``a * n_items + b`` for every ordered pair of distinct items a, b in
+    each group ``item_idx[start:start + size]``.
+    """
+    squares = sizes * sizes
+    group = np.repeat(np.arange(len(sizes)), squares)
+    offset = np.arange(squares.sum()) - np.repeat(np.cumsum(squares) - squares, squares)
+    left = starts[group] + offset // sizes[group]
+    right = starts[group] + offset % sizes[group]
+    distinct = left != right
+    return item_idx[left[distinct]] * n_items + item_idx[right[distinct]]
+
+
+def co_occurrence_counts(order_ids, menu_item_ids, max_order_size):
+    """
+    Sparse co-occurrence of menu items over orders.
+
+    Returns ``(items, item_orders, keys, counts)``: the distinct menu item
+    ids, how many orders contain each, and the pair counts as flat keys
+    ``a * len(items) + b`` (indexes into ``items``) with their counts.
+    """
+    items, item_idx = np.unique(menu_item_ids, return_inverse=True)
+    _, order_idx = np.unique(order_ids, return_inverse=True)
+    n_items = len(items)
+
+    # One row per distinct (order, item), sorted by order
+    pairs = np.unique(order_idx.astype(np.int64) * n_items + item_idx)
+    order_idx, item_idx = pairs // n_items, pairs % n_items
+    item_orders = np.bincount(item_idx, minlength=n_items)
+
+    _, starts, sizes = np.unique(order_idx, return_index=True, return_counts=True)
+    kept = (sizes > 1) & (sizes <= max_order_size)
+    starts, sizes = starts[kept], sizes[kept]
+
+    keys = np.empty(0, np.int64)
+    counts = np.empty(0, np.int64)
+    for batch in range(0, len(starts), PAIR_BATCH_ORDERS):
+        batch_keys = _pair_keys(starts[batch:batch + PAIR_BATCH_ORDERS],
+                                sizes[batch:batch + PAIR_BATCH_ORDERS], item_idx, n_items)
+        keys, inverse = np.unique(np.concatenate([keys, batch_keys]), return_inverse=True)
+        counts = np.bincount(
+            inverse,
+            weights=np.concatenate([counts, np.ones(len(batch_keys), np.int64)]),
+            minlength=len(keys),
+        ).astype(np.int64)
+    return items, item_orders, keys, counts
+
+
+def top_k_neighbours(items, item_orders, keys, counts, restaurants, k):
+    """
+    ``{menu_item_id: [[neighbour_id, score], ...]}`` keeping the ``k`` best
+    same-restaurant neighbours of each item by cosine similarity.
+    """
+    n_items = len(items)
+    left, right = keys // n_items, keys % n_items
+    same = (restaurants[left] == restaurants[right]) & (restaurants[left] >= 0)
+    left, right, counts = left[same], right[same], counts[same]
+
+    scores = counts / np.sqrt(item_orders[left] * item_orders[right])
+    order = np.lexsort((items[right], -scores, left))
+    left, right, scores = left[order], right[order], scores[order]
+
+    _, starts = np.unique(left, return_index=True)
+    rank = np.arange(len(left)) - np.repeat(starts, np.diff(np.append(starts, len(left))))
+    best = rank < k
+
+    neighbours = defaultdict(list)
+    for a, b, score in zip(items[left[best]].tolist(), items[right[best]].tolist(),
+                           np.round(scores[best], 4).tolist()):
+        neighbours[a].append([b, score])
+    return neighbours
+
+
+def build_co_occurrence_recommendations():
+    """
+    Rebuild every item's "ordered together" neighbour list. Returns the
+    number of items that got one.
+    """
+    order_ids, menu_item_ids = _placed_order_items()
+    neighbours = {}
+    if len(order_ids):
+        items, item_orders, keys, counts = co_occurrence_counts(
+            order_ids, menu_item_ids, settings.RECOMMENDATION_MAX_ORDER_SIZE
+        )
+        restaurant_by_item = dict(
+            MenuItem.objects.filter(id__in=items.tolist()).values_list("id", "menu__restaurant_id")
+        )
+        # Items deleted since they were ordered get -1 and are dropped
+        restaurants = np.array([restaurant_by_item.get(item_id, -1) for item_id in items.tolist()])
+        neighbours = top_k_neighbours(items, item_orders, keys, counts, restaurants,
+                                      settings.RECOMMENDATION_TOP_K)
+
+    with transaction.atomic():
+        MenuItemRecommendation.objects.filter(kind=CO_OCCURRENCE).delete()
+        MenuItemRecommendation.objects.bulk_create(
+            [
+                MenuItemRecommendation(menu_item_id=menu_item_id, kind=CO_OCCURRENCE, neighbours=pairs)
+                for menu_item_id, pairs in neighbours.items()
+            ],
+            batch_size=WRITE_BATCH_SIZE,
+        )
+    return len(neighbours)
+
+
+def complementary_items(menu_item_ids, restaurant_id, limit=10):
+    """
+    Up to ``limit`` (menu_item_id, score) pairs most often ordered together
+    with ``menu_item_ids`` at the given restaurant, best first. Scores of
+    an item recommended by several cart items add up.
+    """
+    menu_item_ids = set(menu_item_ids)
+    if not menu_item_ids:
+        return []
+
+    scores = defaultdict(float)
+    rows = MenuItemRecommendation.objects.filter(
+        menu_item_id__in=menu_item_ids, kind=CO_OCCURRENCE,
+        menu_item__menu__restaurant_id=restaurant_id,
+    ).values_list("neighbours", flat=True)
+    for neighbours in rows:
+        for neighbour_id, score in neighbours:
+            if neighbour_id not in menu_item_ids:
+                scores[neighbour_id] += score
+    return sorted(scores.items(), key=lambda pair: (-pair[1], pair[0]))[:limit]
@@ -0,0 +1,133 @@
+"""
+Restaurant ratings computed from Review rows.
+
+A review rates an order; it counts once for every restaurant whose menu
+items are in that order. ``compute_restaurant_ratings`` folds reviews
+created since the last run into per-restaurant review counts and rating
+sums, then writes Bayesian-smoothed averages
+
+    (RATING_PRIOR_WEIGHT * global mean + rating sum) / (RATING_PRIOR_WEIGHT + count)
+
+to ``restaurant_ratings.csv`` in the analyzer output directory, where the
+suggestion endpoints pick it up (see ``apps.restaurants.ai.utils``). The
+counts, sums and the last review id live in the same directory, so a run
+only reads new reviews. Ids are allocated before commit, so a review can
+appear below the last id seen: every run reads the RATING_RESCAN_IDS ids
+below it again and skips the ones the state lists as already counted.
+Edited or deleted reviews are only reflected by a ``full`` run.
+"""
+import csv
+import json
+import os
+
+from django.conf import settings
+
+from apps.restaurants.ai.utils import get_restaurant_ratings_path
+from apps.restaurants.models import Review
+
+RATINGS_FIELDS = ("restaurant_id", "avg_rating", "review_count", "rating_sum")
+
+
+def _state_path():
+    return get_restaurant_ratings_path().with_name("restaurant_ratings_state.json")
+
+
+def _read_previous():
+    """
+    (state, {restaurant_id: [count, sum]}) of the last run, or (None, {})
+    if there was none or the output was written by something else.
+    """
+    try:
+        state = json.loads(_state_path().read_text())
+        state["recent_review_ids"] = set(state["recent_review_ids"])
+        with get_restaurant_ratings_path().open("r", encoding="utf-8") as f:
+            totals = {
+                int(row["restaurant_id"]): [int(row["review_count"]), int(row["rating_sum"])]
+                for row in csv.DictReader(f)
+            }
+    except (OSError, ValueError, KeyError, TypeError):
+        return None, {}
+    return state, totals
+
+
+def _new_review_totals(after_id, skip_ids):
+    """
+    Per-restaurant [count, sum], global (count, sum) and ids of the reviews
+    after ``after_id`` that are not in ``skip_ids``.
+    """
+    rows = (
+        Review.objects
+        .filter(id__gt=after_id, order__order_items__isnull=False)
+        .values_list("id", "rate", "order__order_items__menu_item__menu__restaurant_id")
+        .distinct()
+        .order_by()
+    )
+    totals = {}
+    reviews = {}
+    for review_id, rate, restaurant_id in rows.iterator(chunk_size=5000):
+        if review_id in skip_ids:
+            continue
+        reviews[review_id] = rate
+        entry = totals.setdefault(restaurant_id, [0, 0])
+        entry[0] += 1
+        entry[1] += rate
+    return totals, len(reviews), sum(reviews.values()), set(reviews)
+
+
+def _write_atomic(path, write):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp")
+    with tmp.open("w", encoding="utf-8", newline="") as f:
+        write(f)
+    os.replace(tmp, path)
+
+
+def compute_restaurant_ratings(full=False):
+    """
+    Update the restaurant ratings output with reviews created since the
+    last run (all reviews if ``full``). Returns the number of new reviews.
+    """
+    state, totals = (None, {}) if full else _read_previous()
+    state = state or {"last_review_id": 0, "recent_review_ids": set(), "review_count": 0, "rating_sum": 0}
+
+    window = settings.RATING_RESCAN_IDS
+    new_totals, review_count, rating_sum, new_ids = _new_review_totals(
+        max(state["last_review_id"] - window, 0), state["recent_review_ids"]
+    )
+    if state["last_review_id"] and not review_count:
+        return 0
+    for restaurant_id, (count, total) in new_totals.items():
+        entry = totals.setdefault(restaurant_id, [0, 0])
+        entry[0] += count
+        entry[1] += total
+    last_id = max(new_ids | {state["last_review_id"]})
+    state = {
+        "last_review_id": last_id,
+        # Counted ids that the next run reads again
+        "recent_review_ids": sorted(
+            review_id for review_id in state["recent_review_ids"] | new_ids if review_id > last_id - window
+        ),
+        "review_count": state["review_count"] + review_count,
+        "rating_sum": state["rating_sum"] + rating_sum,
+    }
+
+    prior = settings.RATING_PRIOR_WEIGHT
+    mean = state["rating_sum"] / state["review_count"] if state["review_count"] else 0.0
+    ratings = sorted(
+        (
+            (restaurant_id, (prior * mean + total) / (prior + count), count, total)
+            for restaurant_id, (count, total) in totals.items()
+        ),
+        key=lambda row: (-row[1], row[0]),
+    )
+
+    def write_ratings(f):
+        writer = csv.writer(f)
+        writer.writerow(RATINGS_FIELDS)
+        for restaurant_id, average, count, total in ratings:
+            writer.writerow([restaurant_id, f"{average:.4f}", count, total])
+
+    # Ratings first: a crash in between only makes the next run redo work
+    _write_atomic(get_restaurant_ratings_path(), write_ratings)
+    _write_atomic(_state_path(), lambda f: json.dump(state, f))
+    return review_count
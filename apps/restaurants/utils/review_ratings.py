@@ -0,0 +1,157 @@
+"""
+Rating aggregates on restaurants and menu items.
+
+A review rates an order; it counts once for every restaurant and every menu
+item in that order. ``apply_review_rating`` moves a review in or out of the
+stored aggregates (``RatingAggregates``) with one UPDATE per table, and
+``reconcile_rating_aggregates`` recomputes them from the reviews for rows
+that drifted, e.g. after reviews were written outside the API.
+"""
+from functools import partial
+
+from django.db import transaction
+from django.db.models import Count, Exists, IntegerField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from apps.restaurants.models import (
+    MenuItem,
+    OrderItem,
+    RATING_VALUES,
+    Restaurant,
+    Review,
+    rating_delta_updates,
+)
+from .menu_snapshot import invalidate_menu_snapshots
+from .top_suggestions import invalidate_top_suggestions
+
+RATING_COUNTER_FIELDS = (
+    "rating_count", "rating_sum", *(f"rating_{rate}" for rate in RATING_VALUES),
+)
+
+
+def apply_review_rating(order_id, removed=None, added=None):
+    """
+    Replace a review rated ``removed`` by one rated ``added`` (either may be
+    None) on the restaurants and menu items of order ``order_id``.
+    """
+    updates = rating_delta_updates(removed, added)
+    if not updates:
+        return
+
+    lines = OrderItem.objects.filter(order_id=order_id)
+    MenuItem.objects.filter(
+        pk__in=lines.values("menu_item_id")
+    ).update(**updates)
+    restaurant_ids = list(
+        lines.values_list("menu_item__menu__restaurant_id", flat=True).distinct()
+    )
+    Restaurant.objects.filter(pk__in=restaurant_ids).update(**updates)
+
+    # Menu snapshots and top suggestions embed the ratings
+    transaction.on_commit(partial(invalidate_menu_snapshots, restaurant_ids))
+    if restaurant_ids:
+        transaction.on_commit(invalidate_top_suggestions)
+
+
+def _rating_aggregate_subqueries(reviews):
+    """
+    {field: expression} computing every counter from ``reviews``, a Review
+    queryset already filtered down to the row referenced by OuterRef('pk').
+    """
+    def aggregate(expression):
+        return Coalesce(
+            Subquery(
+                reviews.values(group=Value(1))
+                .annotate(value=expression)
+                .values("value")
+            ),
+            Value(0),
+            output_field=IntegerField(),
+        )
+
+    subqueries = {
+        "rating_count": aggregate(Count("pk")),
+        "rating_sum": aggregate(Sum("rate")),
+    }
+    for rate in RATING_VALUES:
+        subqueries[f"rating_{rate}"] = aggregate(Count("pk", filter=Q(rate=rate)))
+    return subqueries
+
+
+def restaurant_rating_subqueries():
+    return _rating_aggregate_subqueries(
+        Review.objects.filter(Exists(
+            OrderItem.objects.filter(
+                order_id=OuterRef("order_id"),
+                menu_item__menu__restaurant_id=OuterRef(OuterRef("pk")),
+            )
+        ))
+    )
+
+
+def menu_item_rating_subqueries():
+    return _rating_aggregate_subqueries(
+        Review.objects.filter(Exists(
+            OrderItem.objects.filter(
+                order_id=OuterRef("order_id"),
+                menu_item_id=OuterRef(OuterRef("pk")),
+            )
+        ))
+    )
+
+
+def reconcile_rating_aggregates(model, subqueries, batch_size=1000, dry_run=False):
+    """
+    Recompute the aggregates of every ``model`` row in primary key batches
+    and rewrite the rows whose stored values differ. Returns
+    (checked, [(row, {field: (stored, expected)})]).
+    """
+    checked = 0
+    drifted = []
+    last_pk = 0
+    expected_names = {field: f"expected_{field}" for field in RATING_COUNTER_FIELDS}
+
+    while True:
+        with transaction.atomic():
+            # Lock the batch first, then count in a new statement: a review
+            # write blocked on the lock applies its F() delta on top of the
+            # repaired values, and one committed before is in the counts.
+            pks = list(
+                model.objects
+                .select_for_update()
+                .filter(pk__gt=last_pk)
+                .order_by("pk")
+                .values_list("pk", flat=True)[:batch_size]
+            )
+            if not pks:
+                break
+            batch = list(
+                model.objects
+                .filter(pk__in=pks)
+                .order_by("pk")
+                .annotate(**{expected_names[field]: subqueries[field] for field in RATING_COUNTER_FIELDS})
+                .only("pk", *RATING_COUNTER_FIELDS, "rating_average")
+            )
+            last_pk = batch[-1].pk
+            checked += len(batch)
+
+            repaired = []
+            for row in batch:
+                changes = {}
+                for field in RATING_COUNTER_FIELDS:
+                    stored, expected = getattr(row, field), getattr(row, expected_names[field])
+                    if stored != expected:
+                        changes[field] = (stored, expected)
+                        setattr(row, field, expected)
+                average = row.rating_sum / row.rating_count if row.rating_count else 0.0
+                if abs(row.rating_average - average) > 1e-9:
+                    changes["rating_average"] = (row.rating_average, average)
+                    row.rating_average = average
+                if changes:
+                    drifted.append((row, changes))
+                    repaired.append(row)
+
+            if repaired and not dry_run:
+                model.objects.bulk_update(repaired, [*RATING_COUNTER_FIELDS, "rating_average"])
+
+    return checked, drifted
@@ -0,0 +1,145 @@
+"""
+Hourly and daily sales rollups per restaurant.
+
+An order counts while it is placed (``ordered`` and not cancelled), in the
+buckets of its ``created_at`` in the project time zone. Orders carry no
+restaurant, so each one is split by the restaurants of its items: revenue
+and items sold are those restaurants' lines, and the order is counted once
+for each of them.
+
+``record_order_sales`` applies one order as it is placed or cancelled (see
+signals), which matches what ``rebuild_sales_rollups`` computes from
+scratch. Changes that bypass model saves, such as ``QuerySet.update()``,
+are only picked up by a rebuild.
+"""
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum, Value
+from django.db.models.functions import Greatest, TruncDate, TruncHour
+from django.utils import timezone
+
+from apps.restaurants.models import (
+    ArchivedOrderItem,
+    DailySalesRollup,
+    HourlySalesRollup,
+    OrderItem,
+    Orders,
+)
+
+ROLLUP_FIELDS = ("order_count", "revenue", "items_sold")
+
+
+def _increment(model, lookup, deltas):
+    """
+    Add ``deltas`` to the rollup row identified by ``lookup``, creating it
+    if needed. The addition happens in the database so concurrent
+    checkouts never lose updates.
+    """
+    changes = {field: F(field) + value for field, value in deltas.items()}
+    if model.objects.filter(**lookup).update(**changes):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**lookup, **deltas)
+    except IntegrityError:
+        # Another checkout created the row first
+        model.objects.filter(**lookup).update(**changes)
+
+
+def _decrement(model, lookup, deltas):
+    """
+    Take ``deltas`` back out of the rollup row identified by ``lookup``,
+    clamped at 0, and drop the row once it counts no order, as a rebuild
+    would not create it.
+    """
+    rows = model.objects.filter(**lookup)
+    rows.update(**{field: Greatest(F(field) - value, Value(0)) for field, value in deltas.items()})
+    rows.filter(order_count=0).delete()
+
+
+def record_order_sales(order_id, cancelled=False):
+    """
+    Add one placed order to the hourly and daily rollups, or take it out
+    again when it was cancelled (``cancelled=True``).
+    """
+    order = Orders.objects.filter(pk=order_id).only("id", "created_at").first()
+    if order is None:
+        return
+
+    per_restaurant = (
+        OrderItem.objects
+        .filter(order_id=order_id)
+        .values(restaurant_id=F("menu_item__menu__restaurant_id"))
+        .annotate(revenue=Sum(F("quantity") * F("price")), items_sold=Sum("quantity"))
+    )
+    created_at = timezone.localtime(order.created_at)
+    bucket = created_at.replace(minute=0, second=0, microsecond=0)
+    apply = _decrement if cancelled else _increment
+
+    with transaction.atomic():
+        for row in per_restaurant:
+            deltas = {"order_count": 1, "revenue": row["revenue"], "items_sold": row["items_sold"]}
+            apply(HourlySalesRollup, {"restaurant_id": row["restaurant_id"], "bucket": bucket}, deltas)
+            apply(DailySalesRollup, {"restaurant_id": row["restaurant_id"], "day": created_at.date()}, deltas)
+
+
+def _aggregate(items, order_path, truncate, since):
+    """
+    Set-based rollup of one item table: {(restaurant_id, bucket): totals}.
+    """
+    items = items.filter(**{
+        f"{order_path}ordered": True,
+        f"{order_path}order_cancelled": False,
+    })
+    if since is not None:
+        items = items.filter(**{f"{order_path}created_at__gte": since})
+    rows = (
+        items
+        .values(
+            restaurant_id=F("menu_item__menu__restaurant_id"),
+            bucket=truncate(f"{order_path}created_at"),
+        )
+        .annotate(
+            order_count=Count("order_id", distinct=True),
+            revenue=Sum(F("quantity") * F("price")),
+            items_sold=Sum("quantity"),
+        )
+    )
+    return {(row["restaurant_id"], row["bucket"]): row for row in rows}
+
+
+def rebuild_sales_rollups(since=None):
+    """
+    Recompute the rollups from live and archived orders, for buckets from
+    ``since`` on (everything when None). ``since`` should be the start of a
+    day so no bucket is rebuilt partially. Returns (hourly, daily) row counts.
+    """
+    counts = []
+    for model, bucket_field, truncate in (
+        (HourlySalesRollup, "bucket", TruncHour),
+        (DailySalesRollup, "day", TruncDate),
+    ):
+        totals = defaultdict(lambda: dict.fromkeys(ROLLUP_FIELDS, 0))
+        # Orders live in exactly one of the two tables, so their sums add up
+        for source in (
+            _aggregate(OrderItem.objects.all(), "order__", truncate, since),
+            _aggregate(ArchivedOrderItem.objects.all(), "order__", truncate, since),
+        ):
+            for key, row in source.items():
+                for field in ROLLUP_FIELDS:
+                    totals[key][field] += row[field]
+
+        stale = model.objects.all()
+        if since is not None:
+            start = since if bucket_field == "bucket" else timezone.localtime(since).date()
+            stale = stale.filter(**{f"{bucket_field}__gte": start})
+        with transaction.atomic():
+            stale.delete()
+            model.objects.bulk_create([
+                model(restaurant_id=restaurant_id, **{bucket_field: bucket}, **values)
+                for (restaurant_id, bucket), values in totals.items()
+                if restaurant_id is not None
+            ], batch_size=1000)
+        counts.append(len(totals))
+    return tuple(counts)
@@ -0,0 +1,176 @@
+"""
+"Similar dishes" by ingredients.
+
+Each menu item is a binary vector over the normalized ingredient names of
+its restaurant, weighted by smoothed inverse document frequency
+(``log((1 + items) / (1 + items with the ingredient)) + 1``) and scaled to
+unit length, so that shared rare ingredients count for more than salt.
+``build_similar_items`` computes the cosine similarity of every pair of
+items of a restaurant with blocked NumPy matrix products and stores the top
+RECOMMENDATION_TOP_K neighbours of each item as a MenuItemRecommendation
+row; ``similar_items`` is then one indexed lookup.
+
+Ingredient weights depend on the whole menu, so a change to one item's
+ingredients marks its restaurant ``similar_items_stale`` in the same
+transaction (see signals) and ``build_pending_similar_items`` rebuilds the
+marked restaurants outside the request. The lists are replaced with the
+restaurant rows locked, so concurrent builds take turns.
+"""
+from collections import defaultdict
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+
+from apps.restaurants.models import MenuItemIngredient, MenuItemRecommendation, Restaurant
+from .recommendations import WRITE_BATCH_SIZE
+
+SIMILAR_INGREDIENTS = "similar"
+# Items whose similarities are computed at a time, bounds memory on big menus
+SIMILARITY_BLOCK_ROWS = 512
+# Restaurants read and written together by one build step
+SIMILARITY_RESTAURANT_BATCH = 100
+
+
+def _ingredient_rows(restaurant_ids=None):
+    """
+    {restaurant_id: (menu_item_ids, ingredient names)} with one entry per
+    ingredient row.
+    """
+    rows = MenuItemIngredient.objects.values_list(
+        "menu_item__menu__restaurant_id", "menu_item_id", "name"
+    ).order_by()
+    if restaurant_ids is not None:
+        rows = rows.filter(menu_item__menu__restaurant_id__in=restaurant_ids)
+
+    by_restaurant = defaultdict(lambda: ([], []))
+    for restaurant_id, menu_item_id, name in rows.iterator(chunk_size=5000):
+        name = (name or "").strip().casefold()
+        if name:
+            item_ids, names = by_restaurant[restaurant_id]
+            item_ids.append(menu_item_id)
+            names.append(name)
+    return by_restaurant
+
+
+def ingredient_neighbours(menu_item_ids, names, k):
+    """
+    ``{menu_item_id: [[neighbour_id, score], ...]}`` keeping the ``k`` most
+    similar items of each, by cosine similarity of their TF-IDF ingredient
+    vectors. ``menu_item_ids`` and ``names`` are aligned, one entry per
+    ingredient; items sharing nothing are never neighbours.
+    """
+    items, item_idx = np.unique(np.array(menu_item_ids, dtype=np.int64), return_inverse=True)
+    _, term_idx = np.unique(np.array(names, dtype=object), return_inverse=True)
+    n_items, n_terms = len(items), int(term_idx.max()) + 1
+    k = min(k, n_items - 1)
+    if k <= 0:
+        return {}
+
+    pairs = np.unique(item_idx.astype(np.int64) * n_terms + term_idx)
+    item_idx, term_idx = pairs // n_terms, pairs % n_terms
+    idf = np.log((1 + n_items) / (1 + np.bincount(term_idx, minlength=n_terms))) + 1
+
+    vectors = np.zeros((n_items, n_terms), dtype=np.float32)
+    vectors[item_idx, term_idx] = idf[term_idx]
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    neighbours = {}
+    for start in range(0, n_items, SIMILARITY_BLOCK_ROWS):
+        block = vectors[start:start + SIMILARITY_BLOCK_ROWS]
+        rows = np.arange(len(block))
+        scores = block @ vectors.T
+        scores[rows, rows + start] = -1  # not its own neighbour
+
+        best = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        # Rounded before sorting, so that equal similarities tie on item id
+        best_scores = np.round(np.take_along_axis(scores, best, axis=1).astype(np.float64), 4)
+        order = np.lexsort((items[best], -best_scores), axis=1)
+        best = np.take_along_axis(best, order, axis=1)
+        best_scores = np.take_along_axis(best_scores, order, axis=1)
+
+        for item_id, ids, values in zip(
+            items[start:start + len(block)].tolist(), items[best].tolist(), best_scores.tolist()
+        ):
+            pairs = [[neighbour_id, score] for neighbour_id, score in zip(ids, values) if score > 0]
+            if pairs:
+                neighbours[item_id] = pairs
+    return neighbours
+
+
+def _build_restaurant_batch(restaurant_ids):
+    # Cleared before reading: an ingredient change committed from here on
+    # marks the restaurant again and is picked up by the next build
+    Restaurant.objects.filter(pk__in=restaurant_ids, similar_items_stale=True).update(
+        similar_items_stale=False
+    )
+
+    neighbours = {}
+    for item_ids, names in _ingredient_rows(restaurant_ids).values():
+        neighbours.update(ingredient_neighbours(item_ids, names, settings.RECOMMENDATION_TOP_K))
+
+    with transaction.atomic():
+        # Builds of the same restaurant wait for each other here instead of
+        # colliding on the (menu_item, kind) constraint
+        locked = Restaurant.objects.select_for_update().filter(pk__in=restaurant_ids).order_by("pk")
+        list(locked.values_list("pk", flat=True))
+        MenuItemRecommendation.objects.filter(
+            kind=SIMILAR_INGREDIENTS, menu_item__menu__restaurant_id__in=restaurant_ids
+        ).delete()
+        MenuItemRecommendation.objects.bulk_create(
+            [
+                MenuItemRecommendation(menu_item_id=menu_item_id, kind=SIMILAR_INGREDIENTS, neighbours=pairs)
+                for menu_item_id, pairs in neighbours.items()
+            ],
+            batch_size=WRITE_BATCH_SIZE,
+        )
+    return len(neighbours)
+
+
+def build_similar_items(restaurant_ids=None):
+    """
+    Rebuild the "similar ingredients" neighbour lists of the given
+    restaurants (all of them by default). Returns the number of items that
+    got one.
+    """
+    if restaurant_ids is None:
+        restaurant_ids = Restaurant.objects.values_list("pk", flat=True)
+    restaurant_ids = sorted(set(restaurant_ids))
+
+    count = 0
+    for start in range(0, len(restaurant_ids), SIMILARITY_RESTAURANT_BATCH):
+        count += _build_restaurant_batch(restaurant_ids[start:start + SIMILARITY_RESTAURANT_BATCH])
+    return count
+
+
+def build_pending_similar_items():
+    """
+    Rebuild the restaurants whose ingredients changed since their last
+    build. Returns (restaurants, items with a list).
+    """
+    restaurant_ids = list(Restaurant.objects.filter(similar_items_stale=True).values_list("pk", flat=True))
+    return len(restaurant_ids), build_similar_items(restaurant_ids)
+
+
+def mark_similar_items_stale(restaurant_ids):
+    """
+    Queue the given restaurants for ``build_pending_similar_items``. Part of
+    the caller's transaction, so a rolled back change queues nothing.
+    """
+    Restaurant.objects.filter(pk__in=restaurant_ids, similar_items_stale=False).update(
+        similar_items_stale=True
+    )
+
+
+def similar_items(menu_item_id, limit=10):
+    """
+    Up to ``limit`` (menu_item_id, score) pairs of the same restaurant with
+    the most similar ingredients, best first.
+    """
+    neighbours = (
+        MenuItemRecommendation.objects
+        .filter(menu_item_id=menu_item_id, kind=SIMILAR_INGREDIENTS)
+        .values_list("neighbours", flat=True)
+        .first()
+    )
+    return [(neighbour_id, score) for neighbour_id, score in (neighbours or [])[:limit]]
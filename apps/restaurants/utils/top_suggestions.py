@@ -0,0 +1,55 @@
+"""
+Rendered responses of the top restaurant suggestions endpoint.
+
+A response depends on the analyzer ratings file and on the restaurant rows
+it serializes. It is cached per (ratings version, restaurants version, n,
+include_scores): the ratings version is the signature of the ratings file
+the process currently serves, the restaurants version a random token that
+is dropped whenever a restaurant, its images, owners, waiters or rating
+aggregates change.
+"""
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+TOP_SUGGESTIONS_VERSION_KEY = "top-suggestions:version"
+TOP_SUGGESTIONS_KEY = "top-suggestions:{ratings_version}:{version}:{n}:{include_scores}"
+
+
+def get_top_suggestions_version():
+    """
+    Return the current restaurants version, creating one if it is missing
+    (first read, eviction or invalidation).
+    """
+    version = cache.get(TOP_SUGGESTIONS_VERSION_KEY)
+    if version is None:
+        version = uuid.uuid4().hex[:16]
+        if not cache.add(TOP_SUGGESTIONS_VERSION_KEY, version, timeout=None):
+            version = cache.get(TOP_SUGGESTIONS_VERSION_KEY, version)
+    return version
+
+
+def _top_suggestions_key(ratings_version, version, n, include_scores):
+    return TOP_SUGGESTIONS_KEY.format(
+        ratings_version=ratings_version, version=version, n=n, include_scores=int(include_scores)
+    )
+
+
+def get_top_suggestions(ratings_version, version, n, include_scores):
+    """
+    Return the pre-rendered JSON bytes for these parameters, or None.
+    """
+    return cache.get(_top_suggestions_key(ratings_version, version, n, include_scores))
+
+
+def set_top_suggestions(ratings_version, version, n, include_scores, content):
+    cache.set(
+        _top_suggestions_key(ratings_version, version, n, include_scores),
+        content,
+        timeout=settings.TOP_SUGGESTIONS_TIMEOUT,
+    )
+
+
+def invalidate_top_suggestions():
+    cache.delete(TOP_SUGGESTIONS_VERSION_KEY)
@@ -0,0 +1,237 @@
+"""
+Trending menu items per restaurant and per city.
+
+Every placed order adds its quantities to the items' ``MenuItemTrend``
+counters with forward decay: an order at time ``t`` adds
+``quantity * exp(rate * (t - landmark))`` to the score, where ``landmark``
+is ``t`` floored to TRENDING_LANDMARK_HOURS and ``rate`` follows from
+TRENDING_HALF_LIFE_HOURS. That is one UPDATE per item, however long the
+item's history; a row still on an older landmark is rescaled onto the new
+one by the same write.
+
+``materialize_trending_items`` decays every counter to the current time and
+writes the top TRENDING_TOP_K items of each restaurant and each city to
+``trending.csv`` in ANALYTICS_DATA_DIR. Workers serve ``trending_items``
+from a memory-mapped copy of that file that is reloaded when it changes.
+Neither side reads order history.
+"""
+import csv
+import heapq
+import math
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone as dt_timezone
+from pathlib import Path
+from typing import List
+
+import numpy as np
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from apps.restaurants.ai.utils import AnalyzerFileCache
+from apps.restaurants.models import MenuItemTrend, OrderItem, Orders
+from .restaurant_ratings import _write_atomic
+
+TRENDING_FIELDS = ("scope", "key", "menu_item_id", "score")
+RESTAURANT_SCOPE = "restaurant"
+CITY_SCOPE = "city"
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def decay_rate():
+    """
+    Decay per second.
+    """
+    return math.log(2) / (settings.TRENDING_HALF_LIFE_HOURS * 3600)
+
+
+def landmark_for(moment):
+    interval = timedelta(hours=settings.TRENDING_LANDMARK_HOURS)
+    return _EPOCH + ((moment - _EPOCH) // interval) * interval
+
+
+def city_key(city):
+    return (city or "").strip().casefold()
+
+
+def _add_trend(menu_item_id, quantity, ordered_at):
+    landmark = landmark_for(ordered_at)
+    rate = decay_rate()
+
+    def weight(at_landmark):
+        return quantity * math.exp(rate * (ordered_at - at_landmark).total_seconds())
+
+    trends = MenuItemTrend.objects.filter(menu_item_id=menu_item_id)
+    if trends.filter(landmark=landmark).update(score=F("score") + weight(landmark)):
+        return
+
+    with transaction.atomic():
+        trend = trends.select_for_update().first()
+        if trend is None:
+            try:
+                with transaction.atomic():
+                    MenuItemTrend.objects.create(
+                        menu_item_id=menu_item_id, landmark=landmark, score=weight(landmark)
+                    )
+                return
+            except IntegrityError:
+                # Another checkout created the row first
+                trend = trends.select_for_update().get()
+
+        # Rebase onto the newer of the two landmarks, then add
+        target = max(trend.landmark, landmark)
+        trend.score = (
+            trend.score * math.exp(-rate * (target - trend.landmark).total_seconds())
+            + weight(target)
+        )
+        trend.landmark = target
+        trend.save(update_fields=["score", "landmark"])
+
+
+def record_order_trends(order_id):
+    """
+    Add one placed order's items to the trending counters.
+    """
+    order = (
+        Orders.objects
+        .filter(pk=order_id, ordered=True, order_cancelled=False)
+        .only("id", "created_at")
+        .first()
+    )
+    if order is None:
+        return
+
+    quantities = (
+        OrderItem.objects
+        .filter(order_id=order_id)
+        .values("menu_item_id")
+        .annotate(quantity=Sum("quantity"))
+        .order_by("menu_item_id")
+    )
+    with transaction.atomic():
+        for row in quantities:
+            _add_trend(row["menu_item_id"], row["quantity"], order.created_at)
+
+
+def get_trending_path() -> Path:
+    return Path(settings.ANALYTICS_DATA_DIR) / "trending.csv"
+
+
+def materialize_trending_items(now=None):
+    """
+    Write the current top items per restaurant and per city to
+    ``trending.csv``. Returns the number of counters read.
+    """
+    now = now or timezone.now()
+    rows = list(
+        MenuItemTrend.objects
+        .filter(score__gt=0)
+        .values_list(
+            "menu_item_id", "score", "landmark",
+            "menu_item__menu__restaurant_id", "menu_item__menu__restaurant__city",
+        )
+        .order_by()
+    )
+    if rows:
+        item_ids, scores, landmarks, restaurant_ids, cities = zip(*rows)
+        age = np.array([(now - landmark).total_seconds() for landmark in landmarks])
+        values = np.array(scores) * np.exp(-decay_rate() * age)
+        # Rank on the values as written, so that rounding noise cannot reorder ties
+        values = [float(f"{value:.6g}") for value in values.tolist()]
+    else:
+        item_ids = values = restaurant_ids = cities = ()
+
+    by_scope = defaultdict(list)
+    for item_id, value, restaurant_id, city in zip(item_ids, values, restaurant_ids, cities):
+        by_scope[(RESTAURANT_SCOPE, str(restaurant_id))].append((value, item_id))
+        if city_key(city):
+            by_scope[(CITY_SCOPE, city_key(city))].append((value, item_id))
+
+    k = settings.TRENDING_TOP_K
+
+    def write_trending(f):
+        writer = csv.writer(f)
+        writer.writerow(TRENDING_FIELDS)
+        for scope, key in sorted(by_scope):
+            top = heapq.nlargest(k, by_scope[(scope, key)], key=lambda entry: (entry[0], -entry[1]))
+            for value, item_id in top:
+                writer.writerow([scope, key, item_id, value])
+
+    _write_atomic(get_trending_path(), write_trending)
+    return len(rows)
+
+
+class TrendingLists:
+    """
+    trending.csv as arrays. ``keys`` holds every ``"<scope>:<key>"`` sorted
+    ascending; the items of key ``i``, best first, are
+    ``item_ids[offsets[i]:offsets[i + 1]]`` with their ``scores``.
+    """
+    files = ("keys", "offsets", "item_ids", "scores")
+
+    def __init__(self, keys: np.ndarray, offsets: np.ndarray, item_ids: np.ndarray, scores: np.ndarray):
+        self.keys = keys
+        self.offsets = offsets
+        self.item_ids = item_ids
+        self.scores = scores
+
+    @classmethod
+    def empty(cls) -> "TrendingLists":
+        return cls(np.empty(0, "<U1"), np.zeros(1, np.int64), np.empty(0, np.int64), np.empty(0, np.float32))
+
+    @classmethod
+    def from_csv(cls, path: Path) -> "TrendingLists":
+        lists = defaultdict(list)
+        with path.open("r", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                lists[f"{row['scope']}:{row['key']}"].append((int(row["menu_item_id"]), float(row["score"])))
+
+        keys = sorted(lists)
+        entries = [entry for key in keys for entry in lists[key]]
+        offsets = np.zeros(len(keys) + 1, dtype=np.int64)
+        np.cumsum([len(lists[key]) for key in keys], out=offsets[1:])
+        return cls(
+            np.array(keys, dtype=str) if keys else cls.empty().keys,
+            offsets,
+            np.array([item_id for item_id, _ in entries], dtype=np.int64),
+            np.array([score for _, score in entries], dtype=np.float32),
+        )
+
+    @classmethod
+    def open(cls, directory: Path) -> "TrendingLists":
+        return cls(*(np.load(directory / f"{name}.npy", mmap_mode="r") for name in cls.files))
+
+    def save(self, directory: Path) -> None:
+        for name in self.files:
+            np.save(directory / f"{name}.npy", getattr(self, name))
+
+    def top(self, scope: str, key: str, n: int) -> List[tuple]:
+        """
+        Up to ``n`` (menu_item_id, score) pairs of one list, best first.
+        """
+        key = f"{scope}:{key}"
+        position = int(np.searchsorted(self.keys, key))
+        if position == len(self.keys) or self.keys[position] != key:
+            return []
+        start, end = self.offsets[position:position + 2].tolist()
+        end = min(end, start + n)
+        return list(zip(self.item_ids[start:end].tolist(), self.scores[start:end].tolist()))
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+
+trending_cache = AnalyzerFileCache("trending", get_trending_path, TrendingLists)
+
+
+def trending_items(restaurant_id=None, city=None, limit=10):
+    """
+    The materialized (menu_item_id, score) list of a restaurant or a city,
+    best first.
+    """
+    lists = trending_cache.get()
+    if restaurant_id is not None:
+        return lists.top(RESTAURANT_SCOPE, str(restaurant_id), limit)
+    return lists.top(CITY_SCOPE, city_key(city), limit)
@@ -4,4 +4,5 @@ from .ai import *
 from .carts import *
 from .orders import *
 from .payments import *
-from .reviews import *
\ No newline at end of file
+from .reviews import *
+from .analytics import *
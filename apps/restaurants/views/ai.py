@@ -1,17 +1,46 @@
-from typing import List
-
+from django.conf import settings
+from django.http import HttpResponse
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework import status
 
-from apps.restaurants.ai.utils import top_restaurant_ids, load_restaurant_ratings
+from apps.restaurants.ai.utils import restaurant_ratings_cache
+from apps.restaurants.models import CartItem, MenuItem
 from apps.restaurants.serializers import RestaurantSerializer, MenuItemSerializer
+from apps.restaurants.utils import (
+    complementary_items,
+    personal_recommendations,
+    trending_items,
+    similar_items,
+    get_top_suggestions_version,
+    get_top_suggestions,
+    set_top_suggestions,
+)
+
+
+def ranked_menu_items(restaurant_id, ranked_ids, n, exclude=()):
+    """
+    The restaurant's menu items in ``ranked_ids`` order, filled up to ``n``
+    with its other items by price desc.
+    """
+    items = MenuItem.objects.filter(menu__restaurant_id=restaurant_id).select_related("menu")
+    by_id = items.in_bulk(ranked_ids)
+    suggestions = [by_id[item_id] for item_id in ranked_ids if item_id in by_id]
+    if len(suggestions) < n:
+        suggestions += list(
+            items.exclude(id__in=[*exclude, *by_id]).order_by("-price", "name")[:n - len(suggestions)]
+        )
+    return suggestions
 
 
 class RestaurantTopSuggestionsView(APIView):
     """
     Suggest top restaurants using analyzer outputs (restaurant_ratings.csv).
 
+    Responses are rendered once per ratings file, restaurants version and
+    query and then served from the cache (see ``utils.top_suggestions``).
+
     Query params:
     - n: number of suggestions to return (default 10, max 100)
     - include_scores: if truthy, also include avg_rating alongside each restaurant
@@ -19,48 +48,71 @@ class RestaurantTopSuggestionsView(APIView):
 
     def get(self, request):
         n_param = request.query_params.get("n", "10")
-        include_scores = request.query_params.get("include_scores")
+        include_scores = bool(request.query_params.get("include_scores"))
         try:
             n = max(1, min(int(n_param), 100))
         except Exception:
             n = 10
 
-        ids: List[int] = top_restaurant_ids(n)
-        # Fetch active restaurants by those IDs
-        qs = RestaurantSerializer.Meta.model.objects.filter(id__in=ids, is_active=True).prefetch_related("images")
+        ratings_version, ratings = restaurant_ratings_cache.get_versioned()
+        version = get_top_suggestions_version()
+        content = get_top_suggestions(ratings_version, version, n, include_scores)
+        if content is None:
+            content = JSONRenderer().render(self.render_suggestions(ratings, n, include_scores))
+            set_top_suggestions(ratings_version, version, n, include_scores, content)
+        return HttpResponse(content, content_type="application/json")
+
+    def render_suggestions(self, ratings, n, include_scores):
+        ids = ratings.top_ids(n)
+        restaurants = (
+            RestaurantSerializer.Meta.model.objects
+            .filter(id__in=ids)
+            .prefetch_related("images", "owners__user", "waiters__user")
+            .in_bulk()
+        )
         # Preserve order by rating rank
-        order_index = {rid: idx for idx, rid in enumerate(ids)}
-        restaurants = sorted(list(qs), key=lambda r: order_index.get(r.id, 10**9))
+        restaurants = [restaurants[rid] for rid in ids if rid in restaurants]
 
         if not include_scores:
-            data = RestaurantSerializer(restaurants, many=True).data
-            return Response(data)
+            return RestaurantSerializer(restaurants, many=True).data
 
         # Attach scores
-        rating_pairs = dict(load_restaurant_ratings())
         data = [
             {
                 "restaurant": RestaurantSerializer(r).data,
-                "avg_rating": round(float(rating_pairs.get(r.id, 0.0)), 3),
+                "avg_rating": round(ratings.get(r.id, 0.0), 3),
             }
             for r in restaurants
         ]
-        return Response({"count": len(data), "results": data})
+        return {"count": len(data), "results": data}
 
 
 class RestaurantMenuSuggestionsView(APIView):
     """
     Suggest menu items for a given restaurant.
 
-    For now, this returns available items of the restaurant ordered by price desc
-    as a reasonable fallback, and can later incorporate analyzer outputs.
+    Items frequently ordered together with the seed items come first (see
+    ``build_item_recommendations``); the rest of the list is filled with the
+    restaurant's items ordered by price desc.
 
     Path params:
     - restaurant_id: the target restaurant
     Query params:
     - n: number of items (default 10, max 50)
+    - items: comma separated menu item ids to complement. Defaults to the
+      authenticated user's cart.
     """
 
+    def get_seed_item_ids(self, request):
+        items = request.query_params.get("items")
+        if items:
+            return [int(item_id) for item_id in items.split(",") if item_id.strip().isdigit()]
+        if request.user.is_authenticated and hasattr(request.user, "profile"):
+            return list(
+                CartItem.objects.filter(cart__user=request.user.profile).values_list("menu_item_id", flat=True)
+            )
+        return []
+
     def get(self, request, restaurant_id: int):
         try:
             n = int(request.query_params.get("n", "10"))
@@ -68,12 +120,104 @@ class RestaurantMenuSuggestionsView(APIView):
             n = 10
         n = max(1, min(n, 50))
 
-        # Available items for menus belonging to the restaurant
-        qs = (
-            MenuItemSerializer.Meta.model.objects
-            .filter(menu__restaurant_id=restaurant_id, is_available=True)
-            .select_related("menu")
-            .order_by("-price", "name")[:n]
-        )
-        data = MenuItemSerializer(qs, many=True).data
+        seeds = self.get_seed_item_ids(request)
+        ranked = [item_id for item_id, _ in complementary_items(seeds, restaurant_id, limit=n)]
+        data = MenuItemSerializer(ranked_menu_items(restaurant_id, ranked, n, exclude=seeds), many=True).data
         return Response(data, status=status.HTTP_200_OK)
+
+
+class PersonalMenuSuggestionsView(APIView):
+    """
+    Suggest menu items of a restaurant for the current user, scored from
+    their order history (see ``build_personal_recommendations``). Anonymous
+    users and users without orders get the restaurant's most ordered items.
+
+    Path params:
+    - restaurant_id: the target restaurant
+    Query params:
+    - n: number of items (default 10, max 50)
+    """
+
+    def get(self, request, restaurant_id: int):
+        try:
+            n = int(request.query_params.get("n", "10"))
+        except Exception:
+            n = 10
+        n = max(1, min(n, 50))
+
+        profile_id = None
+        if request.user.is_authenticated and hasattr(request.user, "profile"):
+            profile_id = request.user.profile.id
+        ranked = [item_id for item_id, _ in personal_recommendations(profile_id, restaurant_id, limit=n)]
+        data = MenuItemSerializer(ranked_menu_items(restaurant_id, ranked, n), many=True).data
+        return Response(data, status=status.HTTP_200_OK)
+
+
+class TrendingMenuItemsView(APIView):
+    """
+    Menu items trending right now in a restaurant or a city, from the lists
+    materialized by ``materialize_trending_items`` (kept in memory by each
+    worker). Each item carries its decayed order count as ``score``.
+
+    Path params:
+    - restaurant_id or city: the scope of the list
+    Query params:
+    - n: number of items (default 10, max TRENDING_TOP_K)
+    """
+
+    def get(self, request, restaurant_id: int = None, city: str = None):
+        try:
+            n = int(request.query_params.get("n", "10"))
+        except Exception:
+            n = 10
+        n = max(1, min(n, settings.TRENDING_TOP_K))
+
+        ranked = trending_items(restaurant_id=restaurant_id, city=city, limit=n)
+        items = (
+            MenuItem.objects
+            .select_related("category")
+            .prefetch_related("ingredients")
+            .in_bulk([item_id for item_id, _ in ranked])
+        )
+        data = [
+            {**MenuItemSerializer(items[item_id], context={"request": request}).data,
+             "score": round(score, 4)}
+            for item_id, score in ranked
+            if item_id in items
+        ]
+        return Response({"count": len(data), "results": data}, status=status.HTTP_200_OK)
+
+
+class SimilarMenuItemsView(APIView):
+    """
+    Menu items of the same restaurant with the most similar ingredients,
+    from the neighbour lists precomputed by ``build_similar_items``. Each
+    item carries its cosine similarity as ``score``.
+
+    Path params:
+    - menu_item_id: the dish to find similar ones for
+    Query params:
+    - n: number of items (default 10, max RECOMMENDATION_TOP_K)
+    """
+
+    def get(self, request, menu_item_id: int):
+        try:
+            n = int(request.query_params.get("n", "10"))
+        except Exception:
+            n = 10
+        n = max(1, min(n, settings.RECOMMENDATION_TOP_K))
+
+        ranked = similar_items(menu_item_id, limit=n)
+        items = (
+            MenuItem.objects
+            .select_related("category")
+            .prefetch_related("ingredients")
+            .in_bulk([item_id for item_id, _ in ranked])
+        )
+        data = [
+            {**MenuItemSerializer(items[item_id], context={"request": request}).data,
+             "score": score}
+            for item_id, score in ranked
+            if item_id in items
+        ]
+        return Response({"count": len(data), "results": data}, status=status.HTTP_200_OK)
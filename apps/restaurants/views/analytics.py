@@ -0,0 +1,85 @@
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from apps.restaurants.utils import item_ranking, load_sales_columns, order_heatmap, sales_summary
+from apps.userprofile.permissions import IsRestaurantOwner
+
+
+class OwnerAnalyticsMixin:
+    """
+    Shared ``?days=`` parsing for the owner analytics endpoints.
+    """
+    permission_classes = [IsRestaurantOwner]
+
+    def get_days(self, request):
+        days = request.query_params.get("days")
+        if not days:
+            return None
+        if not days.isdigit() or int(days) < 1:
+            raise ValueError("days must be a positive integer")
+        return int(days)
+
+
+class OwnerItemRankingAPIView(OwnerAnalyticsMixin, APIView):
+    """
+    Best selling menu items of a restaurant, by revenue (default) or
+    ``?sort=quantity``. ``?n=`` limits the list (max 100).
+    """
+
+    def get(self, request, restaurant_id):
+        try:
+            days = self.get_days(request)
+            limit = min(int(request.query_params.get("n", 20)), 100)
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        sort = request.query_params.get("sort", "revenue")
+        if sort not in ("revenue", "quantity"):
+            return Response({"error": "sort must be 'revenue' or 'quantity'"}, status=status.HTTP_400_BAD_REQUEST)
+
+        columns = load_sales_columns(restaurant_id)
+        return Response({
+            "restaurant": restaurant_id,
+            "days": days,
+            "sort": sort,
+            "results": item_ranking(columns, days=days, limit=max(limit, 1), by=sort),
+        })
+
+
+class OwnerOrderHeatmapAPIView(OwnerAnalyticsMixin, APIView):
+    """
+    Orders per hour of week: 7 rows, Monday first, of 24 hourly counts in
+    the server's time zone.
+    """
+
+    def get(self, request, restaurant_id):
+        try:
+            days = self.get_days(request)
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        columns = load_sales_columns(restaurant_id)
+        return Response({
+            "restaurant": restaurant_id,
+            "days": days,
+            "heatmap": order_heatmap(columns, days=days),
+        })
+
+
+class OwnerSalesSummaryAPIView(OwnerAnalyticsMixin, APIView):
+    """
+    Order count, revenue, items sold and average ticket of a restaurant.
+    """
+
+    def get(self, request, restaurant_id):
+        try:
+            days = self.get_days(request)
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        columns = load_sales_columns(restaurant_id)
+        return Response({
+            "restaurant": restaurant_id,
+            "days": days,
+            **sales_summary(columns, days=days),
+        })
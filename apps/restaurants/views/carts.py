@@ -1,8 +1,11 @@
 from rest_framework.generics import CreateAPIView, UpdateAPIView, DestroyAPIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.views import APIView
+from django.db import transaction
+from django.db.models import F
+from django.utils.timezone import now
 from apps.restaurants.models import Cart, CartItem, MenuItem
-from apps.restaurants.serializers import CartSerializer, CartItemSerializer
+from apps.restaurants.serializers import CartSerializer, CartItemSerializer, CartBatchSerializer
 from django.shortcuts import get_object_or_404
 from rest_framework.response import Response
 from rest_framework import status
@@ -44,24 +47,28 @@ class CartItemCreateAPIView(CreateAPIView):
             menu_item = get_object_or_404(MenuItem, id=menu_item_id)
             cart, _ = Cart.objects.get_or_create(user=request.user.profile)
 
-            cart_item, created = CartItem.objects.get_or_create(
-                cart=cart,
-                menu_item=menu_item,
-                defaults={
-                    "quantity": quantity,
-                    "comments": comments,
-                    "price": menu_item.price,
-                },
-            )
-
-            if not created:
-                cart_item.quantity += quantity
-                if comments:
-                    cart_item.comments = comments
-                cart_item.save()
-
-            cart.update_total_price()
-            cart.save()
+            with transaction.atomic():
+                # Lock the cart like the batch endpoint does, so neither can
+                # insert this line while the other is creating it
+                cart = Cart.objects.select_for_update().get(pk=cart.pk)
+                cart_item, created = CartItem.objects.get_or_create(
+                    cart=cart,
+                    menu_item=menu_item,
+                    defaults={
+                        "quantity": quantity,
+                        "comments": comments,
+                        "price": menu_item.price,
+                    },
+                )
+
+                if not created:
+                    changes = {'quantity': F('quantity') + quantity, 'updated_at': now()}
+                    if comments:
+                        changes['comments'] = comments
+                    CartItem.objects.filter(pk=cart_item.pk).update(**changes)
+                    cart_item.refresh_from_db()
+
+                cart.apply_total_delta(cart_item.price * quantity)
 
             return Response(CartItemSerializer(cart_item).data, status=status.HTTP_201_CREATED)
 
@@ -73,18 +80,24 @@ class UpdateCartItemAPIView(UpdateAPIView):
     serializer_class = CartItemSerializer
     permission_classes = [IsAuthenticated]
 
+    def get_queryset(self):
+        # Row lock so the quantity read here is the one the delta applies to
+        return CartItem.objects.select_for_update(of=('self',)).filter(cart__user=self.request.user.profile)
+
     def update(self, request, *args, **kwargs):
         try:
-            cart_item = self.get_object()
-            comments = request.data.get('comments', cart_item.comments)
-            cart_item.comments = comments
-            quantity = int(request.data.get('quantity', cart_item.quantity))
+            with transaction.atomic():
+                cart_item = self.get_object()
+                comments = request.data.get('comments', cart_item.comments)
+                quantity = int(request.data.get('quantity', cart_item.quantity))
+                delta = cart_item.price * (quantity - cart_item.quantity)
 
-            cart_item.quantity = quantity
-            cart_item.save()
+                cart_item.comments = comments
+                cart_item.quantity = quantity
+                cart_item.save(update_fields=['comments', 'quantity', 'updated_at'])
 
-            cart = cart_item.cart
-            cart.update_total_price()
+                cart = cart_item.cart
+                cart.apply_total_delta(delta)
 
             return Response(CartSerializer(cart).data, status=status.HTTP_200_OK)
         except Exception as e:
@@ -95,14 +108,94 @@ class DeleteCartItemAPIView(DestroyAPIView):
     serializer_class = CartItemSerializer
     permission_classes = [IsAuthenticated]
 
+    def get_queryset(self):
+        return CartItem.objects.select_for_update(of=('self',)).filter(cart__user=self.request.user.profile)
+
     def destroy(self, request, *args, **kwargs):
         try:
-            cart_item = self.get_object()
-            cart = get_object_or_404(Cart, cart_items=cart_item)
-            cart.total_price -= cart_item.price * cart_item.quantity
-            cart.save()
-            cart_item.menu_item.save()
-            cart_item.delete()
+            with transaction.atomic():
+                cart_item = self.get_object()
+                cart = cart_item.cart
+                delta = -cart_item.line_total
+                cart_item.delete()
+                cart.apply_total_delta(delta)
             return Response(CartSerializer(cart).data)
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+class CartBatchAPIView(APIView):
+    """
+    Apply a list of add/update/remove operations to the user's cart in one
+    request and one transaction.
+
+    ``add`` increments the line (creating it if needed), ``update`` sets its
+    quantity (0 removes it) and ``remove`` drops it. Menu items are fetched
+    with a single query, lines are written with bulk statements and the cart
+    total is shifted once by the net delta.
+    """
+    serializer_class = CartBatchSerializer
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        serializer = CartBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        operations = serializer.validated_data['operations']
+
+        menu_item_ids = {operation['menu_item'] for operation in operations}
+        menu_items = MenuItem.objects.only('id', 'price').in_bulk(menu_item_ids)
+        missing = sorted(menu_item_ids - menu_items.keys())
+        if missing:
+            return Response({'error': f'Menu items not found: {missing}'}, status=status.HTTP_400_BAD_REQUEST)
+
+        cart, _ = Cart.objects.get_or_create(user=request.user.profile)
+        with transaction.atomic():
+            cart = Cart.objects.select_for_update().get(pk=cart.pk)
+            # Update and delete lock only the line: lock ours too, so none of
+            # their deltas lands between this read and the bulk write
+            lines = {
+                line.menu_item_id: line
+                for line in CartItem.objects.select_for_update().filter(cart=cart, menu_item_id__in=menu_item_ids)
+            }
+            existing = set(lines)
+            delta = 0
+
+            for operation in operations:
+                menu_item_id = operation['menu_item']
+                line = lines.get(menu_item_id)
+                current = line.quantity if line else 0
+
+                if operation['op'] == 'add':
+                    quantity = current + operation['quantity']
+                elif operation['op'] == 'update':
+                    quantity = operation['quantity']
+                else:
+                    quantity = 0
+
+                if line is None:
+                    if not quantity:
+                        continue
+                    line = lines[menu_item_id] = CartItem(
+                        cart=cart, menu_item_id=menu_item_id,
+                        price=menu_items[menu_item_id].price, quantity=0,
+                    )
+                delta += line.price * (quantity - current)
+                line.quantity = quantity
+                if operation.get('comments') is not None:
+                    line.comments = operation['comments']
+
+            removed = [line.pk for line in lines.values() if line.pk and not line.quantity]
+            changed = [line for line in lines.values() if line.pk and line.quantity]
+            created = [line for line in lines.values() if line.menu_item_id not in existing and line.quantity]
+
+            if removed:
+                CartItem.objects.filter(pk__in=removed).delete()
+            if changed:
+                timestamp = now()
+                for line in changed:
+                    line.updated_at = timestamp
+                CartItem.objects.bulk_update(changed, ['quantity', 'comments', 'updated_at'])
+            if created:
+                CartItem.objects.bulk_create(created)
+            cart.apply_total_delta(delta)
+
+        return Response(CartSerializer(cart).data, status=status.HTTP_200_OK)
@@ -1,25 +1,56 @@
 from django.db.models import Q
+from django.http import HttpResponse
+from django.utils.http import parse_etags
+from rest_framework import status
 from rest_framework.decorators import action
 from rest_framework.generics import ListAPIView, RetrieveAPIView, get_object_or_404
 from rest_framework.permissions import AllowAny
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
+from rest_framework.views import APIView
 from rest_framework.viewsets import ModelViewSet
 
-from apps.restaurants.models import Restaurant
+from apps.restaurants.models import Restaurant, MenuItem
 from apps.restaurants.serializers import (
     RestaurantSerializer,
     MenuSerializer,
+    MenuItemSerializer,
     RestaurantImageSerializer
 )
+from apps.restaurants.utils import (
+    get_menu_snapshot_version,
+    get_menu_snapshot_etag,
+    get_menu_snapshot,
+    set_menu_snapshot,
+    search_menu_items,
+)
 from apps.userprofile.permissions import IsSuperAdmin
+from utils.paginations import KeysetPagination
+
+RATING_ORDERING = ('-rating_average', '-id')
+
+
+def wants_rating_order(request):
+    """
+    Whether the client asked for best rated first with ``?ordering=rating``.
+    """
+    return request.query_params.get('ordering') == 'rating'
 
 
 class RestaurantViewSet(ModelViewSet):
     """
     A ViewSet to list, create, retrieve, update, and delete restaurants.
+    The list is newest first, or best rated first with ``?ordering=rating``.
     """
     queryset = Restaurant.objects.all()
     serializer_class = RestaurantSerializer
+    pagination_class = KeysetPagination
+
+    @property
+    def keyset_ordering(self):
+        if wants_rating_order(self.request):
+            return RATING_ORDERING
+        return KeysetPagination.ordering
 
     def get_permissions(self):
         if self.action in ['list', 'retrieve']:
@@ -68,17 +99,40 @@ class RestaurantViewSet(ModelViewSet):
 
 class MenuListView(ListAPIView):
     """
-    View to list all menus for a specific restaurant.
+    View to list all menus for a specific restaurant. Items are listed best
+    rated first with ``?ordering=rating``.
+
+    Responses are served from a pre-rendered snapshot that is versioned per
+    restaurant and dropped whenever its menus, items, ingredients or
+    categories change. The version is exposed as an ETag, so clients that
+    already hold the current menu get a 304 without a body.
     """
     permission_classes = [AllowAny]
     serializer_class = MenuSerializer
 
+    def list(self, request, *args, **kwargs):
+        restaurant_id = self.kwargs.get('restaurant_id')
+        version = get_menu_snapshot_version(restaurant_id)
+        etag = get_menu_snapshot_etag(restaurant_id, version)
+
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+
+        content = get_menu_snapshot(restaurant_id, version, request)
+        if content is None:
+            response = super().list(request, *args, **kwargs)
+            content = JSONRenderer().render(response.data)
+            set_menu_snapshot(restaurant_id, version, request, content)
+
+        return HttpResponse(content, content_type='application/json', headers={'ETag': etag})
+
     def get_queryset(self):
         """
         Returns the queryset of menus filtered by the restaurant ID provided in the URL.
         """
         restaurant_id = self.kwargs.get('restaurant_id')
-        return MenuSerializer.Meta.model.objects.filter(restaurant_id=restaurant_id)
+        item_ordering = RATING_ORDERING if wants_rating_order(self.request) else ('id',)
+        return MenuSerializer.Meta.model.objects.filter(restaurant_id=restaurant_id).with_tree(item_ordering)
 
 class MenuDetailView(RetrieveAPIView):
     """
@@ -86,12 +140,13 @@ class MenuDetailView(RetrieveAPIView):
     """
     permission_classes = [AllowAny]
     serializer_class = MenuSerializer
-    queryset = MenuSerializer.Meta.model.objects.all()
+    queryset = MenuSerializer.Meta.model.objects.with_tree()
     lookup_field = 'id'
 
 class MenuItemListView(ListAPIView):
     """
-    View to list all menu items for a specific menu.
+    View to list all menu items for a specific menu, best rated first with
+    ``?ordering=rating``.
     """
     permission_classes = [AllowAny]
     serializer_class = MenuSerializer
@@ -101,7 +156,8 @@ class MenuItemListView(ListAPIView):
         Returns the queryset of menu items filtered by the menu ID provided in the URL.
         """
         menu_id = self.kwargs.get('menu_id')
-        return MenuSerializer.Meta.model.objects.filter(id=menu_id).prefetch_related('menu_items')
+        item_ordering = RATING_ORDERING if wants_rating_order(self.request) else ('id',)
+        return MenuSerializer.Meta.model.objects.filter(id=menu_id).with_tree(item_ordering)
 
 class MenuItemDetailView(RetrieveAPIView):
     """
@@ -111,3 +167,47 @@ class MenuItemDetailView(RetrieveAPIView):
     serializer_class = MenuSerializer
     queryset = MenuSerializer.Meta.model.objects.all()
     lookup_field = 'id'
+
+class MenuItemSearchView(APIView):
+    """
+    Full-text search over menu item names, categories, ingredients and
+    descriptions, best match first.
+
+    Query params:
+    - q: search text; every word must match (as a prefix)
+    - restaurant: optional restaurant id to search within
+    - n: number of results (default 20, max 50)
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        try:
+            n = max(1, min(int(request.query_params.get("n", "20")), 50))
+        except ValueError:
+            n = 20
+        restaurant_id = request.query_params.get("restaurant")
+        if restaurant_id is not None and not restaurant_id.isdigit():
+            return Response({"error": "Invalid restaurant"}, status=status.HTTP_400_BAD_REQUEST)
+
+        matches = search_menu_items(
+            request.query_params.get("q", ""),
+            restaurant_id=int(restaurant_id) if restaurant_id else None,
+            limit=n,
+        )
+        scores = dict(matches)
+        # Preserve order by search rank
+        order_index = {item_id: idx for idx, (item_id, _) in enumerate(matches)}
+        items = (
+            MenuItem.objects
+            .filter(id__in=scores)
+            .select_related("category")
+            .prefetch_related("ingredients")
+        )
+        items = sorted(items, key=lambda item: order_index[item.id])
+
+        data = [
+            {**MenuItemSerializer(item, context={"request": request}).data,
+             "score": round(scores[item.id], 4)}
+            for item in items
+        ]
+        return Response({"count": len(data), "results": data})
@@ -3,10 +3,18 @@ from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
+from django.db import transaction
+from django.db.models import F, Q
 from django.utils.timezone import now
 
-from apps.restaurants.models import Cart, Orders, OrderItem
-from apps.restaurants.serializers import OrderDetailSerializer, OrderSerializer
+from apps.restaurants.models import ArchivedOrder, Cart, CartItem, Orders, OrderItem
+from apps.restaurants.serializers import (
+    OrderDetailSerializer,
+    OrderSerializer,
+    OrderStatusTransitionSerializer,
+)
+from apps.restaurants.utils import get_order_archive_horizon, transition_orders
+from utils.paginations import DeltaSyncPagination
 
 
 class OrderCheckoutAPIView(APIView):
@@ -19,71 +27,146 @@ class OrderCheckoutAPIView(APIView):
     def post(self, request, *args, **kwargs):
         user_profile = request.user.profile
 
-        try:
-            cart = Cart.objects.get(user=user_profile)
-        except Cart.DoesNotExist:
-            return Response({"detail": "Cart not found."}, status=status.HTTP_404_NOT_FOUND)
-
-        if not cart.cart_items.exists():
-            return Response({"detail": "Cart is empty."}, status=status.HTTP_400_BAD_REQUEST)
-
-        order_type = request.data.get("order_type", "DINE_IN")
-
-        # Base order data
-        order_data = {
-            "user": user_profile,
-            "ordered_date": now(),
-            "order_type": order_type,
-            "ordered": True,
-            "payment_status": "Pending",
-            "total_price": cart.total_price,
-        }
-
-        # Dine-in fields
-        if order_type == "DINE_IN":
-            order_data["table_id"] = request.data.get("table")
-            order_data["waiter_id"] = request.data.get("waiter")
-
-        # Online fields
-        else:
-            order_data["billing_first_name"] = request.data.get("billing_first_name")
-            order_data["billing_last_name"] = request.data.get("billing_last_name")
-            order_data["billing_email"] = request.data.get("billing_email")
-            order_data["billing_phone"] = request.data.get("billing_phone")
-            order_data["billing_address"] = request.data.get("billing_address")
-            order_data["shipping_address"] = request.data.get("shipping_address")
-
-        # Create order
-        order = Orders.objects.create(**order_data)
-
-        # Copy cart items → order items
-        for cart_item in cart.cart_items.all():
-            order_item = OrderItem.objects.create(
-                menu_item=cart_item.menu_item,
-                quantity=cart_item.quantity,
-                comments=cart_item.comments,
-                price=cart_item.price,
-            )
-            order.items.add(order_item)
-
-        order.save()
-
-        # Empty cart
-        cart.cart_items.all().delete()
-        cart.update_total_price()
+        with transaction.atomic():
+            # Lock the cart so concurrent checkouts or cart edits cannot
+            # interleave with copying its lines.
+            try:
+                cart = Cart.objects.select_for_update().get(user=user_profile)
+            except Cart.DoesNotExist:
+                return Response({"detail": "Cart not found."}, status=status.HTTP_404_NOT_FOUND)
+
+            # Lock the lines too: the item endpoints lock only their line
+            cart_items = list(cart.cart_items.select_for_update())
+            if not cart_items:
+                return Response({"detail": "Cart is empty."}, status=status.HTTP_400_BAD_REQUEST)
+
+            order_type = request.data.get("order_type", "DINE_IN")
+
+            # Base order data
+            order_data = {
+                "user": user_profile,
+                "ordered_date": now(),
+                "order_type": order_type,
+                "ordered": True,
+                "payment_status": "Pending",
+                "total_price": cart.total_price,
+            }
+
+            # Dine-in fields
+            if order_type == "DINE_IN":
+                order_data["table_id"] = request.data.get("table")
+                order_data["waiter_id"] = request.data.get("waiter")
+
+            # Online fields
+            else:
+                order_data["billing_first_name"] = request.data.get("billing_first_name")
+                order_data["billing_last_name"] = request.data.get("billing_last_name")
+                order_data["billing_email"] = request.data.get("billing_email")
+                order_data["billing_phone"] = request.data.get("billing_phone")
+                order_data["billing_address"] = request.data.get("billing_address")
+                order_data["shipping_address"] = request.data.get("shipping_address")
+
+            # Create order
+            order = Orders.objects.create(**order_data)
+
+            # Copy cart items → order items in one INSERT
+            OrderItem.objects.bulk_create([
+                OrderItem(
+                    order=order,
+                    menu_item_id=cart_item.menu_item_id,
+                    quantity=cart_item.quantity,
+                    comments=cart_item.comments,
+                    price=cart_item.price,
+                )
+                for cart_item in cart_items
+            ])
+
+            # Take out what was copied; a line added meanwhile stays with its delta
+            CartItem.objects.filter(pk__in=[cart_item.pk for cart_item in cart_items]).delete()
+            Cart.objects.filter(pk=cart.pk).update(total_price=F("total_price") - cart.total_price)
 
         return Response(OrderDetailSerializer(order).data, status=status.HTTP_201_CREATED)
 
 class WaiterOrderListAPIView(ListAPIView):
+    """
+    Orders assigned to the current waiter. Clients should load this once and
+    follow the ``ws/orders/`` feed, or poll with ``?since=<cursor>`` to get
+    only the orders that changed.
+    """
     serializer_class = OrderSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = DeltaSyncPagination
 
     def get_queryset(self):
-        return Orders.objects.filter(waiter=self.request.user.profile).order_by("-created_at")
+        return Orders.objects.filter(waiter=self.request.user.profile).prefetch_related("order_items")
+
+    def get_archive_queryset(self):
+        return ArchivedOrder.objects.filter(waiter=self.request.user.profile).prefetch_related("order_items")
+
+    def get_archive_horizon(self):
+        return get_order_archive_horizon()
 
 class UserOrderHistoryAPIView(ListAPIView):
+    """
+    The current user's orders, newest first. Older pages continue into the
+    order archive. ``?since=<cursor>`` returns only the live orders created
+    or changed after the cursor.
+    """
     serializer_class = OrderSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = DeltaSyncPagination
 
     def get_queryset(self):
-        return Orders.objects.filter(user=self.request.user.profile).order_by("-created_at")
+        return Orders.objects.filter(user=self.request.user.profile).prefetch_related("order_items")
+
+    def get_archive_queryset(self):
+        return ArchivedOrder.objects.filter(user=self.request.user.profile).prefetch_related("order_items")
+
+    def get_archive_horizon(self):
+        return get_order_archive_horizon()
+
+
+class OrderStatusTransitionAPIView(APIView):
+    """
+    Move a batch of orders to a new status, e.g. a kitchen marking dozens of
+    tickets as SERVING. Orders that cannot make the move, or that the user
+    does not work on, are reported back and left unchanged.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        user = self.request.user
+        if user.user_type == 'super_admin':
+            return Orders.objects.all()
+
+        profile = user.profile
+        restaurant_ids = set(profile.owned_restaurants.values_list('id', flat=True))
+        if profile.restaurant_id:
+            restaurant_ids.add(profile.restaurant_id)
+        return Orders.objects.filter(
+            Q(waiter=profile)
+            | Q(table__restaurant_id__in=restaurant_ids)
+            | Q(order_items__menu_item__menu__restaurant_id__in=restaurant_ids)
+        )
+
+    def post(self, request, *args, **kwargs):
+        if request.user.user_type == 'user':
+            return Response({'error': 'Only restaurant staff can change order status.'},
+                            status=status.HTTP_403_FORBIDDEN)
+
+        serializer = OrderStatusTransitionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        to_status = serializer.validated_data['order_status']
+
+        result = transition_orders(
+            serializer.validated_data['orders'], to_status,
+            actor=request.user.profile, queryset=self.get_queryset(),
+        )
+        return Response({
+            'order_status': to_status,
+            'updated': result['updated'],
+            'rejected': [
+                {'id': order_id, 'error': reason}
+                for order_id, reason in sorted(result['rejected'].items())
+            ],
+        })
@@ -1,14 +1,18 @@
+from django.db import transaction
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
 from apps.restaurants.serializers import ReviewSerializer, CreateReviewSerializer
 from apps.restaurants.models import Review
+from apps.restaurants.utils import apply_review_rating
+from utils.paginations import KeysetPagination
 
 
 class ReviewViewSet(ModelViewSet):
     queryset = Review.objects.all().select_related('user', 'order')
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
 
     def get_serializer_class(self):
         if self.action in ['create', 'update', 'partial_update']:
@@ -18,6 +22,11 @@ class ReviewViewSet(ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(user=self.request.user.profile)
 
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            apply_review_rating(instance.order_id, removed=instance.rate)
+            instance.delete()
+
     def get_queryset(self):
         user = self.request.user
         if user.is_staff:
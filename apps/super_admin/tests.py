@@ -1,3 +1,133 @@
+import csv
+import gzip
+import io
+import json
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from apps.restaurants.models import ArchivedOrder, ArchivedOrderItem, DailySalesRollup, Menu, MenuItem, OrderItem, Orders, Restaurant
+from apps.userprofile.models import UserProfile
+
+User = get_user_model()
+
+
+class OverviewMetricsAPITestCase(TestCase):
+    def setUp(self):
+        admin = User.objects.create_superuser(email='admin@example.com', username='admin', password='x')
+        self.client = APIClient()
+        self.client.force_authenticate(user=admin)
+        self.url = reverse('superadmin-overview')
+
+        self.cafe = Restaurant.objects.create(name='Cafe Blue')
+        spice = Restaurant.objects.create(name='Spice Corner')
+        today = timezone.localdate()
+        DailySalesRollup.objects.bulk_create([
+            DailySalesRollup(restaurant=self.cafe, day=today, order_count=3, revenue=Decimal('30.00'), items_sold=5),
+            DailySalesRollup(restaurant=spice, day=today, order_count=1, revenue=Decimal('14.00'), items_sold=2),
+            DailySalesRollup(restaurant=self.cafe, day=today - timedelta(days=2), order_count=7,
+                             revenue=Decimal('70.00'), items_sold=9),
+            DailySalesRollup(restaurant=self.cafe, day=today - timedelta(days=30), order_count=50,
+                             revenue=Decimal('500.00'), items_sold=80),
+        ])
+
+        profile = UserProfile.objects.create(user=admin, first_name='Admin', last_name='User')
+        menu_item = MenuItem.objects.create(menu=Menu.objects.create(restaurant=self.cafe, name='Menu'),
+                                            name='Latte', price=Decimal('4.00'))
+        self.order = Orders.objects.create(user=profile, total_price=Decimal('8.00'))
+        OrderItem.objects.create(order=self.order, menu_item=menu_item, quantity=2, price=Decimal('4.00'))
+
+    def test_overview_is_served_from_rollups(self):
+        # restaurants count, users count, rollups, latest restaurants,
+        # recent orders and their restaurants
+        with self.assertNumQueries(6):
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['total_restaurants'], 2)
+        self.assertEqual(response.data['total_orders_today'], 4)
+        self.assertEqual(response.data['revenue_today'], Decimal('44.00'))
+        self.assertEqual(response.data['average_ticket_today'], Decimal('11.00'))
+        self.assertEqual(response.data['orders_trend']['data'], [0, 0, 0, 0, 7, 0, 4])
+        self.assertEqual(response.data['latest_restaurants'][0]['name'], 'Spice Corner')
+        self.assertEqual(
+            response.data['recent_orders'],
+            [{'id': self.order.id, 'restaurant': 'Cafe Blue', 'total': Decimal('8.00')}],
+        )
+
+    def test_requires_super_admin(self):
+        self.client.force_authenticate(user=None)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class OrderExportAPITestCase(TestCase):
+    def setUp(self):
+        admin = User.objects.create_superuser(email='admin@example.com', username='admin', password='x')
+        self.client = APIClient()
+        self.client.force_authenticate(user=admin)
+        self.url = reverse('superadmin-order-export')
+
+        profile = UserProfile.objects.create(user=admin, first_name='Admin', last_name='User')
+        menu = Menu.objects.create(restaurant=Restaurant.objects.create(name='Cafe Blue'), name='Menu')
+        self.latte = MenuItem.objects.create(menu=menu, name='Latte', price=Decimal('4.00'))
+        self.muffin = MenuItem.objects.create(menu=menu, name='Muffin', price=Decimal('3.00'))
+
+        now = timezone.now()
+        self.old = ArchivedOrder.objects.create(
+            id=1000, user=profile, order_type='DINE_IN', order_status='COMPLETED',
+            total_price=Decimal('4.00'), payment_status='Confirmed',
+            created_at=now - timedelta(days=100), updated_at=now - timedelta(days=100),
+        )
+        ArchivedOrderItem.objects.create(id=1000, order=self.old, menu_item=self.latte, quantity=1,
+                                         price=Decimal('4.00'), created_at=self.old.created_at,
+                                         updated_at=self.old.created_at)
+        self.order = Orders.objects.create(user=profile, total_price=Decimal('11.00'))
+        OrderItem.objects.bulk_create([
+            OrderItem(order=self.order, menu_item=self.latte, quantity=2, price=Decimal('4.00')),
+            OrderItem(order=self.order, menu_item=self.muffin, quantity=1, price=Decimal('3.00')),
+        ])
+
+    def content(self, response):
+        return b''.join(response.streaming_content)
+
+    def test_csv_has_one_row_per_item_oldest_first(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+
+        rows = list(csv.DictReader(io.StringIO(self.content(response).decode())))
+        self.assertEqual(
+            [(row['id'], row['archived'], row['item_menu_item_id'], row['item_quantity']) for row in rows],
+            [
+                ('1000', 'True', str(self.latte.id), '1'),
+                (str(self.order.id), 'False', str(self.latte.id), '2'),
+                (str(self.order.id), 'False', str(self.muffin.id), '1'),
+            ],
+        )
+
+    def test_ndjson_date_range_and_gzip(self):
+        today = timezone.localdate()
+        response = self.client.get(self.url, {'output': 'ndjson', 'start': str(today), 'gzip': 'true'})
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        self.assertTrue(response['Content-Disposition'].endswith('.ndjson.gz"'))
+
+        lines = gzip.decompress(self.content(response)).decode().splitlines()
+        self.assertEqual(len(lines), 1)
+        record = json.loads(lines[0])
+        self.assertEqual(record['id'], self.order.id)
+        self.assertEqual(record['total_price'], '11.00')
+        self.assertEqual([item['menu_item_id'] for item in record['items']], [self.latte.id, self.muffin.id])
+
+    def test_rejects_bad_range_and_non_admins(self):
+        response = self.client.get(self.url, {'start': '2025-02-01', 'end': '2025-01-01'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
-# Create your tests here.
+        self.client.force_authenticate(user=None)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_401_UNAUTHORIZED)
@@ -1,6 +1,7 @@
 from django.urls import path
-from .views import OverviewMetricsAPIView
+from .views import OverviewMetricsAPIView, OrderExportAPIView
 
 urlpatterns = [
     path('overview/', OverviewMetricsAPIView.as_view(), name='superadmin-overview'),
+    path('orders/export/', OrderExportAPIView.as_view(), name='superadmin-order-export'),
 ]
@@ -1,30 +1,106 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db.models import Sum
+from django.http import StreamingHttpResponse
+from django.utils import timezone
 from rest_framework.views import APIView
 from rest_framework.response import Response
 
+from apps.restaurants.models import DailySalesRollup, OrderItem, Orders, Restaurant
+from apps.restaurants.serializers import OrderExportSerializer
+from apps.restaurants.utils import stream_order_export
 from apps.userprofile.permissions import IsSuperAdmin
 
+TREND_DAYS = 7
+LATEST_LIMIT = 5
+
 
 class OverviewMetricsAPIView(APIView):
+    """
+    Platform overview for the super admin dashboard. Order totals and the
+    trend come from the daily sales rollups, so the cost does not grow with
+    the number of orders.
+    """
     permission_classes = [IsSuperAdmin]
 
     def get(self, request):
-        # Replace with real queries
+        today = timezone.localdate()
+        first_day = today - timedelta(days=TREND_DAYS - 1)
+
+        per_day = {
+            row['day']: row
+            for row in DailySalesRollup.objects
+            .filter(day__gte=first_day, day__lte=today)
+            .values('day')
+            .annotate(orders=Sum('order_count'), revenue=Sum('revenue'))
+        }
+        days = [first_day + timedelta(days=offset) for offset in range(TREND_DAYS)]
+        totals_today = per_day.get(today, {'orders': 0, 'revenue': 0})
+
         data = {
-            "total_restaurants": 16,
-            "total_orders_today": 321,
-            "revenue_today": 1251,
-            "active_users": 541,
+            "total_restaurants": Restaurant.objects.count(),
+            "total_orders_today": totals_today['orders'],
+            "revenue_today": totals_today['revenue'],
+            "average_ticket_today": (
+                totals_today['revenue'] / totals_today['orders'] if totals_today['orders'] else 0
+            ),
+            "active_users": get_user_model().objects.filter(is_active=True).count(),
             "orders_trend": {
-                "labels": ["Mon","Tue","Wed","Thu","Fri","Sat","Sun"],
-                "data": [121,151,181,201,221,301,321]
+                "labels": [day.strftime('%a') for day in days],
+                "data": [per_day.get(day, {}).get('orders', 0) for day in days],
             },
             "latest_restaurants": [
-                {"id": 1, "name": "Cafe Blue", "plan": "Pro", "created": "2025-09-01"},
-                {"id": 2, "name": "Spice Corner", "plan": "Starter", "created": "2025-09-03"},
+                {"id": restaurant['id'], "name": restaurant['name'], "created": restaurant['created_at'].date()}
+                for restaurant in Restaurant.objects.order_by('-created_at', '-id')
+                .values('id', 'name', 'created_at')[:LATEST_LIMIT]
             ],
-            "recent_orders": [
-                {"id": 1024, "restaurant": "Cafe Blue", "total": 25.99},
-                {"id": 1023, "restaurant": "Spice Corner", "total": 15.50},
-            ]
+            "recent_orders": self.recent_orders(),
         }
         return Response(data)
+
+    def recent_orders(self):
+        # Ids grow with creation time, so this walks the primary key
+        orders = list(Orders.objects.order_by('-id').values('id', 'total_price')[:LATEST_LIMIT])
+        names = {}
+        for order_id, name in (
+            OrderItem.objects
+            .filter(order_id__in=[order['id'] for order in orders])
+            .values_list('order_id', 'menu_item__menu__restaurant__name')
+            .distinct()
+        ):
+            names.setdefault(order_id, name)
+        return [
+            {"id": order['id'], "restaurant": names.get(order['id']), "total": order['total_price']}
+            for order in orders
+        ]
+
+
+class OrderExportAPIView(APIView):
+    """
+    Stream live and archived orders with their line items as CSV or NDJSON.
+
+    Query parameters: ``start`` and ``end`` (YYYY-MM-DD, inclusive),
+    ``output`` (csv or ndjson) and ``gzip`` (true to compress). Rows are
+    read with server-side cursors and sent as they are encoded, so large
+    ranges export in constant memory.
+    """
+    permission_classes = [IsSuperAdmin]
+
+    def get(self, request):
+        serializer = OrderExportSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+
+        filename = f"orders-{params.get('start') or 'all'}-{params.get('end') or timezone.localdate()}.{params['output']}"
+        content_type = "text/csv" if params['output'] == "csv" else "application/x-ndjson"
+        if params['gzip']:
+            filename += ".gz"
+            content_type = "application/gzip"
+
+        response = StreamingHttpResponse(
+            stream_order_export(params['output'], params.get('start'), params.get('end'), params['gzip']),
+            content_type=content_type,
+        )
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
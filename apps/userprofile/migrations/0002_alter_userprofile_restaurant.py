@@ -0,0 +1,26 @@
+# Generated by Django 5.0.14 on 2026-10-18 19:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("restaurants", "0004_keyset_pagination_indexes"),
+        ("userprofile", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="userprofile",
+            name="restaurant",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="waiters",
+                to="restaurants.restaurant",
+            ),
+        ),
+    ]
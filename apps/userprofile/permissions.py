@@ -44,4 +44,22 @@ class IsSuperAdminOrRestaurantOwner(BasePermission):
         return False
 
     def has_permission(self, request, view):
-        return request.user.is_authenticated
\ No newline at end of file
+        return request.user.is_authenticated
+
+class IsRestaurantOwner(BasePermission):
+    """
+    super_admin, or a restaurant_owner who owns the restaurant in the
+    ``restaurant_id`` url kwarg.
+    """
+
+    def has_permission(self, request, view):
+        user = request.user
+        if not user.is_authenticated:
+            return False
+        if user.user_type == "super_admin":
+            return True
+        return (
+            user.user_type == "restaurant_owner"
+            and hasattr(user, "profile")
+            and user.profile.owned_restaurants.filter(pk=view.kwargs.get("restaurant_id")).exists()
+        )
@@ -7,3 +7,7 @@ from .restframework import *
 from .corsheader import *
 from .environment import *
 from .file_storage import *
+from .cache import *
+from .channels import *
+from .orders import *
+from .analytics import *
@@ -0,0 +1,46 @@
+import os
+
+from .environment import env, BASE_DIR
+
+
+# Columnar sales data for owner analytics, one directory per restaurant.
+ANALYTICS_DATA_DIR = env("ANALYTICS_DATA_DIR", default=os.path.join(BASE_DIR, "data", "analytics"))
+# Refreshes (`manage.py refresh_owner_analytics`) read this many order item
+# ids below the last one seen again, so items that committed late are kept.
+ANALYTICS_RESCAN_LINES = env.int("ANALYTICS_RESCAN_LINES", default=1000)
+
+# Neighbours kept per menu item by `manage.py build_item_recommendations`.
+RECOMMENDATION_TOP_K = env.int("RECOMMENDATION_TOP_K", default=20)
+# Larger orders (catering, parties) say little about what goes together and
+# cost quadratically many pairs, so they are left out.
+RECOMMENDATION_MAX_ORDER_SIZE = env.int("RECOMMENDATION_MAX_ORDER_SIZE", default=30)
+
+# Implicit ALS for personal dish recommendations,
+# see `manage.py build_personal_recommendations`.
+PERSONAL_RECOMMENDATION_FACTORS = env.int("PERSONAL_RECOMMENDATION_FACTORS", default=32)
+PERSONAL_RECOMMENDATION_ITERATIONS = env.int("PERSONAL_RECOMMENDATION_ITERATIONS", default=10)
+PERSONAL_RECOMMENDATION_REGULARIZATION = env.float("PERSONAL_RECOMMENDATION_REGULARIZATION", default=0.1)
+PERSONAL_RECOMMENDATION_ALPHA = env.float("PERSONAL_RECOMMENDATION_ALPHA", default=10.0)
+
+# Analyzer outputs (restaurant ratings), written by
+# `manage.py compute_restaurant_ratings` unless pointed at an external analyzer.
+ANALYZER_DIR = env("ANALYZER_DIR", default=os.path.join(BASE_DIR, "data", "analyzer"))
+# Parsed copies of the analyzer outputs shared by all workers, and how
+# often (seconds) a worker checks whether the outputs changed.
+ANALYZER_CACHE_DIR = env("ANALYZER_CACHE_DIR", default=os.path.join(BASE_DIR, "data", "analyzer", "cache"))
+ANALYZER_CHECK_INTERVAL = env.float("ANALYZER_CHECK_INTERVAL", default=5.0)
+
+# Bayesian smoothing of restaurant ratings: a restaurant's average is
+# pulled towards the global mean as if it had this many extra reviews.
+RATING_PRIOR_WEIGHT = env.float("RATING_PRIOR_WEIGHT", default=10.0)
+# Incremental rating runs read again this many review ids below the last
+# one seen, so reviews whose transaction committed late are not skipped.
+RATING_RESCAN_IDS = env.int("RATING_RESCAN_IDS", default=1000)
+
+# Trending dishes: order counts decay with this half-life, scores are rebased
+# onto a new landmark every TRENDING_LANDMARK_HOURS, and
+# `manage.py materialize_trending_items` keeps this many items per
+# restaurant and per city.
+TRENDING_HALF_LIFE_HOURS = env.float("TRENDING_HALF_LIFE_HOURS", default=6.0)
+TRENDING_LANDMARK_HOURS = env.int("TRENDING_LANDMARK_HOURS", default=24)
+TRENDING_TOP_K = env.int("TRENDING_TOP_K", default=20)
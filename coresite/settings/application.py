@@ -21,4 +21,5 @@ THIRD_PARTY_APPLICATIONS = [
     'corsheaders',
     'drf_yasg',
     'rest_framework',
+    'channels',
 ]
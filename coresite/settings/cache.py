@@ -0,0 +1,28 @@
+from .environment import env
+
+
+REDIS_HOST = env("REDIS_HOST", default="")
+REDIS_PORT = env("REDIS_PORT", default="") or "6379"
+
+if REDIS_HOST:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': f"redis://{REDIS_HOST}:{REDIS_PORT}/1",
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'restaurant-backend',
+        }
+    }
+
+# How long a rendered menu snapshot is kept once nothing reads it anymore.
+MENU_SNAPSHOT_TIMEOUT = env.int("MENU_SNAPSHOT_TIMEOUT", default=60 * 60 * 24)
+
+# How long a rendered top restaurant suggestions response is kept. Ratings and
+# restaurant changes replace it right away; this bounds staleness for the rest
+# (e.g. renamed owner accounts).
+TOP_SUGGESTIONS_TIMEOUT = env.int("TOP_SUGGESTIONS_TIMEOUT", default=60 * 60)
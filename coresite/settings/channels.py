@@ -0,0 +1,21 @@
+from .cache import REDIS_HOST, REDIS_PORT
+
+
+ASGI_APPLICATION = 'coresite.asgi.application'
+
+if REDIS_HOST:
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels_redis.core.RedisChannelLayer',
+            'CONFIG': {
+                'hosts': [(REDIS_HOST, int(REDIS_PORT))],
+            },
+        }
+    }
+else:
+    # Single-process only; fine for local development and tests.
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels.layers.InMemoryChannelLayer',
+        }
+    }
@@ -0,0 +1,10 @@
+from .environment import env
+
+
+# Completed orders older than this are moved to the archive tables by
+# `manage.py archive_orders`.
+ORDER_ARCHIVE_AFTER_DAYS = env.int("ORDER_ARCHIVE_AFTER_DAYS", default=90)
+ORDER_ARCHIVE_BATCH_SIZE = env.int("ORDER_ARCHIVE_BATCH_SIZE", default=500)
+# Seconds a worker trusts its cached archive horizon before reading it from
+# the archive again; bounds how long a per-process cache can lag a run.
+ORDER_ARCHIVE_HORIZON_TIMEOUT = env.int("ORDER_ARCHIVE_HORIZON_TIMEOUT", default=5 * 60)
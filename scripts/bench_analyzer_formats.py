@@ -0,0 +1,119 @@
+"""
+Compare loading analyzer outputs from CSV (the old csv.DictReader path)
+with the memory-mapped .npy format used by apps/restaurants/ai/utils.py.
+
+    python scripts/bench_analyzer_formats.py --rows 100000
+
+Each variant runs in a fresh interpreter and reports the time to load and
+answer a top-10 query plus 1,000 id lookups, and the RSS it added while
+the data is held.
+"""
+import argparse
+import csv
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+base_dir = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(base_dir))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "coresite.settings")
+
+COLUMNS = ["id", "name", "address", "city", "phone", "cuisine", "price_range", "opening_hours"]
+
+
+def rss_kb():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+
+def write_inputs(directory, rows):
+    rng = random.Random(0)
+    with open(directory / "restaurant_ratings.csv", "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["restaurant_id", "avg_rating"])
+        for rid in range(1, rows + 1):
+            writer.writerow([rid, round(rng.uniform(1, 5), 3)])
+    with open(directory / "restaurants_cleaned.csv", "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(COLUMNS)
+        for rid in range(1, rows + 1):
+            writer.writerow([rid, f"Restaurant {rid}", f"{rid} Main Boulevard, Block {rid % 40}",
+                             rng.choice(["Lahore", "Karachi", "Islamabad"]), f"+92300{rid:07d}",
+                             rng.choice(["Desi", "BBQ", "Chinese", "Fast food"]), "$$",
+                             "Mon-Sun 11:00-23:00"])
+
+
+def run_csv(directory, lookups):
+    ratings = []
+    with open(directory / "restaurant_ratings.csv", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            ratings.append((int(row["restaurant_id"]), float(row["avg_rating"])))
+    ratings.sort(key=lambda x: x[1], reverse=True)
+    by_id = {}
+    with open(directory / "restaurants_cleaned.csv", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            by_id[int(row["id"])] = row
+    top = [rid for rid, _ in ratings[:10]]
+    scores = dict(ratings)
+    return (ratings, scores, by_id), top, [(scores.get(rid), by_id.get(rid)) for rid in lookups]
+
+
+def run_binary(directory, lookups):
+    from apps.restaurants.ai.utils import RestaurantRatings, RestaurantTable  # imported by child()
+
+    ratings = RestaurantRatings.open(directory / "ratings")
+    by_id = RestaurantTable.open(directory / "restaurants")
+    top = ratings.top_ids(10)
+    return (ratings, by_id), top, [(ratings.get(rid), by_id.get(rid)) for rid in lookups]
+
+
+def child(variant, directory, rows):
+    # Import costs are not part of the comparison
+    import apps.restaurants.ai.utils  # noqa: F401
+
+    lookups = random.Random(1).sample(range(1, rows + 1), 1000)
+    before = rss_kb()
+    started = time.perf_counter()
+    # Keep the loaded data alive while measuring, as a worker would
+    loaded = (run_csv if variant == "csv" else run_binary)(Path(directory), lookups)
+    elapsed = time.perf_counter() - started
+    print(f"{variant:>6}: {elapsed * 1000:8.1f} ms  +{(rss_kb() - before) / 1024:7.1f} MB RSS")
+    del loaded
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--variant", choices=["csv", "binary"])
+    parser.add_argument("--directory")
+    args = parser.parse_args()
+
+    if args.variant:
+        child(args.variant, args.directory, args.rows)
+        return
+
+    from apps.restaurants.ai.utils import RestaurantRatings, RestaurantTable
+
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+        write_inputs(directory, args.rows)
+        for name, table_class, source in (("ratings", RestaurantRatings, "restaurant_ratings.csv"),
+                                          ("restaurants", RestaurantTable, "restaurants_cleaned.csv")):
+            (directory / name).mkdir()
+            table_class.from_csv(directory / source).save(directory / name)
+
+        print(f"{args.rows} restaurants")
+        for variant in ("csv", "binary"):
+            subprocess.run([sys.executable, __file__, "--variant", variant, "--directory", tmp,
+                            "--rows", str(args.rows)], check=True)
+
+
+if __name__ == "__main__":
+    main()
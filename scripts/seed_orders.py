@@ -20,39 +20,20 @@ from apps.userprofile.models import UserProfile
 
 def process_menu_item(menu_item, user, min_orders, max_orders, created_at):
     """Process seeding orders for a single menu item."""
-    orders_buffer = []
-    order_items_buffer = []
-
     num_orders = random.randint(min_orders, max_orders)
-    for _ in range(num_orders):
-        quantity = random.randint(1, 5)
-        price = menu_item.price * quantity
-
-        oi = OrderItem(
-            menu_item=menu_item,
-            quantity=quantity,
-            price=price,
-            created_at=created_at,
-            updated_at=created_at,
-        )
-        order_items_buffer.append(oi)
+    quantities = [random.randint(1, 5) for _ in range(num_orders)]
 
     with transaction.atomic():
-        # bulk create order items
-        OrderItem.objects.bulk_create(order_items_buffer, batch_size=1000)
-        order_items = OrderItem.objects.filter(menu_item=menu_item).order_by("-id")[:num_orders]
-
-        new_orders = []
-        for oi in order_items:
-            o = Orders(
+        new_orders = Orders.objects.bulk_create([
+            Orders(
                 user=user,
                 ordered_date=created_at,
-                total_price=oi.price,
+                # One line per order: the total is its unit price * quantity
+                total_price=menu_item.price * quantity,
                 billing_first_name="Test",
                 billing_last_name="User",
                 billing_email="test@example.com",
                 billing_phone="+1234567890",
-                phone="+1234567890",
                 ordered=True,
                 payment_status="Confirmed",
                 billing_address="123 Test St",
@@ -60,14 +41,22 @@ def process_menu_item(menu_item, user, min_orders, max_orders, created_at):
                 created_at=created_at,
                 updated_at=created_at,
             )
-            new_orders.append(o)
-
-        Orders.objects.bulk_create(new_orders, batch_size=1000)
-
-        # add M2M relationship
-        fresh_orders = Orders.objects.order_by("-id")[:num_orders]
-        for idx, order in enumerate(fresh_orders):
-            order.items.add(order_items[idx])
+            for quantity in quantities
+        ], batch_size=1000)
+
+        # bulk_create returns the new primary keys, so each item is linked
+        # to its own order directly
+        OrderItem.objects.bulk_create([
+            OrderItem(
+                order=order,
+                menu_item=menu_item,
+                quantity=quantity,
+                price=menu_item.price,
+                created_at=created_at,
+                updated_at=created_at,
+            )
+            for order, quantity in zip(new_orders, quantities)
+        ], batch_size=1000)
 
     return f"✅ Created {num_orders} orders for {menu_item.name}"
 
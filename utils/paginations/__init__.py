@@ -1,2 +1,4 @@
 from .pagination import OurLimitOffsetPagination
 from .pagination import NotificationOurLimitOffsetPagination
+from .pagination import KeysetPagination
+from .pagination import DeltaSyncPagination
@@ -1,4 +1,13 @@
-from rest_framework.pagination import LimitOffsetPagination
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
 
 class OurLimitOffsetPagination(LimitOffsetPagination):
@@ -7,9 +16,234 @@ class OurLimitOffsetPagination(LimitOffsetPagination):
     offset_query_param = 'offset'
     max_limit = 100
 
-    
+
 class NotificationOurLimitOffsetPagination(LimitOffsetPagination):
     default_limit = 20
     limit_query_param = 'limit'
     offset_query_param = 'offset'
-    max_limit = 30
\ No newline at end of file
+    max_limit = 30
+
+
+def encode_keyset_cursor(value, pk, reverse=False, seen=None):
+    """
+    Encode a (value, pk) keyset position into an opaque url-safe token.
+    ``seen`` is an optional list of (pk, version) pairs carried along, see
+    DeltaSyncPagination.
+    """
+    if hasattr(value, 'isoformat'):
+        value = value.isoformat()
+    elif value is not None:
+        value = str(value)
+    payload = {'v': value, 'pk': pk, 'r': int(reverse)}
+    if seen:
+        payload['s'] = seen
+    payload = json.dumps(payload, separators=(',', ':'))
+    return urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_keyset_cursor(encoded, field, with_seen=False):
+    """
+    Decode a token made by encode_keyset_cursor. ``field`` is the model field
+    the value belongs to and is used to parse it back. With ``with_seen``
+    the set of (pk, version) pairs is returned as a fourth item.
+    Raises ValueError for malformed tokens.
+    """
+    try:
+        padded = encoded + '=' * (-len(encoded) % 4)
+        payload = json.loads(urlsafe_b64decode(padded.encode('ascii')))
+        cursor = field.to_python(payload['v']), int(payload['pk']), bool(payload.get('r'))
+        if with_seen:
+            cursor += ({(int(pk), int(version)) for pk, version in payload.get('s', ())},)
+        return cursor
+    except (TypeError, KeyError, ValueError, ValidationError) as exc:
+        raise ValueError('Invalid keyset cursor') from exc
+
+
+def keyset_after(field_name, value, pk, descending):
+    """
+    Filter for rows strictly after (value, pk) in the given direction.
+
+    The redundant ``<=``/``>=`` bound lets the database seek straight to the
+    position on an index over (field, id) instead of walking it from the
+    start, so every page costs the same.
+    """
+    op = 'lt' if descending else 'gt'
+    return Q(**{f'{field_name}__{op}e': value}) & (
+        Q(**{f'{field_name}__{op}': value}) | Q(**{f'pk__{op}': pk})
+    )
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor pagination keyed on a (field, id) pair, newest first by default.
+
+    Unlike page number pagination there is no COUNT(*) and no OFFSET: every
+    page is a single index range scan starting at the cursor position, so
+    page 10,000 is as cheap as page 1. Views may override the ordering with a
+    ``keyset_ordering`` attribute, e.g. ``('-rating_average', '-id')``.
+
+    Views whose rows are partly moved to an archive table can define
+    ``get_archive_queryset()`` (and optionally ``get_archive_horizon()``,
+    the newest archived value of the ordering field). Pages that reach past
+    the horizon are merged from both tables with the same cursor.
+    """
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('-created_at', '-id')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        ordering = getattr(view, 'keyset_ordering', self.ordering)
+        self.field_name = ordering[0].lstrip('-')
+        field = queryset.model._meta.get_field(self.field_name)
+
+        encoded = request.query_params.get(self.cursor_query_param)
+        cursor = None
+        if encoded:
+            try:
+                cursor = decode_keyset_cursor(encoded, field)
+            except ValueError:
+                raise NotFound(self.invalid_cursor_message)
+
+        reverse = bool(cursor and cursor[2])
+        descending = ordering[0].startswith('-') != reverse
+        results = self._fetch(queryset, cursor, descending)
+
+        archive = getattr(view, 'get_archive_queryset', None)
+        if archive is not None and self._reaches_archive(view, results, cursor, descending):
+            archived = self._fetch(archive(), cursor, descending)
+            results = sorted(
+                results + archived,
+                key=lambda row: (getattr(row, self.field_name), row.pk),
+                reverse=descending,
+            )[:self.page_size + 1]
+
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if reverse:
+            results.reverse()
+
+        self.has_next = has_more if not reverse else cursor is not None
+        self.has_previous = has_more if reverse else cursor is not None
+        self.page = results
+        return results
+
+    def _fetch(self, queryset, cursor, descending):
+        prefix = '-' if descending else ''
+        queryset = queryset.order_by(f'{prefix}{self.field_name}', f'{prefix}pk')
+        if cursor is not None:
+            queryset = queryset.filter(keyset_after(self.field_name, cursor[0], cursor[1], descending))
+        return list(queryset[:self.page_size + 1])
+
+    def _reaches_archive(self, view, results, cursor, descending):
+        """
+        Whether the page may contain archived rows, i.e. it extends past the
+        newest archived value reported by ``view.get_archive_horizon()``.
+        """
+        if not hasattr(view, 'get_archive_horizon'):
+            return True
+        horizon = view.get_archive_horizon()
+        if horizon is None:
+            # Nothing archived yet
+            return False
+        if descending:
+            return len(results) <= self.page_size or getattr(results[-1], self.field_name) <= horizon
+        return cursor is None or cursor[0] <= horizon
+
+    def _link_for(self, instance, reverse):
+        token = encode_keyset_cursor(getattr(instance, self.field_name), instance.pk, reverse)
+        return replace_query_param(self.base_url, self.cursor_query_param, token)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self._link_for(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self._link_for(self.page[0], reverse=True)
+
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+class DeltaSyncPagination(KeysetPagination):
+    """
+    KeysetPagination with an incremental sync mode.
+
+    ``?since=<cursor>`` returns only rows created or changed after the
+    cursor, oldest change first, together with a fresh ``since`` cursor and
+    a ``has_more`` flag; ``?since=`` (empty) starts from the beginning.
+    Without ``since`` this behaves exactly like KeysetPagination.
+
+    The cursor is an (updated_at, id) position. ``updated_at`` is set
+    before a transaction commits, so a row can become visible behind a
+    cursor a client already holds. Every sync therefore reads
+    ``safety_window`` behind the cursor again; the cursor lists the
+    (id, updated_at) pairs it delivered inside that window, and only those
+    are skipped. A client that stores the cursor still never downloads an
+    unchanged row twice.
+
+    Writes that bypass ``save()`` (``QuerySet.update``) must set
+    ``updated_at`` themselves or they will not be picked up.
+    """
+    since_query_param = 'since'
+    sync_field = 'updated_at'
+    safety_window = timedelta(minutes=1)
+
+    def _version(self, row):
+        return (getattr(row, self.sync_field) - _EPOCH) // timedelta(microseconds=1)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.delta_sync = self.since_query_param in request.query_params
+        if not self.delta_sync:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.page_size = self.get_page_size(request)
+        field = queryset.model._meta.get_field(self.sync_field)
+        encoded = request.query_params[self.since_query_param]
+        queryset = queryset.order_by(self.sync_field, 'pk')
+        position, seen = None, set()
+        if encoded:
+            try:
+                value, pk, _, seen = decode_keyset_cursor(encoded, field, with_seen=True)
+            except ValueError:
+                raise NotFound(self.invalid_cursor_message)
+            position = (value, pk)
+            queryset = queryset.filter(**{f'{self.sync_field}__gt': value - self.safety_window})
+
+        # Delivered rows of the window come back from the database too
+        results = [
+            row for row in queryset[:self.page_size + 1 + len(seen)]
+            if (row.pk, self._version(row)) not in seen
+        ]
+        self.has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+
+        self.since = encoded
+        if results:
+            last = results[-1]
+            if position is None or (getattr(last, self.sync_field), last.pk) > position:
+                position = (getattr(last, self.sync_field), last.pk)
+            start = (position[0] - self.safety_window - _EPOCH) // timedelta(microseconds=1)
+            seen = sorted(
+                pair for pair in seen | {(row.pk, self._version(row)) for row in results}
+                if pair[1] > start
+            )
+            self.since = encode_keyset_cursor(position[0], position[1], seen=[list(pair) for pair in seen])
+        return results
+
+    def get_paginated_response(self, data):
+        if not self.delta_sync:
+            return super().get_paginated_response(data)
+        return Response({
+            'since': self.since,
+            'has_more': self.has_more,
+            'results': data,
+        })
@@ -0,0 +1 @@
+from .auth import JWTAuthMiddleware